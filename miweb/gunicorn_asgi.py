@@ -0,0 +1,33 @@
+# miweb/gunicorn_asgi.py - Perfil de despliegue ASGI (gunicorn + uvicorn)
+"""
+gunicorn -c miweb/gunicorn_asgi.py miweb.asgi:application
+
+Cada worker de uvicorn atiende muchas peticiones a la vez: mientras un
+reporte espera a la base de datos, el mismo proceso sigue sirviendo la
+home y el punto de venta. Por eso bastan menos workers que con el
+perfil WSGI (Procfile: `gunicorn miweb.wsgi`, un proceso por petición).
+
+Las vistas síncronas y las consultas del ORM async de cada petición
+corren en un hilo propio de esa petición (asgiref), con su conexión a
+MySQL, que Django cierra al terminar. Las conexiones abiertas son tantas
+como peticiones en curso: revisar max_connections del servidor contra
+workers × peticiones simultáneas esperadas.
+
+Variables de entorno: PORT, WEB_CONCURRENCY (workers), GUNICORN_TIMEOUT.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', max(2, multiprocessing.cpu_count())))
+worker_class = 'uvicorn_worker.UvicornWorker'
+
+# Igual que miweb/asgi.py: las páginas de solo lectura usan las vistas async
+os.environ.setdefault('STORE_ASYNC_VIEWS', '1')
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = 5
+# Reciclar workers de vez en cuando (fugas de memoria de librerías)
+max_requests = 2000
+max_requests_jitter = 200
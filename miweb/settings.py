@@ -35,11 +35,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'store.profiling.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'store.middleware.CartMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'store.middleware.UserRolesMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -48,7 +51,8 @@ ROOT_URLCONF = 'miweb.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates que además mide el render (store/profiling.py)
+        'BACKEND': 'store.profiling.ProfiledDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -64,6 +68,11 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'miweb.wsgi.application'
+ASGI_APPLICATION = 'miweb.asgi.application'
+
+# Con ASGI (miweb/asgi.py pone STORE_ASYNC_VIEWS=1) home, búsqueda,
+# categorías, reportes y dashboard usan sus variantes de store/async_views.py
+ASYNC_VIEWS = os.environ.get('STORE_ASYNC_VIEWS') == '1'
 
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
@@ -117,4 +126,82 @@ MEDIA_ROOT = BASE_DIR / 'media'  # CORREGIDO - usar Path en lugar de os.path.joi
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/6.0/ref/settings/#default-auto-field
-DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
\ No newline at end of file
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Caché compartida entre workers de gunicorn (catálogo del punto de venta, etc.)
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    }
+}
+
+# Punto de venta
+# Segundos que se apartan las unidades agregadas a una venta (0 = sin apartados)
+POS_STOCK_HOLD_SECONDS = 300
+# Segundos que el catálogo del punto de venta permanece en caché
+POS_CATALOG_CACHE_TIMEOUT = 3600
+# Carrito de cada caja: almacén (caché en lugar de la sesión en base de datos),
+# alias de CACHES que usa (en producción conviene uno con RedisCache) y
+# segundos que se conserva sin cambios
+POS_CART_BACKEND = 'store.carts.CacheCartStore'
+POS_CART_CACHE = 'default'
+POS_CART_TTL = 60 * 60 * 8
+
+# Páginas públicas del catálogo (home, categorías, detalle): segundos que se
+# guarda cada página y fragmento por versión del catálogo, y max-age para el navegador
+CATALOG_PAGE_CACHE_TIMEOUT = 3600
+CATALOG_PAGE_MAX_AGE = 60
+
+# Dashboard del panel: hilos (por proceso) que calculan en paralelo los
+# indicadores que no están en caché; 1 = uno tras otro en el hilo de la petición
+DASHBOARD_WIDGET_THREADS = 4
+
+# Números de orden: generador y tamaño del bloque que reserva cada worker
+ORDER_NUMBER_GENERATOR = 'store.order_numbers.SequenceBlockGenerator'
+ORDER_NUMBER_BLOCK_SIZE = 50
+# Con SnowflakeGenerator: id (0-1023) distinto por proceso y servidor, p. ej.
+# desde una variable de entorno; sin él cada proceso toma uno de la base de datos
+# ORDER_NUMBER_WORKER_ID = int(os.environ['ORDER_NUMBER_WORKER_ID'])
+
+# Tickets: ancho en caracteres de la impresora térmica y duración en caché
+RECEIPT_TEXT_WIDTH = 42
+RECEIPT_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+# Panel: órdenes por página del listado (paginación por cursor)
+ADMIN_ORDERS_PAGE_SIZE = 50
+
+# Reportes: órdenes que se listan en la página (las demás se descargan en
+# CSV/XLSX) y filas por bloque que leen las descargas
+REPORTS_MAX_ORDERS = 100
+REPORT_EXPORT_CHUNK_SIZE = 2000
+
+# Búsqueda de productos: índice invertido (cualquier base de datos) o
+# 'store.search.MySQLFullTextBackend'. Al cambiarlo: manage.py rebuild_search_index
+PRODUCT_SEARCH_BACKEND = 'store.search.InvertedIndexBackend'
+# Sugerencias del buscador: prefijos memorizados por worker
+SEARCH_SUGGEST_CACHE_SIZE = 1024
+
+# Imágenes de productos y categorías: anchos (px) de las miniaturas y variantes WebP
+IMAGE_VARIANT_WIDTHS = (80, 160, 320, 640)
+
+# Segundos que se guardan en caché los grupos (roles) de cada usuario
+USER_ROLES_CACHE_TIMEOUT = 300
+
+# Métricas por vista (panel/metrics/): peticiones por vista en la ventana
+# móvil y presupuestos; las peticiones que los pasan se registran en el log
+METRICS_ENABLED = True
+METRICS_WINDOW = 1000
+METRICS_QUERY_BUDGET = 30
+METRICS_LATENCY_BUDGET_MS = 500
+# Token para que Prometheus lea panel/metrics/prometheus/ sin sesión (None = solo administradores)
+METRICS_TOKEN = None
+
+# Tareas en segundo plano (manage.py runworker): hilos por proceso, segundos
+# entre consultas a la cola vacía, segundos sin heartbeat para dar por muerta
+# una tarea en curso y días que se conservan las terminadas
+JOBS_WORKER_THREADS = 4
+JOBS_POLL_INTERVAL = 1.0
+JOBS_STALE_SECONDS = 600
+JOBS_KEEP_DAYS = 7
@@ -8,8 +8,9 @@ urlpatterns = [
     # Admin automático de Django
     path('admin/', admin.site.urls),
     
-    # Todas las rutas de tu aplicación store (panel, productos, etc.)
-    path('', include('store.urls')),
+    # Todas las rutas de tu aplicación store (panel, productos, etc.);
+    # con ASGI las páginas de solo lectura usan sus variantes async
+    path('', include('store.async_urls' if getattr(settings, 'ASYNC_VIEWS', False) else 'store.urls')),
 ]
 
 # Servir archivos media y static en desarrollo
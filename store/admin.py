@@ -1,11 +1,14 @@
 from django.contrib import admin
 from django.contrib import admin
-from .models import Category, Product, Order, OrderItem, InventoryLog
+from .models import Category, Product, Order, OrderItem, InventoryLog, StockHold, OrderSequence, ReceiptDocument
 
 admin.site.register(Category)
 admin.site.register(Product)
 admin.site.register(Order)
 admin.site.register(OrderItem)
 admin.site.register(InventoryLog)
+admin.site.register(StockHold)
+admin.site.register(OrderSequence)
+admin.site.register(ReceiptDocument)
 
 # Register your models here.
@@ -0,0 +1,5 @@
+# store/async_urls.py - Rutas de la tienda con las vistas async (ASGI)
+from .async_views import with_async_views
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = with_async_views(sync_urlpatterns)
@@ -0,0 +1,145 @@
+# store/async_views.py - Variantes async de las páginas de solo lectura
+"""
+Con gunicorn y workers síncronos (miweb.wsgi) cada petición ocupa un
+proceso completo: mientras un reporte espera a MySQL, ese worker no
+atiende a nadie más. Con ASGI (miweb.asgi, perfil en
+miweb/gunicorn_asgi.py) un worker atiende muchas peticiones a la vez y
+estas variantes de home, search_products, products_by_category, reports,
+reports_export y admin_dashboard esperan a la base de datos con el ORM
+async (las descargas se leen por bloques, ver exports.py).
+
+Las plantillas se renderizan con sync_to_async: los fragmentos en caché
+y las relaciones que la plantilla recorre siguen consultando al
+renderizar, y eso no se puede hacer desde el event loop.
+
+Las consultas independientes de reports se lanzan juntas con
+asyncio.gather. Ojo: el ORM async de Django todavía corre las consultas
+de una petición en el hilo de esa petición, con una sola conexión, así
+que van en serie; lo que se gana es que el worker atiende otras
+peticiones mientras tanto. Los indicadores del dashboard sí corren en
+paralelo: dashboard.py los calcula en su propio pool de hilos.
+
+miweb/asgi.py activa ASYNC_VIEWS y entonces miweb/urls.py usa
+store/async_urls.py, las mismas rutas con estas vistas en lugar de las
+síncronas (with_async_views); con WSGI se usan las de views.py.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import user_passes_test
+from django.core.paginator import Paginator
+from django.http import Http404
+from django.shortcuts import render, aget_object_or_404
+from django.urls import URLPattern
+
+from .dashboard import dashboard_widgets
+from .exports import report_range, export_response, EXPORT_DATASETS, EXPORT_FORMATS
+from .invalidation import CATEGORY, category_scope
+from .models import Category, Product
+from .page_cache import catalog_page, fragment_context
+from .rollups import asales_totals, top_selling_products, sales_by_category
+from .views import (
+    SEARCH_PAGE_SIZE, is_admin, search_catalog, search_page, report_orders, reports_context
+)
+
+
+async def _render(request, template_name, context):
+    return await sync_to_async(render)(request, template_name, context)
+
+
+async def _list(queryset):
+    return [row async for row in queryset]
+
+
+@catalog_page()
+async def home(request):
+    # Las categorías se consultan solo si su fragmento no está en caché (al renderizar)
+    products = await _list(Product.objects.filter(is_active=True).select_related('category')[:20])
+    return await _render(request, 'store/home.html', {
+        'categories': Category.objects.filter(is_active=True),
+        'products': products,
+        **await sync_to_async(fragment_context)()
+    })
+
+
+@catalog_page(CATEGORY, category_scope)
+async def products_by_category(request, category_id):
+    category = await aget_object_or_404(Category, id=category_id)
+    products = await _list(Product.objects.filter(category=category, is_active=True).order_by('tipo', 'name'))
+    return await _render(request, 'store/products.html', {
+        'category': category,
+        'products': products,
+        'all_categories': Category.objects.filter(is_active=True).order_by('name'),
+        **await sync_to_async(fragment_context)()
+    })
+
+
+async def search_products(request):
+    """Búsqueda con índice (sin acentos, por relevancia) y paginada"""
+    query = request.GET.get('q', '').strip()
+    if query:
+        # El conteo y la página de ids son consultas síncronas de Paginator
+        page, ids = await sync_to_async(search_page)(query, request.GET.get('page'))
+        found = await Product.objects.select_related('category').ain_bulk(ids)
+        products = [found[product_id] for product_id in ids if product_id in found]
+    else:
+        paginator = Paginator(search_catalog(), SEARCH_PAGE_SIZE)
+        # Paginator cuenta con una consulta síncrona: se le da el conteo ya hecho
+        paginator.count = await search_catalog().acount()
+        page = paginator.get_page(request.GET.get('page'))
+        products = await _list(page.object_list)
+    return await _render(request, 'store/search_results.html', {
+        'products': products,
+        'page_obj': page,
+        'query': query
+    })
+
+
+@user_passes_test(is_admin)
+async def reports(request):
+    """Reportes de ventas con filtros de fecha"""
+    fecha_inicio, fecha_fin = report_range(request.GET)
+    orders, totales, productos_vendidos, ventas_por_categoria = await asyncio.gather(
+        _list(report_orders(fecha_inicio, fecha_fin)),
+        asales_totals(fecha_inicio, fecha_fin),
+        _list(top_selling_products(fecha_inicio, fecha_fin)),
+        _list(sales_by_category(fecha_inicio, fecha_fin)),
+    )
+    context = reports_context(fecha_inicio, fecha_fin, orders, totales, productos_vendidos, ventas_por_categoria)
+    return await _render(request, 'store/reports.html', context)
+
+
+@user_passes_test(is_admin)
+async def reports_export(request, dataset, fmt):
+    """Descarga del reporte con un iterador async: no se junta en memoria"""
+    if dataset not in EXPORT_DATASETS or fmt not in EXPORT_FORMATS:
+        raise Http404('Reporte no disponible')
+    fecha_inicio, fecha_fin = report_range(request.GET)
+    return export_response(dataset, fmt, fecha_inicio, fecha_fin, asynchronous=True)
+
+
+@user_passes_test(is_admin)
+async def admin_dashboard(request):
+    # Los widgets sin caché se calculan en el pool de dashboard.py, cada
+    # uno con su conexión; aquí solo se espera a que terminen
+    return await _render(request, 'store/admin_dashboard.html', await sync_to_async(dashboard_widgets)())
+
+
+# {nombre de la ruta: vista async que la reemplaza con ASGI}
+ASYNC_VIEWS = {
+    'home': home,
+    'search_products': search_products,
+    'products_by_category': products_by_category,
+    'reports': reports,
+    'reports_export': reports_export,
+    'admin_dashboard': admin_dashboard,
+}
+
+
+def with_async_views(urlpatterns):
+    """Copia de las rutas con las vistas de ASYNC_VIEWS en lugar de las síncronas"""
+    return [
+        URLPattern(pattern.pattern, ASYNC_VIEWS[pattern.name], pattern.default_args, pattern.name)
+        if isinstance(pattern, URLPattern) and pattern.name in ASYNC_VIEWS else pattern
+        for pattern in urlpatterns
+    ]
@@ -0,0 +1,147 @@
+# store/carts.py - Carrito del punto de venta fuera de la sesión
+"""
+El carrito de cada caja ({product_id: cantidad}) ya no vive en
+request.session: con el backend de sesiones en base de datos cada
+agregar, quitar o cambiar cantidad reescribía la fila de django_session,
+y en hora pico esa tabla era la de más escrituras.
+
+El almacén se elige con POS_CART_BACKEND (ruta a la clase):
+
+- CacheCartStore (por defecto): una entrada por sesión de caja en el
+  alias de caché POS_CART_CACHE, que caduca POS_CART_TTL segundos después
+  del último cambio. En local basta la caché de archivos o de memoria; en
+  producción conviene un alias con RedisCache o memcached.
+- SessionCartStore: el comportamiento anterior, para comparar
+  (`manage.py bench_cart_store`).
+
+Las escrituras se juntan: get_cart/save_cart trabajan sobre una copia
+guardada en la petición y CartMiddleware escribe una sola vez al final,
+y solo si el carrito cambió. Los carritos que quedaron en la sesión antes
+de este módulo se pasan al almacén la primera vez que se leen.
+"""
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+SESSION_KEY = 'sale_items'
+
+
+class CacheCartStore:
+    """Carritos en la caché, uno por sesión de caja, con caducidad"""
+
+    def _cache(self):
+        return caches[getattr(settings, 'POS_CART_CACHE', 'default')]
+
+    def _key(self, session_key):
+        return f'store:cart:{session_key}'
+
+    def load(self, session):
+        items = self._cache().get(self._key(_session_key(session)))
+        if items is None and SESSION_KEY in session:
+            # Carrito anterior a este almacén
+            items = session.pop(SESSION_KEY)
+            self.save(session, items)
+        return items or {}
+
+    def save(self, session, items):
+        key = self._key(_session_key(session))
+        if items:
+            self._cache().set(key, items, getattr(settings, 'POS_CART_TTL', 60 * 60 * 8))
+        else:
+            self._cache().delete(key)
+
+    def delete(self, session_key):
+        self._cache().delete(self._key(session_key))
+
+
+class SessionCartStore:
+    """Carrito en request.session (cada cambio reescribe la sesión)"""
+
+    def load(self, session):
+        return session.get(SESSION_KEY, {})
+
+    def save(self, session, items):
+        session[SESSION_KEY] = items
+        session.modified = True
+
+    def delete(self, session_key):
+        pass
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Instancia (una por proceso) del almacén configurado"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = import_string(getattr(settings, 'POS_CART_BACKEND', 'store.carts.CacheCartStore'))()
+    return _store
+
+
+@receiver(setting_changed)
+def _reset_store(setting, **kwargs):
+    """Vuelve a crear el almacén si cambia su configuración (tests)"""
+    global _store
+    if setting.startswith('POS_CART_'):
+        _store = None
+
+
+def _session_key(session):
+    # Las cajas siempre tienen sesión (login); por si acaso se crea
+    if session.session_key is None:
+        session.save()
+    return session.session_key
+
+
+class _RequestCart:
+    """Carrito de la petición: el leído y el que se escribirá al final"""
+
+    def __init__(self, items):
+        self.loaded = dict(items)
+        self.items = dict(items)
+
+
+def _request_cart(request):
+    cart = getattr(request, '_pos_cart', None)
+    if cart is None:
+        cart = request._pos_cart = _RequestCart(get_store().load(request.session))
+    return cart
+
+
+def get_cart(request):
+    """{product_id (str): cantidad} de la caja; una lectura por petición"""
+    return _request_cart(request).items
+
+
+def save_cart(request, items):
+    """Reemplaza el carrito; se escribe al terminar la petición"""
+    _request_cart(request).items = items
+
+
+def flush_cart(request):
+    """Escribe el carrito si cambió; regresa True si hubo escritura"""
+    cart = getattr(request, '_pos_cart', None)
+    if cart is None or cart.items == cart.loaded:
+        return False
+    get_store().save(request.session, cart.items)
+    cart.loaded = dict(cart.items)
+    return True
+
+
+def load_cart(session):
+    """Carrito guardado de una sesión (fuera de una petición: tests, scripts)"""
+    return get_store().load(session)
+
+
+def delete_cart(session_key):
+    """Borra el carrito de una sesión que terminó (logout)"""
+    if session_key:
+        get_store().delete(session_key)
@@ -0,0 +1,81 @@
+# store/catalog.py - Catálogo precalculado del punto de venta
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .invalidation import CATALOG, cache_key
+from .models import Product
+
+POS_CATALOG_CACHE_KEY = 'store:pos_catalog'
+
+
+def build_pos_catalog():
+    """
+    Construye el catálogo del punto de venta con una sola consulta (JOIN a categorías).
+
+    Formato:
+        {'generated_at': ..., 'categories': [
+            {'id': 1, 'name': 'Bebidas', 'products': [
+                {'id': 1, 'name': 'Café', 'price': '25.00', 'stock': 10, 'image': None, 'image_url': None}
+            ]}
+        ]}
+    """
+    products = Product.objects.filter(
+        is_active=True,
+        stock__gt=0,
+        category__is_active=True
+    ).select_related('category').only(
+        'id', 'name', 'price', 'stock', 'image', 'category__id', 'category__name'
+    ).order_by('category__name', 'category_id', 'id')
+
+    categories = []
+    current = None
+    for product in products:
+        if current is None or current['id'] != product.category_id:
+            current = {
+                'id': product.category_id,
+                'name': product.category.name,
+                'products': [],
+            }
+            categories.append(current)
+
+        current['products'].append({
+            'id': product.id,
+            'name': product.name,
+            'price': str(product.price),
+            'stock': product.stock,
+            'image': product.image.name or None,
+            'image_url': product.image.url if product.image else None,
+        })
+
+    return {
+        'generated_at': timezone.now().isoformat(),
+        'categories': categories,
+    }
+
+
+def pos_catalog_key():
+    """Llave del catálogo en caché; cambia con cualquier cambio del catálogo"""
+    return cache_key(POS_CATALOG_CACHE_KEY, *CATALOG)
+
+
+def get_pos_catalog():
+    """Regresa el catálogo desde caché; lo construye si no existe"""
+    key = pos_catalog_key()
+    catalog = cache.get(key)
+    if catalog is None:
+        catalog = build_pos_catalog()
+        cache.set(
+            key,
+            catalog,
+            getattr(settings, 'POS_CATALOG_CACHE_TIMEOUT', 3600)
+        )
+    return catalog
+
+
+def invalidate_pos_catalog():
+    """
+    Fuerza a reconstruir el catálogo. Normalmente no hace falta: la llave
+    lleva las versiones de invalidation.py y cambia sola.
+    """
+    cache.delete(pos_catalog_key())
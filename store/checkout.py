@@ -0,0 +1,381 @@
+# store/checkout.py - Servicio de cobro del punto de venta
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import F, Q, Case, When, Value
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Product, Order, OrderItem, InventoryLog, ReceiptDocument
+from .inventory import hold_seconds, held_quantities, release_holds
+from .invalidation import STOCK, ORDER, changed
+from .order_numbers import next_order_number, next_order_numbers
+from .receipts import receipt_for_checkout, cache_receipts
+from .rollups import record_sales
+
+
+class CheckoutError(Exception):
+    """Error de validación al procesar una venta (el mensaje se muestra al cajero)"""
+
+
+def _cart_quantities(sale_items):
+    """Convierte el carrito de sesión {'id': qty} a {id: qty} descartando cantidades vacías"""
+    quantities = {}
+    for product_id_str, quantity in sale_items.items():
+        try:
+            product_id = int(product_id_str)
+            quantity = int(quantity)
+        except (TypeError, ValueError):
+            continue
+        if quantity > 0:
+            quantities[product_id] = quantity
+    return quantities
+
+
+def _parse_payment(value):
+    """Convierte el pago recibido a Decimal (finito y que quepa en la columna)"""
+    try:
+        payment = Decimal(str(value or 0))
+    except InvalidOperation:
+        raise CheckoutError('El pago recibido no es válido')
+    # 'NaN' e 'Infinity' son Decimal válidos, pero fallan al comparar o al guardar
+    field = Order._meta.get_field('payment_received')
+    if not payment.is_finite() or abs(payment) >= 10 ** (field.max_digits - field.decimal_places):
+        raise CheckoutError('El pago recibido no es válido')
+    return payment
+
+
+def _stock_changed(items):
+    """Invalida las cachés del stock vendido (productos y sus categorías)"""
+    products = [product for product, quantity, subtotal in items]
+    changed(
+        STOCK,
+        product_ids=[product.id for product in products],
+        category_ids=[product.category_id for product in products]
+    )
+
+
+def _decrement_stock(quantities):
+    """
+    Descuenta stock de varios productos con un solo UPDATE ... CASE.
+    El WHERE stock >= qty evita dejarlo negativo si otra caja vendió las
+    últimas unidades; en ese caso se lanza CheckoutError.
+    """
+    in_stock = Q()
+    for product_id, quantity in quantities.items():
+        in_stock |= Q(id=product_id, stock__gte=quantity)
+    updated = Product.objects.filter(in_stock).update(
+        stock=Case(
+            *[When(id=product_id, then=F('stock') - quantity) for product_id, quantity in quantities.items()],
+            default=F('stock')
+        ),
+        updated_at=timezone.now()
+    )
+    if updated != len(quantities):
+        raise CheckoutError('Stock insuficiente, intenta de nuevo')
+
+
+def process_sale(user, sale_items, payment_received, session_key=None):
+    """
+    Procesa una venta completa en una sola transacción.
+
+    Carga todos los productos del carrito con una consulta, crea los
+    OrderItem e InventoryLog con bulk_create y descuenta el stock con un
+    solo UPDATE condicional. El número de consultas no depende del número
+    de líneas del ticket. La venta se suma a los acumulados diarios
+    (rollups) en la misma transacción.
+
+    Las unidades apartadas por otras cajas (StockHold) no se pueden vender;
+    los apartados de `session_key` se liberan al completar la venta.
+
+    Regresa (order, change). Lanza CheckoutError si la venta no es válida.
+    """
+    quantities = _cart_quantities(sale_items)
+    payment_received = _parse_payment(payment_received)
+    # Fuera de la transacción: un rollback no debe devolver el número al bloque
+    order_number = next_order_number()
+
+    with transaction.atomic():
+        products = Product.objects.select_for_update().in_bulk(list(quantities))
+        held = held_quantities(quantities, session_key) if hold_seconds() > 0 else {}
+
+        # Calcular items y total
+        items = []
+        total = Decimal('0.00')
+        for product_id, quantity in quantities.items():
+            product = products.get(product_id)
+            if product is None:
+                continue
+
+            available = product.stock - held.get(product_id, 0)
+            if quantity > available:
+                raise CheckoutError(f'Solo hay {max(available, 0)} unidades de {product.name}')
+
+            subtotal = product.price * quantity
+            total += subtotal
+            items.append((product, quantity, subtotal))
+
+        if not items:
+            raise CheckoutError('No hay productos en la venta')
+
+        if payment_received < total:
+            raise CheckoutError('El pago recibido es insuficiente')
+
+        change = payment_received - total
+
+        order = Order.objects.create(
+            order_number=order_number,
+            customer=user,
+            total=total,
+            status='completed',
+            payment_method='cash',
+            payment_status='completed',
+            payment_received=payment_received,
+            change_amount=change
+        )
+
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product=product,
+                quantity=quantity,
+                unit_price=product.price,
+                subtotal=subtotal
+            )
+            for product, quantity, subtotal in items
+        ])
+
+        _decrement_stock({product.id: quantity for product, quantity, subtotal in items})
+
+        InventoryLog.objects.bulk_create([
+            InventoryLog(
+                product=product,
+                quantity_change=-quantity,
+                reason='Venta en punto de venta'
+            )
+            for product, quantity, subtotal in items
+        ])
+
+        # El ticket se arma ahora; las reimpresiones ya no consultan la orden
+        receipt = receipt_for_checkout(order, items, user.username)
+        receipt.save(force_insert=True)
+
+        record_sales([(order, items)])
+
+        if session_key and hold_seconds() > 0:
+            release_holds(session_key)
+
+        # update() no dispara señales: el stock del catálogo cambió
+        _stock_changed(items)
+        transaction.on_commit(lambda: cache_receipts([receipt]))
+
+    return order, change
+
+
+def _price_sales(sales, products):
+    """
+    Valida en orden las ventas (result, cantidades, pago, hora) contra
+    `products` ({id: Product}), descontando el stock de cada una para las
+    siguientes. Regresa las aceptadas con (..., items, total); las demás
+    quedan con status 'error' en su result.
+    """
+    stock = {product.id: product.stock for product in products.values()}
+    accepted = []
+    for result, quantities, payment_received, sold_at in sales:
+        try:
+            items = []
+            total = Decimal('0.00')
+            for product_id, quantity in quantities.items():
+                product = products.get(product_id)
+                if product is None:
+                    raise CheckoutError(f'El producto {product_id} no existe')
+                if quantity > stock[product_id]:
+                    raise CheckoutError(f'Solo hay {stock[product_id]} unidades de {product.name}')
+                subtotal = product.price * quantity
+                total += subtotal
+                items.append((product, quantity, subtotal))
+
+            if not items:
+                raise CheckoutError('No hay productos en la venta')
+            if payment_received < total:
+                raise CheckoutError('El pago recibido es insuficiente')
+        except CheckoutError as e:
+            result.update(status='error', error=str(e))
+            continue
+
+        for product, quantity, subtotal in items:
+            stock[product.id] -= quantity
+        accepted.append((result, quantities, payment_received, sold_at, items, total))
+    return accepted
+
+
+def ingest_offline_sales(user, sales):
+    """
+    Registra en lote las ventas que una caja capturó fuera de línea.
+
+    Cada venta es un dict:
+        {'client_key': 'uuid', 'items': {'<product_id>': cantidad},
+         'payment_received': '100.00', 'sold_at': '2026-01-31T10:15:00-06:00'}
+
+    `client_key` es la llave de idempotencia: reenviar una venta ya
+    registrada la reporta como 'duplicate' sin crearla de nuevo. Todo el
+    lote usa un número fijo de consultas (órdenes, items, logs y stock
+    con bulk_create / UPDATE ... CASE).
+
+    Regresa una lista de resultados en el mismo orden que `sales`:
+        {'client_key': ..., 'status': 'created' | 'duplicate' | 'error',
+         'order_id': ..., 'error': ...}
+    """
+    results = []
+    pending = []
+    seen = set()
+    for sale in sales:
+        if not isinstance(sale, dict):
+            results.append({'client_key': None, 'status': 'error', 'error': 'Formato inválido'})
+            continue
+
+        key = str(sale.get('client_key') or '')[:64]
+        result = {'client_key': key}
+        results.append(result)
+
+        if not key:
+            result.update(status='error', error='Falta client_key')
+            continue
+        if key in seen:
+            result.update(status='duplicate')
+            continue
+        seen.add(key)
+
+        try:
+            if not isinstance(sale.get('items'), dict):
+                raise CheckoutError('No hay productos en la venta')
+            quantities = _cart_quantities(sale['items'])
+            payment_received = _parse_payment(sale.get('payment_received'))
+            sold_at = parse_datetime(str(sale.get('sold_at') or ''))
+        except (CheckoutError, ValueError) as e:
+            result.update(status='error', error=str(e) or 'Formato inválido')
+            continue
+
+        if sold_at is not None and timezone.is_naive(sold_at):
+            sold_at = timezone.make_aware(sold_at)
+        pending.append((result, quantities, payment_received, sold_at))
+
+    # Ventas ya registradas en una sincronización anterior
+    existing = dict(
+        Order.objects.filter(
+            client_key__in=[result['client_key'] for result, *rest in pending]
+        ).values_list('client_key', 'id')
+    )
+
+    # Los números se piden fuera de la transacción y solo para las ventas
+    # nuevas que pasan la validación (con el stock sin bloquear): reenviar un
+    # lote ya sincronizado o con ventas rechazadas no gasta números
+    new_sales = []
+    for sale in pending:
+        result = sale[0]
+        if result['client_key'] in existing:
+            result.update(status='duplicate', order_id=existing[result['client_key']])
+        else:
+            new_sales.append(sale)
+    product_ids = {product_id for result, quantities, *rest in new_sales for product_id in quantities}
+    valid = _price_sales(new_sales, Product.objects.in_bulk(list(product_ids)))
+    if not valid:
+        return results
+    order_numbers = next_order_numbers(len(valid))
+
+    with transaction.atomic():
+        # Otra caja pudo vender mientras tanto: se valida otra vez con el
+        # stock bloqueado (un rechazo aquí deja un hueco en la numeración)
+        products = Product.objects.select_for_update().in_bulk(list(product_ids))
+        accepted = []
+        priced = _price_sales([sale[:4] for sale in valid], products)
+        for (result, quantities, payment_received, sold_at, items, total), order_number in zip(priced, order_numbers):
+            order = Order(
+                order_number=order_number,
+                client_key=result['client_key'],
+                customer=user,
+                total=total,
+                status='completed',
+                payment_method='cash',
+                payment_status='completed',
+                payment_received=payment_received,
+                change_amount=payment_received - total,
+                notes='Venta fuera de línea'
+            )
+            accepted.append((result, order, items, sold_at))
+
+        if not accepted:
+            return results
+
+        # ignore_conflicts: otra sincronización simultánea pudo registrar la misma llave
+        Order.objects.bulk_create([order for result, order, items, sold_at in accepted], ignore_conflicts=True)
+        saved = {
+            client_key: (order_id, order_number)
+            for client_key, order_id, order_number in Order.objects.filter(
+                client_key__in=[order.client_key for result, order, items, sold_at in accepted]
+            ).values_list('client_key', 'id', 'order_number')
+        }
+
+        created = []
+        for result, order, items, sold_at in accepted:
+            order_id, order_number = saved[order.client_key]
+            if order_number != order.order_number:
+                result.update(status='duplicate', order_id=order_id)
+                continue
+            order.id = order_id
+            if sold_at:
+                order.created_at = sold_at
+            result.update(status='created', order_id=order_id, order_number=order_number)
+            created.append((order, items, sold_at))
+
+        if not created:
+            return results
+
+        # Conservar la hora real de la venta (auto_now_add la reemplaza al insertar)
+        sold_times = [When(id=order.id, then=Value(sold_at)) for order, items, sold_at in created if sold_at]
+        if sold_times:
+            Order.objects.filter(id__in=[order.id for order, items, sold_at in created if sold_at]).update(
+                created_at=Case(*sold_times, default=F('created_at'))
+            )
+
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product=product,
+                quantity=quantity,
+                unit_price=product.price,
+                subtotal=subtotal
+            )
+            for order, items, sold_at in created
+            for product, quantity, subtotal in items
+        ])
+
+        totals = {}
+        for order, items, sold_at in created:
+            for product, quantity, subtotal in items:
+                totals[product.id] = totals.get(product.id, 0) + quantity
+        _decrement_stock(totals)
+
+        InventoryLog.objects.bulk_create([
+            InventoryLog(
+                product=product,
+                quantity_change=-quantity,
+                reason='Venta fuera de línea'
+            )
+            for order, items, sold_at in created
+            for product, quantity, subtotal in items
+        ])
+
+        receipts = ReceiptDocument.objects.bulk_create([
+            receipt_for_checkout(order, items, user.username)
+            for order, items, sold_at in created
+        ])
+
+        record_sales([(order, items) for order, items, sold_at in created])
+
+        _stock_changed(item for order, items, sold_at in created for item in items)
+        # bulk_create no dispara post_save de Order
+        changed(ORDER)
+        transaction.on_commit(lambda: cache_receipts(receipts))
+
+    return results
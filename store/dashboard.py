@@ -0,0 +1,171 @@
+# store/dashboard.py - Indicadores del dashboard con caché propia y en paralelo
+"""
+El dashboard del panel corría sus consultas una tras otra (conteos,
+ventas del mes y del día, poco stock, últimas órdenes, más vendidos), así
+que tardaba la suma de todas. Ahora cada indicador es un widget que
+declara:
+
+- su consulta: una función `compute(today)` que regresa un valor ya
+  evaluado (listas, no QuerySets) para poder guardarlo en la caché
+- cuánto dura en caché (`timeout`, segundos)
+- qué cambios lo invalidan (`depends_on`, ámbitos de invalidation.py)
+
+dashboard_widgets() arma todas las llaves con una sola lectura de
+versiones, trae los widgets guardados con un get_many y calcula solo los
+que faltan, en paralelo en un pool de hilos (DASHBOARD_WIDGET_THREADS),
+cada uno con su propia conexión a la base de datos: la página tarda lo
+que el widget más lento sin caché, no la suma. Como las llaves llevan la
+versión de sus ámbitos, una venta (ORDER, STOCK) no recalcula el total
+de productos y editar un producto no recalcula las ventas.
+
+Dentro de una transacción (tests, o si alguien llama desde un atomic())
+los widgets se calculan en el mismo hilo: otra conexión no vería los
+datos sin confirmar.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.db import close_old_connections, connection
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .invalidation import PRODUCT, STOCK, ORDER, cache_keys
+from .models import Product, Order
+from .rollups import sales_totals, top_selling_products
+
+# {nombre (variable de la plantilla): Widget}, en orden de registro
+WIDGETS = {}
+
+
+class Widget:
+    """Un indicador: su consulta, su duración en caché y sus invalidaciones"""
+
+    def __init__(self, name, compute, timeout, depends_on):
+        self.name = name
+        self.compute = compute
+        self.timeout = timeout
+        self.depends_on = tuple(depends_on)
+
+    def cache_prefix(self, today):
+        # La fecha va en la llave: las ventas del día cambian a medianoche
+        return f'store:widget:{self.name}:{today.isoformat()}'
+
+
+def widget(name, timeout=300, depends_on=()):
+    """Registra la función decorada como el widget `name` del dashboard"""
+    def register(compute):
+        WIDGETS[name] = Widget(name, compute, timeout, depends_on)
+        return compute
+    return register
+
+
+@widget('total_products', timeout=3600, depends_on=[PRODUCT])
+def total_products(today):
+    return Product.objects.count()
+
+
+@widget('total_orders', depends_on=[ORDER])
+def total_orders(today):
+    return Order.objects.count()
+
+
+@widget('total_customers', depends_on=[ORDER])
+def total_customers(today):
+    return Order.objects.values('customer').distinct().count()
+
+
+@widget('monthly_sales', depends_on=[ORDER])
+def monthly_sales(today):
+    return sales_totals(start=today.replace(day=1))['revenue']
+
+
+@widget('daily_sales', depends_on=[ORDER])
+def daily_sales(today):
+    return sales_totals(start=today, end=today)['revenue']
+
+
+@widget('low_stock', depends_on=[PRODUCT, STOCK])
+def low_stock(today):
+    """Productos con poco stock"""
+    return list(Product.objects.filter(stock__lt=10, is_active=True).order_by('stock')[:10])
+
+
+@widget('recent_orders', depends_on=[ORDER])
+def recent_orders(today):
+    """Últimas órdenes"""
+    return list(Order.objects.order_by('-created_at')[:10])
+
+
+@widget('top_products', timeout=600, depends_on=[ORDER])
+def top_products(today):
+    """Productos más vendidos (de los acumulados diarios)"""
+    return list(top_selling_products())
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Pool de hilos (uno por proceso) que calcula los widgets sin caché"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'DASHBOARD_WIDGET_THREADS', 4),
+                    thread_name_prefix='dashboard'
+                )
+    return _executor
+
+
+@receiver(setting_changed)
+def _reset_executor(setting, **kwargs):
+    """Vuelve a crear el pool si cambia su tamaño (tests)"""
+    global _executor
+    if setting == 'DASHBOARD_WIDGET_THREADS' and _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+def _compute_in_thread(widget, today):
+    try:
+        return widget.compute(today)
+    finally:
+        # Igual que al terminar una petición: cerrar o reutilizar según CONN_MAX_AGE
+        close_old_connections()
+
+
+def _compute(widgets, today):
+    """Valores de los widgets, en paralelo si conviene"""
+    threads = getattr(settings, 'DASHBOARD_WIDGET_THREADS', 4)
+    if len(widgets) < 2 or threads < 2 or connection.in_atomic_block:
+        return [widget.compute(today) for widget in widgets]
+    futures = [get_executor().submit(_compute_in_thread, widget, today) for widget in widgets]
+    return [future.result() for future in futures]
+
+
+def dashboard_widgets(names=None, today=None):
+    """{nombre: valor} de los widgets (todos por omisión) para la plantilla"""
+    today = today or timezone.localdate()
+    widgets = [WIDGETS[name] for name in names or WIDGETS]
+    keys = cache_keys({w.name: (w.cache_prefix(today), w.depends_on) for w in widgets})
+    found = cache.get_many(keys.values())
+
+    values = {}
+    missing = []
+    for w in widgets:
+        if keys[w.name] in found:
+            values[w.name] = found[keys[w.name]]
+        else:
+            missing.append(w)
+
+    # Se guardan con la llave leída antes de calcular: si algo cambió
+    # mientras tanto, la versión ya subió y nadie vuelve a leer este valor
+    for w, value in zip(missing, _compute(missing, today)):
+        cache.set(keys[w.name], value, w.timeout)
+        values[w.name] = value
+    return {w.name: values[w.name] for w in widgets}
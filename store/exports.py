@@ -0,0 +1,340 @@
+# store/exports.py - Descarga de los reportes de ventas en CSV y XLSX
+"""
+Las descargas de panel/reports/ (órdenes, partidas, resumen por producto
+y por categoría del rango de fechas del reporte) se envían fila por fila
+con StreamingHttpResponse: la memoria no crece con el rango, así que un
+año de ventas para contabilidad cuesta lo mismo que un día.
+
+Las filas se leen en bloques de REPORT_EXPORT_CHUNK_SIZE con
+.iterator(chunk_size=...), que en PostgreSQL y SQLite es un cursor del
+lado del servidor. El driver de MySQL carga el resultado completo aunque
+se use iterator(), por eso ahí se pagina por llave (WHERE id > último
+ORDER BY id LIMIT n): cada bloque es una consulta corta por el índice
+primario.
+
+El XLSX se arma sin dependencias: es un zip con el XML mínimo de un libro
+de una hoja, y la hoja se comprime mientras se escribe.
+
+Los textos vienen de lo que captura cualquiera (nombres de productos y de
+clientes): uno que empieza con =, +, - o @ la hoja de cálculo lo toma por
+fórmula (inyección de fórmulas), así que en ambos formatos se escribe con
+un apóstrofo al inicio y se muestra como texto.
+
+Con ASGI, Django lee un iterador síncrono completo en una lista antes de
+enviarlo; la vista async (async_views.reports_export) pide la respuesta
+con `asynchronous=True` y el contenido se lee por bloques de
+ASYNC_BLOCK_BYTES con sync_to_async, siempre en el hilo de la petición
+(el mismo cursor).
+"""
+import csv
+import zipfile
+from datetime import datetime, timedelta
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.db.models import Sum
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import Order, OrderItem
+from .rollups import day_bounds, product_rollups
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+def chunk_size():
+    """Filas por bloque leído de la base de datos"""
+    return getattr(settings, 'REPORT_EXPORT_CHUNK_SIZE', 2000)
+
+
+def report_range(params):
+    """
+    (fecha_inicio, fecha_fin) del querystring del reporte. Por defecto los
+    últimos 7 días; las fechas inválidas usan el valor por defecto y si
+    vienen invertidas se intercambian.
+    """
+    today = timezone.localdate()
+    defaults = {'fecha_inicio': today - timedelta(days=7), 'fecha_fin': today}
+    days = []
+    for name, default in defaults.items():
+        try:
+            days.append(datetime.strptime(params.get(name) or '', '%Y-%m-%d').date())
+        except ValueError:
+            days.append(default)
+    return min(days), max(days)
+
+
+def _stream(queryset):
+    """
+    Filas de `queryset` (un values_list cuya primera columna es el id) en
+    orden de id, leídas por bloques.
+    """
+    size = chunk_size()
+    if connection.vendor != 'mysql':
+        yield from queryset.order_by('id').iterator(chunk_size=size)
+        return
+    last_id = 0
+    while True:
+        rows = list(queryset.filter(id__gt=last_id).order_by('id')[:size])
+        yield from rows
+        if len(rows) < size:
+            return
+        last_id = rows[-1][0]
+
+
+def _local(value):
+    return timezone.localtime(value).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def order_rows(start, end):
+    """Una fila por orden del rango"""
+    orders = Order.objects.filter(**day_bounds(start, end)).values_list(
+        'id', 'order_number', 'created_at', 'customer__username', 'customer_name',
+        'status', 'payment_method', 'payment_status', 'total', 'payment_received', 'change_amount'
+    )
+    for row in _stream(orders):
+        yield (row[1], _local(row[2])) + row[3:]
+
+
+def item_rows(start, end):
+    """Una fila por producto vendido en cada orden del rango"""
+    items = OrderItem.objects.filter(
+        **{f'order__{lookup}': value for lookup, value in day_bounds(start, end).items()}
+    ).values_list(
+        'id', 'order__order_number', 'order__created_at', 'product_id', 'product__name',
+        'product__category__name', 'quantity', 'unit_price', 'subtotal'
+    )
+    for row in _stream(items):
+        yield (row[1], _local(row[2])) + row[3:]
+
+
+def product_rows(start, end):
+    """Totales por producto desde los acumulados diarios"""
+    products = product_rollups(start, end).values_list(
+        'product_id', 'product_name', 'category_name'
+    ).annotate(
+        total_qty=Sum('quantity'), total_orders=Sum('order_count'), total_revenue=Sum('revenue')
+    ).order_by('-total_revenue', 'product_id')
+    yield from products.iterator(chunk_size=chunk_size())
+
+
+def category_rows(start, end):
+    """Totales por categoría desde los acumulados diarios"""
+    categories = product_rollups(start, end).values_list('category_name').annotate(
+        total_qty=Sum('quantity'), total_revenue=Sum('revenue')
+    ).order_by('-total_revenue', 'category_name')
+    yield from categories.iterator(chunk_size=chunk_size())
+
+
+# nombre -> (nombre del archivo, encabezados, generador de filas)
+EXPORT_DATASETS = {
+    'orders': ('ordenes', [
+        'Orden', 'Fecha', 'Cajero', 'Cliente', 'Estado', 'Método de pago',
+        'Estado del pago', 'Total', 'Pago recibido', 'Cambio',
+    ], order_rows),
+    'items': ('partidas', [
+        'Orden', 'Fecha', 'ID producto', 'Producto', 'Categoría',
+        'Cantidad', 'Precio unitario', 'Subtotal',
+    ], item_rows),
+    'products': ('productos', [
+        'ID producto', 'Producto', 'Categoría', 'Unidades', 'Órdenes', 'Ventas',
+    ], product_rows),
+    'categories': ('categorias', ['Categoría', 'Unidades', 'Ventas'], category_rows),
+}
+
+EXPORT_LABELS = [
+    ('orders', 'Órdenes'),
+    ('items', 'Partidas'),
+    ('products', 'Por producto'),
+    ('categories', 'Por categoría'),
+]
+
+
+# Inicios con los que Excel y LibreOffice interpretan una celda como fórmula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def safe_text(value):
+    """Texto de una celda que no se puede interpretar como fórmula"""
+    text = str(value)
+    return "'" + text if text.startswith(FORMULA_PREFIXES) else text
+
+
+class _Echo:
+    """Archivo que regresa lo escrito en lugar de guardarlo (para csv.writer)"""
+
+    def write(self, value):
+        return value
+
+
+def csv_stream(headers, rows):
+    """CSV en UTF-8 con BOM (Excel lo abre con acentos), una fila por pedazo"""
+    writer = csv.writer(_Echo())
+    yield '\ufeff' + writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow([
+            '' if value is None else safe_text(value) if isinstance(value, str) else value
+            for value in row
+        ])
+
+
+class _ZipBuffer:
+    """Destino del zip sin seek: guarda lo escrito hasta que se drena"""
+
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        self.size = 0
+        return data
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_END = '</sheetData></worksheet>'
+
+# Caracteres de control que XML no admite
+_INVALID_XML = dict.fromkeys(i for i in range(32) if i not in (9, 10, 13))
+
+# Bytes comprimidos que se juntan antes de enviarlos
+XLSX_FLUSH_BYTES = 64 * 1024
+
+
+def _column(index):
+    """0 -> A, 25 -> Z, 26 -> AA"""
+    letters = ''
+    index += 1
+    while index:
+        index, rest = divmod(index - 1, 26)
+        letters = chr(65 + rest) + letters
+    return letters
+
+
+def _xlsx_row(number, values):
+    cells = []
+    for index, value in enumerate(values):
+        ref = f'{_column(index)}{number}'
+        if value is None:
+            continue
+        if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+            cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+        else:
+            text = escape(safe_text(value).translate(_INVALID_XML))
+            cells.append(f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return f'<row r="{number}">{"".join(cells)}</row>'
+
+
+def xlsx_stream(headers, rows, sheet_name='Reporte'):
+    """
+    Libro XLSX de una hoja con cadenas en línea (sin sharedStrings, que
+    obligaría a juntar todos los textos antes de escribir la hoja).
+    """
+    buffer = _ZipBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        archive.writestr('_rels/.rels', _ROOT_RELS)
+        archive.writestr('xl/workbook.xml', _WORKBOOK.format(name=escape(sheet_name[:31], {'"': '&quot;'})))
+        archive.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+        yield buffer.drain()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+            sheet.write(_SHEET_START.encode())
+            sheet.write(_xlsx_row(1, headers).encode())
+            for number, row in enumerate(rows, start=2):
+                sheet.write(_xlsx_row(number, row).encode())
+                if buffer.size >= XLSX_FLUSH_BYTES:
+                    yield buffer.drain()
+            sheet.write(_SHEET_END.encode())
+    yield buffer.drain()
+
+
+# Bytes que se leen por cada salto al hilo de la petición (ASGI)
+ASYNC_BLOCK_BYTES = 64 * 1024
+
+
+def _next_block(parts):
+    block = []
+    size = 0
+    for part in parts:
+        block.append(part)
+        size += len(part)
+        if size >= ASYNC_BLOCK_BYTES:
+            break
+    return block
+
+
+async def _async_stream(content):
+    """`content` (generador síncrono) como iterador async, por bloques"""
+    parts = iter(content)
+    while block := await sync_to_async(_next_block)(parts):
+        for part in block:
+            yield part
+
+
+def export_response(dataset, fmt, start, end, asynchronous=False):
+    """StreamingHttpResponse con el reporte `dataset` en formato `fmt`"""
+    filename, headers, rows = EXPORT_DATASETS[dataset]
+    if fmt == 'xlsx':
+        content = xlsx_stream(headers, rows(start, end), sheet_name=filename.capitalize())
+    else:
+        content = csv_stream(headers, rows(start, end))
+    if asynchronous:
+        content = _async_stream(content)
+    response = StreamingHttpResponse(content, content_type=EXPORT_FORMATS[fmt])
+    response['Content-Disposition'] = (
+        f'attachment; filename="ventas-{filename}-{start:%Y-%m-%d}_{end:%Y-%m-%d}.{fmt}"'
+    )
+    return response
@@ -0,0 +1,181 @@
+# store/images.py - Miniaturas y variantes WebP de las imágenes de productos y categorías
+"""
+Cada imagen subida (Product.image, Category.image) se reduce a los
+anchos de IMAGE_VARIANT_WIDTHS en dos formatos: WebP y el formato
+original (JPEG, o PNG si el original es PNG) para navegadores sin WebP.
+Las variantes se guardan junto a los originales en el mismo storage:
+
+    products/MOno.jpg -> variants/products/MOno-80w.webp, variants/products/MOno-80w.jpg, ...
+
+Al subir una imagen las señales (signals.py) encolan la tarea que genera
+las variantes (store/tasks.py, la ejecuta `manage.py runworker`), así la
+petición no espera a Pillow. Las imágenes anteriores a este módulo se
+generan con `python manage.py generate_image_variants`: mostrar una
+página nunca encola tareas ni procesa imágenes, solo usa el original
+mientras no hay variantes. Que ya existen se recuerda en la caché
+compartida: el nombre de un archivo subido no se reutiliza, así que la
+entrada no caduca.
+
+La etiqueta {% responsive_image %} (templatetags/image_tags.py) arma el
+<picture> con srcset y loading="lazy".
+"""
+import logging
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .jobs import enqueue
+
+logger = logging.getLogger('store.images')
+
+VARIANTS_DIR = 'variants'
+
+# extensión -> (formato de Pillow, opciones de guardado)
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+    'png': ('PNG', {'optimize': True}),
+}
+
+# Segundos antes de reintentar una imagen que no se pudo procesar
+FAILED_RETRY_SECONDS = 60 * 60 * 24
+# Segundos antes de volver a revisar el storage de una imagen sin variantes
+# (en la cola, o anterior a este módulo y sin generate_image_variants)
+MISSING_RECHECK_SECONDS = 600
+
+
+def variant_widths():
+    """Anchos (px) de las variantes, de menor a mayor"""
+    return tuple(sorted(getattr(settings, 'IMAGE_VARIANT_WIDTHS', (80, 160, 320, 640))))
+
+
+def fallback_format(name):
+    """Extensión de la variante para navegadores sin WebP"""
+    return 'png' if name.lower().endswith('.png') else 'jpg'
+
+
+def variant_name(name, width, ext):
+    """Ruta en el storage de la variante de `name` con ese ancho y formato"""
+    stem = posixpath.splitext(name)[0]
+    return f'{VARIANTS_DIR}/{stem}-{width}w.{ext}'
+
+
+def variant_names(name):
+    """Todas las variantes de `name`"""
+    return [
+        variant_name(name, width, ext)
+        for width in variant_widths()
+        for ext in ('webp', fallback_format(name))
+    ]
+
+
+def variants_exist(name):
+    """True si todas las variantes de `name` están en el storage"""
+    return all(default_storage.exists(variant) for variant in variant_names(name))
+
+
+def _cache_key(name):
+    return f'store:image_variants:{name}'
+
+
+def _encode(image, ext):
+    format_name, options = FORMATS[ext]
+    if format_name == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+        image = image.convert('RGBA')
+    buffer = BytesIO()
+    image.save(buffer, format_name, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def generate_variants(name, storage=None):
+    """
+    Genera (o reemplaza) las variantes de `name`. Regresa False si el
+    original no existe o no es una imagen; el error queda en el log.
+    """
+    storage = storage or default_storage
+    try:
+        with storage.open(name, 'rb') as original:
+            with Image.open(original) as image:
+                # Fotos de celular: aplicar la rotación de EXIF antes de reducir
+                image = ImageOps.exif_transpose(image)
+                image.load()
+    except (OSError, UnidentifiedImageError) as e:
+        logger.warning('No se pudieron generar variantes de %s: %s', name, e)
+        cache.set(_cache_key(name), False, FAILED_RETRY_SECONDS)
+        return False
+
+    for width in variant_widths():
+        resized = image.copy()
+        # Solo reduce: una imagen más angosta conserva su tamaño
+        resized.thumbnail((width, image.height), Image.LANCZOS)
+        for ext in ('webp', fallback_format(name)):
+            target = variant_name(name, width, ext)
+            if storage.exists(target):
+                storage.delete(target)
+            storage.save(target, _encode(resized, ext))
+    cache.set(_cache_key(name), True, None)
+    return True
+
+
+def queue_variants(name):
+    """
+    Encola la generación de las variantes de `name` (tarea de runworker;
+    no se duplica si ya está en la cola). Mientras tanto se muestra el
+    original.
+    """
+    cache.set(_cache_key(name), False, MISSING_RECHECK_SECONDS)
+    enqueue('store.tasks.generate_image_variants', name)
+
+
+def variants_ready(name):
+    """
+    True si las variantes de `name` están listas; si no, la petición usa
+    el original. No encola nada. Con la caché fría revisa un solo archivo:
+    generate_variants escribe al final la variante más grande.
+    """
+    ready = cache.get(_cache_key(name))
+    if ready is None:
+        ready = default_storage.exists(variant_names(name)[-1])
+        cache.set(_cache_key(name), ready, None if ready else MISSING_RECHECK_SECONDS)
+    return ready
+
+
+def delete_variants(name):
+    """Borra las variantes de `name` (imagen reemplazada o registro eliminado)"""
+    for variant in variant_names(name):
+        if default_storage.exists(variant):
+            default_storage.delete(variant)
+    cache.delete(_cache_key(name))
+
+
+def srcset(name, ext):
+    """'url 80w, url 160w, ...' de las variantes de `name` en ese formato"""
+    return ', '.join(
+        f'{default_storage.url(variant_name(name, width, ext))} {width}w'
+        for width in variant_widths()
+    )
+
+
+def image_sources(name, width=None):
+    """
+    Datos para <picture>: {'webp_srcset', 'srcset', 'src'}; `src` es la
+    variante más chica que cubre `width` (o la más grande). None si las
+    variantes no están disponibles.
+    """
+    if not variants_ready(name):
+        return None
+    widths = variant_widths()
+    src_width = next((w for w in widths if width and w >= width), widths[-1])
+    ext = fallback_format(name)
+    return {
+        'webp_srcset': srcset(name, 'webp'),
+        'srcset': srcset(name, ext),
+        'src': default_storage.url(variant_name(name, src_width, ext)),
+    }
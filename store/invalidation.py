@@ -0,0 +1,174 @@
+# store/invalidation.py - Versiones del catálogo para invalidar cachés
+"""
+Cada caché que depende de productos o categorías (páginas del catálogo,
+catálogo del punto de venta, sugerencias del buscador) necesitaba su
+propia invalidación, conectada a las señales y repetida en cada update()
+masivo que no las dispara. Este módulo es el único punto de entrada.
+
+Se guardan contadores monótonos en la caché compartida, uno por ámbito:
+
+- PRODUCT: datos de algún producto (nombre, precio, activo, imagen...)
+- CATEGORY: alguna categoría (la lista de categorías, su nombre, activa)
+- STOCK: el stock de algún producto (ventas, apartados, ajustes)
+- category_scope(id): cualquier cambio en esa categoría o sus productos
+- ORDER: órdenes y sus acumulados de ventas (indicadores del dashboard)
+
+changed(entity, product_ids, category_ids) sube el contador de la
+entidad y el de cada categoría afectada (si solo se dan productos, sus
+categorías se leen con una consulta). Sin ids se trata como un cambio
+de todo el catálogo y además sube ALL, que forma parte de todas las
+llaves (ORDER no usa ids ni sube ALL). Las señales de signals.py lo
+llaman en cada save()/delete(); los update() masivos (ventas, stock) lo
+llaman explícitamente.
+
+Los consumidores pueden:
+
+- derivar su llave de caché con cache_key(prefijo, *ámbitos): al subir
+  la versión nadie vuelve a leer las entradas viejas y caducan solas;
+  como los contadores están en la caché compartida, todos los workers de
+  gunicorn ven la versión nueva sin vaciar nada.
+- suscribirse a la señal `catalog_changed` (sender=entidad, product_ids,
+  category_ids) para lo que no sea una llave (p. ej. marcar un índice en
+  memoria como viejo).
+
+Dentro de una transacción la versión sube de inmediato y otra vez al
+confirmarla, así una lectura concurrente no deja guardado lo de antes
+con la versión nueva. Con `batch()` (context manager o decorador de las
+vistas del panel) los cambios se juntan y se aplican una vez al final:
+borrar una categoría con cien productos sube cada contador una sola vez.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.dispatch import Signal
+
+from .models import Product
+
+PRODUCT = 'product'
+CATEGORY = 'category'
+STOCK = 'stock'
+ORDER = 'order'
+ALL = 'all'
+CATALOG = (PRODUCT, CATEGORY, STOCK)
+
+# sender=entidad; product_ids y category_ids son conjuntos (None: todo)
+catalog_changed = Signal()
+
+_pending = threading.local()
+
+
+def category_scope(category_id):
+    """Ámbito de una categoría y sus productos"""
+    return f'category:{category_id}'
+
+
+def _version_key(scope):
+    return f'store:version:{scope}'
+
+
+def versions(*scopes):
+    """Versión actual de cada ámbito (una lectura de la caché)"""
+    keys = [_version_key(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        # Caché vacía o contador desalojado: empezar en un valor que no se
+        # haya usado antes (milisegundos) para no reutilizar llaves viejas
+        seed = int(time.time() * 1000)
+        for key in missing:
+            cache.add(key, seed, None)
+        found.update(cache.get_many(missing))
+    return tuple(found.get(key, 0) for key in keys)
+
+
+def version(scope):
+    """Versión actual de un ámbito"""
+    return versions(scope)[0]
+
+
+def cache_key(prefix, *scopes):
+    """Llave `prefix:v1.v2...` que cambia cuando cambia cualquiera de los ámbitos"""
+    return cache_keys({prefix: (prefix, scopes)})[prefix]
+
+
+def cache_keys(entries):
+    """cache_key() de varias llaves {nombre: (prefijo, ámbitos)} con una sola lectura"""
+    scopes = [ALL, *sorted({scope for _, entry_scopes in entries.values() for scope in entry_scopes})]
+    current = dict(zip(scopes, versions(*scopes)))
+    return {
+        name: f'{prefix}:' + '.'.join(str(current[scope]) for scope in (ALL, *entry_scopes))
+        for name, (prefix, entry_scopes) in entries.items()
+    }
+
+
+def _bump(scopes):
+    for scope in scopes:
+        try:
+            cache.incr(_version_key(scope))
+        except ValueError:
+            versions(scope)
+
+
+def _apply(changes):
+    """Sube los contadores y avisa a los suscriptores; {entidad: (productos, categorías)}"""
+    scopes = set()
+    for entity, (product_ids, category_ids) in changes.items():
+        scopes.add(entity)
+        if entity == ORDER:
+            continue
+        if category_ids is None:
+            scopes.add(ALL)
+        else:
+            scopes.update(category_scope(category_id) for category_id in category_ids)
+    _bump(scopes)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _bump(scopes))
+    for entity, (product_ids, category_ids) in changes.items():
+        catalog_changed.send(sender=entity, product_ids=product_ids, category_ids=category_ids)
+
+
+def _merge(current, product_ids, category_ids):
+    if current is None:
+        return product_ids, category_ids
+    merged_products = None if current[0] is None or product_ids is None else current[0] | product_ids
+    merged_categories = None if current[1] is None or category_ids is None else current[1] | category_ids
+    return merged_products, merged_categories
+
+
+def changed(entity, product_ids=None, category_ids=None):
+    """
+    Registra un cambio de `entity` (PRODUCT, CATEGORY, STOCK u ORDER). Con
+    product_ids y sin category_ids las categorías se buscan; sin ninguno
+    de los dos se invalida todo el catálogo.
+    """
+    if product_ids is not None:
+        product_ids = set(product_ids)
+        if category_ids is None:
+            category_ids = Product.objects.filter(id__in=product_ids).values_list('category_id', flat=True)
+    if category_ids is not None:
+        category_ids = set(category_ids)
+
+    pending = getattr(_pending, 'changes', None)
+    if pending is not None:
+        pending[entity] = _merge(pending.get(entity), product_ids, category_ids)
+    else:
+        _apply({entity: (product_ids, category_ids)})
+
+
+@contextmanager
+def batch():
+    """Junta los cambios del bloque y los aplica una vez al salir"""
+    if getattr(_pending, 'changes', None) is not None:
+        # Anidado: aplica el bloque exterior
+        yield
+        return
+    _pending.changes = {}
+    try:
+        yield
+    finally:
+        changes, _pending.changes = _pending.changes, None
+        if changes:
+            _apply(changes)
@@ -0,0 +1,79 @@
+# store/inventory.py - Reservas de stock para el punto de venta
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import Product, StockHold
+
+
+def hold_seconds():
+    """Duración de un apartado de stock; 0 desactiva los apartados"""
+    return getattr(settings, 'POS_STOCK_HOLD_SECONDS', 0)
+
+
+def held_quantities(product_ids, exclude_session=None):
+    """Unidades apartadas (vigentes) por producto, sin contar la sesión indicada"""
+    holds = StockHold.objects.filter(
+        product_id__in=list(product_ids),
+        expires_at__gt=timezone.now()
+    )
+    if exclude_session:
+        holds = holds.exclude(session_key=exclude_session)
+
+    return {
+        row['product_id']: row['held']
+        for row in holds.values('product_id').annotate(held=Sum('quantity'))
+    }
+
+
+def available_stock(product, exclude_session=None):
+    """Stock que la sesión puede vender: stock físico menos apartados de otras cajas"""
+    held = held_quantities([product.id], exclude_session).get(product.id, 0)
+    return max(product.stock - held, 0)
+
+
+def hold_stock(product, session_key, quantity):
+    """
+    Aparta `quantity` unidades del producto para la sesión de la caja.
+    Regresa la cantidad realmente apartada (limitada al stock disponible).
+    """
+    if hold_seconds() <= 0 or not session_key:
+        return max(min(quantity, product.stock), 0)
+
+    with transaction.atomic():
+        # Bloquear el producto serializa solo los apartados de ese producto
+        locked = Product.objects.select_for_update().only('id', 'stock').get(id=product.id)
+        quantity = max(min(quantity, available_stock(locked, session_key)), 0)
+
+        if quantity > 0:
+            StockHold.objects.update_or_create(
+                product_id=product.id,
+                session_key=session_key,
+                defaults={
+                    'quantity': quantity,
+                    'expires_at': timezone.now() + timedelta(seconds=hold_seconds()),
+                }
+            )
+        else:
+            StockHold.objects.filter(product_id=product.id, session_key=session_key).delete()
+    return quantity
+
+
+def release_holds(session_key, product_ids=None):
+    """Libera los apartados de una sesión (todos o solo los productos indicados)"""
+    if not session_key:
+        return 0
+    holds = StockHold.objects.filter(session_key=session_key)
+    if product_ids is not None:
+        holds = holds.filter(product_id__in=list(product_ids))
+    deleted, _ = holds.delete()
+    return deleted
+
+
+def expire_holds():
+    """Elimina los apartados vencidos; regresa cuántos se borraron"""
+    deleted, _ = StockHold.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
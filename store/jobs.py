@@ -0,0 +1,271 @@
+# store/jobs.py - Cola de tareas en segundo plano sobre la base de datos
+"""
+Las tareas son funciones marcadas con @task (ver store/tasks.py). Se
+encolan con `func.enqueue(*args, **kwargs)`: se inserta una fila en la
+tabla jobs (dentro de la transacción en curso, así que una venta o un
+guardado que hace rollback no deja tareas huérfanas) y la petición
+regresa de inmediato. Los argumentos deben ser serializables a JSON.
+
+`python manage.py runworker` ejecuta las tareas con un grupo de hilos (y
+opcionalmente varios procesos). Cada hilo reclama una tarea con un
+UPDATE condicional (WHERE status = 'pending'): solo un hilo gana aunque
+varios la vean, en cualquier base de datos y sin SELECT ... FOR UPDATE.
+
+Una tarea que lanza una excepción se reintenta con espera exponencial
+hasta max_attempts; después queda como 'failed' con el traceback.
+
+Mientras un worker está vivo renueva locked_at de sus tareas en curso
+cada tercio de JOBS_STALE_SECONDS (heartbeat), así una tarea larga
+(acumulados de millones de órdenes) no se toma por abandonada. Las que
+llevan más de JOBS_STALE_SECONDS sin renovarse (el worker murió) vuelven
+a la cola. El resultado solo se guarda si la tarea sigue a nombre del
+hilo que la corrió.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, OperationalError, close_old_connections, connection
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger('store.jobs')
+
+
+def task(max_attempts=3, retry_delay=30, unique=False):
+    """
+    Marca una función como tarea. `retry_delay` son los segundos antes del
+    primer reintento (se duplican en cada intento). Con `unique` no se
+    encola si ya hay una igual (mismos argumentos) pendiente o en curso.
+    """
+    def decorator(func):
+        func.task_name = f'{func.__module__}.{func.__qualname__}'
+        func.max_attempts = max_attempts
+        func.retry_delay = retry_delay
+        func.unique = unique
+        func.enqueue = lambda *args, **kwargs: enqueue(func, *args, **kwargs)
+        return func
+    return decorator
+
+
+def enqueue(func, *args, **kwargs):
+    """
+    Agrega `func(*args, **kwargs)` a la cola; `func` es la tarea o su ruta.
+    Regresa el Job (el que ya estaba, si la tarea es `unique`).
+    """
+    if isinstance(func, str):
+        func = import_string(func)
+    if not hasattr(func, 'task_name'):
+        raise ValueError(f'{func!r} no es una tarea (falta @task)')
+    if func.unique:
+        # Sin bloqueo: dos encolados simultáneos aún pueden duplicarla
+        queued = Job.objects.filter(
+            task=func.task_name, args=list(args), kwargs=kwargs, status__in=[Job.PENDING, Job.RUNNING]
+        ).first()
+        if queued is not None:
+            return queued
+    return Job.objects.create(
+        task=func.task_name,
+        args=list(args),
+        kwargs=kwargs,
+        max_attempts=func.max_attempts,
+    )
+
+
+def claim_next(worker_id):
+    """Reclama la siguiente tarea lista para este hilo; None si no hay"""
+    now = timezone.now()
+    candidates = Job.objects.filter(
+        status=Job.PENDING, run_at__lte=now
+    ).order_by('run_at', 'id').values_list('id', flat=True)[:10]
+    for job_id in candidates:
+        claimed = Job.objects.filter(pk=job_id, status=Job.PENDING).update(
+            status=Job.RUNNING, locked_by=worker_id, locked_at=now, attempts=F('attempts') + 1
+        )
+        if claimed:
+            return Job.objects.get(pk=job_id)
+    return None
+
+
+# Intentos para guardar el resultado de una tarea si la tabla está bloqueada
+RECORD_ATTEMPTS = 5
+
+
+def _record(job, **changes):
+    """
+    Guarda el estado final de una tarea, solo si sigue a nombre de este
+    hilo (si se dio por abandonada, otro hilo puede estar corriéndola).
+    Un bloqueo momentáneo (deadlock de InnoDB, tabla bloqueada en SQLite)
+    se reintenta: si se perdiera, la tarea quedaría en 'running' hasta
+    JOBS_STALE_SECONDS y se repetiría.
+    """
+    for attempt in range(RECORD_ATTEMPTS):
+        try:
+            updated = Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(**changes)
+            if not updated:
+                logger.warning('Tarea %s #%s ya no es de %s; no se guarda su resultado',
+                               job.task, job.pk, job.locked_by)
+            return updated
+        except OperationalError:
+            if attempt == RECORD_ATTEMPTS - 1:
+                raise
+            time.sleep(0.05 * 2 ** attempt)
+
+
+def _jsonable(value):
+    try:
+        return json.loads(json.dumps(value, cls=DjangoJSONEncoder))
+    except (TypeError, ValueError):
+        return repr(value)
+
+
+def execute(job):
+    """Corre una tarea reclamada y guarda el resultado o el error"""
+    func = None
+    try:
+        func = import_string(job.task)
+        result = func(*job.args, **job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        now = timezone.now()
+        if job.attempts < job.max_attempts:
+            delay = getattr(func, 'retry_delay', 30) * 2 ** (job.attempts - 1)
+            changes = {'status': Job.PENDING, 'run_at': now + timedelta(seconds=delay)}
+        else:
+            changes = {'status': Job.FAILED, 'finished_at': now}
+        _record(job, last_error=error, locked_by=None, locked_at=None, **changes)
+        logger.warning('Tarea %s #%s falló (intento %d de %d)\n%s',
+                       job.task, job.pk, job.attempts, job.max_attempts, error)
+        return False
+    _record(job, status=Job.DONE, result=_jsonable(result), finished_at=timezone.now(), locked_at=None)
+    return True
+
+
+def heartbeat(worker_name):
+    """Renueva locked_at de las tareas que corren los hilos de un worker"""
+    return Job.objects.filter(
+        status=Job.RUNNING, locked_by__startswith=f'{worker_name}#'
+    ).update(locked_at=timezone.now())
+
+
+def requeue_stale():
+    """Regresa a la cola las tareas de workers que murieron; regresa cuántas"""
+    limit = timezone.now() - timedelta(seconds=getattr(settings, 'JOBS_STALE_SECONDS', 600))
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=limit)
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, finished_at=timezone.now(), locked_by=None, locked_at=None,
+        last_error='El worker dejó de responder'
+    )
+    return failed + stale.update(status=Job.PENDING, locked_by=None, locked_at=None)
+
+
+def purge_finished():
+    """Borra las tareas terminadas hace más de JOBS_KEEP_DAYS días"""
+    limit = timezone.now() - timedelta(days=getattr(settings, 'JOBS_KEEP_DAYS', 7))
+    return Job.objects.filter(status=Job.DONE, finished_at__lt=limit).delete()[0]
+
+
+class Worker:
+    """
+    Grupo de `threads` hilos que ejecutan tareas. Con `burst` cada hilo
+    termina cuando ya no hay tareas listas; con un solo hilo corre en el
+    hilo que llama (así lo usan los tests) y el mantenimiento (tareas
+    abandonadas, purga) solo se hace al arrancar.
+    """
+
+    def __init__(self, threads=None, poll_interval=None, name=None):
+        self.threads = threads or getattr(settings, 'JOBS_WORKER_THREADS', 4)
+        self.poll_interval = poll_interval or getattr(settings, 'JOBS_POLL_INTERVAL', 1.0)
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = threading.Event()
+        self.processed = 0
+        self._lock = threading.Lock()
+
+    def stop(self):
+        """Termina después de la tarea en curso de cada hilo"""
+        self.stopping.set()
+
+    def _loop(self, index, burst):
+        worker_id = f'{self.name}#{index}'
+        try:
+            while not self.stopping.is_set():
+                # En el hilo de un test (transacción abierta) no se cierra la conexión
+                if not connection.in_atomic_block:
+                    close_old_connections()
+                try:
+                    job = claim_next(worker_id)
+                except DatabaseError:
+                    # Base de datos caída u ocupada: el hilo sigue vivo y reintenta
+                    logger.exception('No se pudo reclamar una tarea (%s)', worker_id)
+                    self.stopping.wait(self.poll_interval)
+                    continue
+                if job is None:
+                    if burst:
+                        break
+                    self.stopping.wait(self.poll_interval)
+                    continue
+                execute(job)
+                with self._lock:
+                    self.processed += 1
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                connection.close()
+
+    def _heartbeat(self, done):
+        """Hilo que renueva las tareas en curso mientras el worker corre"""
+        interval = getattr(settings, 'JOBS_STALE_SECONDS', 600) / 3
+        try:
+            while not done.wait(interval):
+                try:
+                    close_old_connections()
+                    heartbeat(self.name)
+                except DatabaseError:
+                    logger.exception('No se pudo renovar las tareas de %s', self.name)
+        finally:
+            connection.close()
+
+    def run(self, burst=False):
+        """Ejecuta tareas hasta stop() (o hasta vaciar la cola con `burst`)"""
+        requeue_stale()
+        done = threading.Event()
+        threading.Thread(target=self._heartbeat, args=(done,), daemon=True).start()
+        try:
+            if self.threads == 1:
+                self._loop(0, burst)
+            else:
+                self._run_threads(burst)
+        finally:
+            done.set()
+        return self.processed
+
+    def _run_threads(self, burst):
+        workers = [threading.Thread(target=self._loop, args=(i, burst), daemon=True) for i in range(self.threads)]
+        for worker in workers:
+            worker.start()
+        # Mantenimiento cada mitad de JOBS_STALE_SECONDS, desde el hilo principal
+        interval = getattr(settings, 'JOBS_STALE_SECONDS', 600) / 2
+        next_maintenance = time.monotonic() + interval
+        while not self.stopping.is_set() and any(worker.is_alive() for worker in workers):
+            self.stopping.wait(self.poll_interval)
+            if time.monotonic() >= next_maintenance:
+                close_old_connections()
+                requeue_stale()
+                purge_finished()
+                next_maintenance = time.monotonic() + interval
+        for worker in workers:
+            worker.join()
+
+
+def run_pending():
+    """Ejecuta en este hilo todas las tareas listas; regresa cuántas corrió"""
+    return Worker(threads=1).run(burst=True)
@@ -0,0 +1,719 @@
+# store/loadtest.py - Datos sintéticos de un café y pruebas de carga por ruta
+"""
+generate_cafe() llena la base de datos con un café realista: menú por
+categorías, administradores y vendedores en los grupos de setup_groups,
+y órdenes repartidas en el último año con horas pico y productos más
+vendidos que otros. Las órdenes se insertan por lotes (bulk_create), así
+que se pueden generar millones sin cargarlas en memoria.
+
+run_benchmark() simula clientes concurrentes (un hilo cada uno) que
+recorren las rutas reales de store/urls.py con el cliente de Django,
+sobre la base de datos configurada (SQLite local o el MySQL de prueba),
+y reporta peticiones/s y p50/p95/p99 por escenario. Los resultados se
+guardan en JSON para compararlos entre commits (compare_results).
+
+bench_cart_stores() compara el almacén de carritos del punto de venta
+(store/carts.py) contra el carrito en la sesión de base de datos:
+cambios de carrito por segundo y escrituras a django_session.
+
+bench_asgi() compara gunicorn con workers síncronos contra ASGI con las
+vistas async (store/async_views.py) cuando reportes lentos se mezclan
+con páginas rápidas: cuánto esperan las páginas rápidas detrás de ellos.
+
+Se usan desde `python manage.py generate_cafe_data`,
+`python manage.py bench_routes`, `python manage.py bench_cart_store` y
+`python manage.py bench_asgi`.
+"""
+import asyncio
+import random
+import subprocess
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from asgiref.sync import ThreadSensitiveContext
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User, Group
+from django.core.management import call_command
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .invalidation import CATALOG, changed
+from .models import Category, Product, Order, OrderItem, DailySalesRollup, DailyOrderRollup
+from .order_list import PAYMENT_METHODS
+from .profiling import QUANTILES, quantile
+from .roles import ADMIN_GROUP, SELLER_GROUP
+from .rollups import rebuild_rollups
+from .search import rebuild_search_index
+
+# Menú base: {categoría: [(producto, precio)]}
+CAFE_MENU = {
+    'Café caliente': [
+        ('Americano', 32), ('Espresso', 28), ('Capuchino', 42), ('Latte', 45),
+        ('Moka', 48), ('Café de olla', 35), ('Flat white', 46), ('Macchiato', 38),
+    ],
+    'Bebidas frías': [
+        ('Frappé de café', 55), ('Cold brew', 50), ('Latte helado', 48),
+        ('Té helado', 35), ('Limonada', 30), ('Smoothie de fresa', 52),
+    ],
+    'Tés': [('Té verde', 30), ('Chai latte', 45), ('Manzanilla', 28), ('Matcha latte', 52)],
+    'Pan dulce': [
+        ('Concha', 15), ('Cuerno', 18), ('Oreja', 16), ('Dona glaseada', 20),
+        ('Rol de canela', 28), ('Panqué de plátano', 25), ('Croissant', 30),
+    ],
+    'Salados': [
+        ('Sándwich de jamón', 55), ('Chilaquiles', 75), ('Molletes', 60),
+        ('Bagel con queso crema', 45), ('Panini de pollo', 70), ('Quiche', 58),
+    ],
+    'Postres': [('Pay de queso', 45), ('Brownie', 35), ('Galleta de avena', 18), ('Pastel de chocolate', 50)],
+}
+
+# Variantes con las que se completa el número de productos pedido
+VARIANTS = [
+    ('grande', Decimal('1.2')), ('chico', Decimal('0.85')), ('deslactosado', Decimal('1.1')),
+    ('de temporada', Decimal('1.25')), ('para llevar', Decimal('1.05')), ('doble', Decimal('1.4')),
+]
+
+# Peso de cada hora del día (el café abre de 7 a 21 h)
+HOUR_WEIGHTS = {
+    7: 6, 8: 10, 9: 9, 10: 6, 11: 4, 12: 5, 13: 7, 14: 7,
+    15: 5, 16: 5, 17: 6, 18: 6, 19: 4, 20: 2,
+}
+
+# Lunes a domingo
+WEEKDAY_WEIGHTS = (0.9, 0.9, 0.95, 1.0, 1.15, 1.35, 1.2)
+
+STATUS_WEIGHTS = {'completed': 92, 'pending': 5, 'cancelled': 3}
+PAYMENT_WEIGHTS = {'cash': 60, 'card': 35, 'transfer': 5}
+
+ORDER_PREFIX = 'SIM-'
+# Contraseña de los usuarios generados (para entrar a probar a mano)
+SIM_PASSWORD = 'cafe1234'
+
+
+def _menu(categories, products):
+    """[(categoría, [(nombre, precio)])] con `categories` categorías y `products` productos"""
+    menu = [(name, list(items)) for name, items in CAFE_MENU.items()][:categories]
+    for extra in range(len(menu), categories):
+        menu.append((f'Especialidades {extra - len(CAFE_MENU) + 1}', [(f'Especial {extra}', 40)]))
+
+    base = [(index, name, Decimal(price)) for index, (_, items) in enumerate(menu) for name, price in items]
+    result = [(category, []) for category, _ in menu]
+    for position in range(products):
+        index, name, price = base[position % len(base)]
+        variant = position // len(base)
+        if variant:
+            label, factor = VARIANTS[(variant - 1) % len(VARIANTS)]
+            round_number = (variant - 1) // len(VARIANTS)
+            name = f'{name} {label}' + (f' {round_number + 1}' if round_number else '')
+            price = (price * factor).quantize(Decimal('1'))
+        result[index][1].append((name, price))
+    return result
+
+
+def _create_users(prefix, count, group, password):
+    """Usuarios `{prefix}{n}` en `group`; reutiliza los que ya existen"""
+    usernames = [f'{prefix}{n}' for n in range(1, count + 1)]
+    existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+    User.objects.bulk_create([
+        User(username=username, password=password, first_name=username.replace('_', ' ').title())
+        for username in usernames if username not in existing
+    ])
+    users = list(User.objects.filter(username__in=usernames).order_by('id'))
+    User.groups.through.objects.bulk_create(
+        [User.groups.through(user_id=user.id, group_id=group.id) for user in users],
+        ignore_conflicts=True
+    )
+    return users
+
+
+def _daily_counts(orders, start, days):
+    """Reparte `orders` entre los días según el día de la semana"""
+    weights = [WEEKDAY_WEIGHTS[(start + timedelta(days=day)).weekday()] for day in range(days)]
+    total = sum(weights)
+    counts = [int(orders * weight / total) for weight in weights]
+    for day in range(orders - sum(counts)):
+        counts[day % days] += 1
+    return counts
+
+
+def _save_orders(orders, items_by_order, batch_size):
+    """Inserta un lote de órdenes con sus partidas (created_at es auto_now_add)"""
+    created_at = [order.created_at for order in orders]
+    Order.objects.bulk_create(orders, batch_size=batch_size)
+    if orders[0].pk is None:
+        # MySQL no regresa los ids de bulk_create
+        ids = dict(Order.objects.filter(
+            order_number__in=[order.order_number for order in orders]
+        ).values_list('order_number', 'id'))
+        for order in orders:
+            order.pk = ids[order.order_number]
+    for order, value in zip(orders, created_at):
+        order.created_at = value
+    Order.objects.bulk_update(orders, ['created_at'], batch_size=500)
+
+    items = []
+    for order, lines in zip(orders, items_by_order):
+        for item in lines:
+            item.order_id = order.pk
+            items.append(item)
+    OrderItem.objects.bulk_create(items, batch_size=batch_size)
+    return len(items)
+
+
+def generate_cafe(categories=6, products=120, admins=2, sellers=8, orders=100_000,
+                  max_items=4, days=365, batch_size=2000, seed=0, progress=None):
+    """
+    Genera el café de prueba y regresa cuántas filas creó de cada cosa.
+    `progress(órdenes, total)` se llama después de cada lote.
+
+    Los productos se crean con stock alto para que bench_routes pueda
+    cobrar sin agotarlos. Al terminar reconstruye los acumulados y el
+    índice de búsqueda, e invalida el catálogo del punto de venta.
+    """
+    rng = random.Random(seed)
+    call_command('setup_groups', stdout=StringIO())
+    password = make_password(SIM_PASSWORD)
+    admin_users = _create_users('admin_sim_', admins, Group.objects.get(name=ADMIN_GROUP), password)
+    seller_users = _create_users('vendedor_sim_', sellers, Group.objects.get(name=SELLER_GROUP), password)
+    cashiers = seller_users + admin_users
+
+    catalog = []
+    for category_name, items in _menu(categories, products):
+        category = Category.objects.get_or_create(name=category_name, defaults={
+            'description': f'{category_name} del café',
+        })[0]
+        catalog.extend(Product.objects.bulk_create([
+            Product(
+                name=name,
+                description=f'{name} preparado al momento',
+                category=category,
+                price=price,
+                stock=rng.randint(5_000, 50_000),
+                is_active=True,
+            )
+            for name, price in items
+        ]))
+    if catalog and catalog[0].pk is None:
+        catalog = list(Product.objects.order_by('-id')[:len(catalog)])[::-1]
+
+    # Unos cuantos productos venden mucho más que el resto (Zipf)
+    popularity = [1 / (rank + 1) for rank in range(len(catalog))]
+    rng.shuffle(popularity)
+    hours = list(HOUR_WEIGHTS)
+    hour_weights = list(HOUR_WEIGHTS.values())
+    statuses = list(STATUS_WEIGHTS)
+    status_weights = list(STATUS_WEIGHTS.values())
+    methods = [method for method, _ in PAYMENT_METHODS if method in PAYMENT_WEIGHTS]
+    method_weights = [PAYMENT_WEIGHTS[method] for method in methods]
+
+    tz = timezone.get_current_timezone()
+    first_day = timezone.localdate() - timedelta(days=days - 1)
+    number = Order.objects.filter(order_number__startswith=ORDER_PREFIX).count()
+    created_orders = created_items = 0
+    batch, batch_items = [], []
+
+    for day, count in enumerate(_daily_counts(orders, first_day, days)):
+        date = first_day + timedelta(days=day)
+        moments = sorted(
+            timedelta(hours=hour, seconds=rng.randrange(3600))
+            for hour in rng.choices(hours, hour_weights, k=count)
+        )
+        for moment in moments:
+            number += 1
+            lines = []
+            total = Decimal(0)
+            for product in set(rng.choices(catalog, popularity, k=rng.randint(1, max_items))):
+                quantity = rng.choices((1, 2, 3), (80, 15, 5))[0]
+                subtotal = product.price * quantity
+                lines.append(OrderItem(product=product, quantity=quantity, unit_price=product.price, subtotal=subtotal))
+                total += subtotal
+            method = rng.choices(methods, method_weights)[0]
+            batch.append(Order(
+                order_number=f'{ORDER_PREFIX}{number:09d}',
+                customer=rng.choice(cashiers),
+                total=total,
+                status=rng.choices(statuses, status_weights)[0],
+                payment_method=method,
+                payment_status='completed',
+                payment_received=total if method != 'cash' else total + rng.choice((0, 0, 5, 10, 50)),
+                created_at=timezone.make_aware(datetime.combine(date, datetime.min.time()) + moment, tz),
+            ))
+            batch_items.append(lines)
+            if len(batch) >= batch_size:
+                created_items += _save_orders(batch, batch_items, batch_size)
+                created_orders += len(batch)
+                batch, batch_items = [], []
+                if progress:
+                    progress(created_orders, orders)
+    if batch:
+        created_items += _save_orders(batch, batch_items, batch_size)
+        created_orders += len(batch)
+        if progress:
+            progress(created_orders, orders)
+
+    rebuild_rollups(batch_size=batch_size)
+    rebuild_search_index()
+    # bulk_create no dispara señales: invalidar todo el catálogo
+    for entity in CATALOG:
+        changed(entity)
+    return {
+        'categories': categories,
+        'products': len(catalog),
+        'admins': len(admin_users),
+        'sellers': len(seller_users),
+        'orders': created_orders,
+        'items': created_items,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Pruebas de carga
+# ---------------------------------------------------------------------------
+
+SEARCH_TERMS = ['cafe', 'latte', 'concha', 'te', 'frappe', 'sandwich', 'pastel', 'chai', 'pan', 'moka']
+
+
+class BenchmarkData:
+    """Ids y usuarios que usan los escenarios (se leen una vez antes de empezar)"""
+
+    def __init__(self):
+        self.category_ids = list(Category.objects.filter(is_active=True).values_list('id', flat=True))
+        self.product_ids = list(
+            Product.objects.filter(stock__gt=0, is_active=True).values_list('id', flat=True)
+        )
+        self.seller = User.objects.filter(groups__name=SELLER_GROUP).order_by('id').first()
+        self.admin = User.objects.filter(groups__name=ADMIN_GROUP).order_by('id').first()
+        if not (self.category_ids and self.product_ids and self.seller and self.admin):
+            raise ValueError('Faltan datos: corre primero `python manage.py generate_cafe_data`')
+
+
+def _home(client, data, rng):
+    return client.get(reverse('home'))
+
+
+def _category(client, data, rng):
+    return client.get(reverse('products_by_category', args=[rng.choice(data.category_ids)]))
+
+
+def _search(client, data, rng):
+    return client.get(reverse('search_products'), {'q': rng.choice(SEARCH_TERMS)})
+
+
+def _multi_sale(client, data, rng):
+    return client.get(reverse('multi_sale'))
+
+
+def _checkout(client, data, rng):
+    """Agrega un producto al carrito y cobra (dos peticiones)"""
+    response = client.post(reverse('sale_api_add', args=[rng.choice(data.product_ids)]), {'quantity': 1})
+    if response.status_code >= 400:
+        return response
+    response = client.post(reverse('multi_sale'), {'payment_received': '1000'})
+    if '/receipt/' not in response.get('Location', ''):
+        # El cobro regresó a la pantalla de venta (stock agotado, bloqueo, ...)
+        response.status_code = 409
+    return response
+
+
+def _reports(client, data, rng):
+    today = timezone.localdate()
+    if rng.random() < 0.5:
+        return client.get(reverse('reports'))
+    return client.get(reverse('reports'), {
+        'fecha_inicio': f'{today - timedelta(days=30):%Y-%m-%d}',
+        'fecha_fin': f'{today:%Y-%m-%d}',
+    })
+
+
+def _dashboard(client, data, rng):
+    return client.get(reverse('admin_dashboard'))
+
+
+# {escenario: (rol, función, peso en la mezcla)}
+SCENARIOS = {
+    'home': (None, _home, 20),
+    'products_by_category': (None, _category, 20),
+    'search_products': (None, _search, 15),
+    'multi_sale': (SELLER_GROUP, _multi_sale, 15),
+    'checkout': (SELLER_GROUP, _checkout, 20),
+    'reports': (ADMIN_GROUP, _reports, 5),
+    'admin_dashboard': (ADMIN_GROUP, _dashboard, 5),
+}
+
+
+def _route_stats(samples, errors, elapsed):
+    """Resumen de un escenario; `errors` es un Counter {motivo: veces}"""
+    stats = {
+        'requests': len(samples),
+        'errors': sum(errors.values()),
+        'error_reasons': dict(errors),
+        'rps': round(len(samples) / elapsed, 2) if elapsed else 0,
+    }
+    if samples:
+        stats.update({f'p{int(q * 100)}_ms': round(quantile(samples, q), 2) for q in QUANTILES})
+        stats['mean_ms'] = round(sum(samples) / len(samples), 2)
+        stats['max_ms'] = round(max(samples), 2)
+    return stats
+
+
+def current_commit():
+    """Commit actual del repositorio (None si no hay git)"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(clients=8, duration=30, requests=None, scenarios=None, seed=0):
+    """
+    Corre `clients` clientes simulados durante `duration` segundos (o
+    `requests` peticiones cada uno) y regresa los resultados:
+    {'routes': {escenario: {'requests', 'errors', 'rps', 'p50_ms', ...}}, 'total': {...}}
+
+    Cada cliente elige escenarios al azar según su peso. Los escenarios
+    de venta entran como vendedor y los del panel como administrador; la
+    duración de 'checkout' incluye agregar al carrito y cobrar.
+    Una respuesta 4xx/5xx o una excepción cuenta como error y no entra
+    en los percentiles; 'error_reasons' dice cuántas hubo de cada tipo.
+    'rps' cuenta solo las peticiones exitosas.
+    """
+    names = list(scenarios or SCENARIOS)
+    weights = [SCENARIOS[name][2] for name in names]
+    data = BenchmarkData()
+    samples = {name: [] for name in names}
+    errors = {name: Counter() for name in names}
+    lock = threading.Lock()
+    barrier = threading.Barrier(clients + 1)
+    deadline = []
+
+    def login():
+        sessions = {None: Client(), SELLER_GROUP: Client(), ADMIN_GROUP: Client()}
+        sessions[SELLER_GROUP].force_login(data.seller)
+        sessions[ADMIN_GROUP].force_login(data.admin)
+        return sessions
+
+    def simulate(worker_id, sessions):
+        rng = random.Random(seed * 1000 + worker_id)
+        mine = {name: [] for name in names}
+        failed = {name: Counter() for name in names}
+        try:
+            barrier.wait()
+            done = 0
+            while done < requests if requests is not None else time.perf_counter() < deadline[0]:
+                name = rng.choices(names, weights)[0]
+                role, scenario, _ = SCENARIOS[name]
+                start = time.perf_counter()
+                try:
+                    status = scenario(sessions[role], data, rng).status_code
+                    error = f'HTTP {status}' if status >= 400 else None
+                except Exception as e:
+                    # Bloqueos de SQLite, errores de la vista, ...
+                    error = type(e).__name__
+                if error is None:
+                    mine[name].append((time.perf_counter() - start) * 1000)
+                else:
+                    failed[name][error] += 1
+                done += 1
+        finally:
+            connection.close()
+            with lock:
+                for name in names:
+                    samples[name].extend(mine[name])
+                    errors[name].update(failed[name])
+
+    # El cliente de Django usa el host 'testserver'
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        # Las sesiones se crean antes: un login que falla en un hilo dejaría la barrera esperando
+        workers = [threading.Thread(target=simulate, args=(i, login())) for i in range(clients)]
+        for worker in workers:
+            worker.start()
+        started_at = timezone.now()
+        start = time.perf_counter()
+        deadline.append(start + duration)
+        barrier.wait()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+    all_samples = [sample for name in names for sample in samples[name]]
+    return {
+        'started_at': started_at.isoformat(),
+        'commit': current_commit(),
+        'database': connection.vendor,
+        'clients': clients,
+        'elapsed_s': round(elapsed, 2),
+        'routes': {name: _route_stats(samples[name], errors[name], elapsed) for name in names},
+        'total': _route_stats(all_samples, sum(errors.values(), Counter()), elapsed),
+    }
+
+
+def compare_results(before, after):
+    """
+    Diferencias entre dos corridas: [(escenario, campo, antes, después, cambio %)]
+    para rps, p50_ms, p95_ms y p99_ms de cada escenario presente en ambas.
+    """
+    rows = []
+    routes = dict(after['routes'], TOTAL=after['total'])
+    previous = dict(before['routes'], TOTAL=before['total'])
+    for name, stats in routes.items():
+        if name not in previous:
+            continue
+        for field in ('rps', 'p50_ms', 'p95_ms', 'p99_ms'):
+            old, new = previous[name].get(field), stats.get(field)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old * 100 if old else 0.0
+            rows.append((name, field, old, new, round(change, 1)))
+    return rows
+
+
+CART_STORES = {
+    'cache': 'store.carts.CacheCartStore',
+    'session': 'store.carts.SessionCartStore',
+}
+
+_WRITE = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def _cart_update(client, data, rng):
+    """Un cambio de carrito como los de la pantalla de venta"""
+    product_id = rng.choice(data.product_ids)
+    action = rng.random()
+    if action < 0.6:
+        return client.post(reverse('sale_api_add', args=[product_id]), {'quantity': 1})
+    if action < 0.9:
+        return client.post(reverse('sale_api_set', args=[product_id]), {'quantity': rng.randint(0, 3)})
+    return client.post(reverse('sale_api_remove', args=[product_id]))
+
+
+def bench_cart_stores(stores=None, registers=4, updates=200, seed=0):
+    """
+    Hace `updates` cambios de carrito (agregar, fijar cantidad, quitar) por
+    cada almacén de `stores` (nombres de CART_STORES), repartidos entre
+    `registers` cajas con su propia sesión. Regresa por almacén:
+    {'updates', 'errors', 'updates_per_s', 'p50_ms', 'p95_ms',
+     'session_writes', 'session_writes_per_update', 'db_writes_per_update'}
+
+    Las peticiones van en un solo hilo: se mide el costo de cada escritura
+    y no la espera por bloqueos de SQLite.
+    """
+    data = BenchmarkData()
+    results = {}
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        for name in stores or CART_STORES:
+            rng = random.Random(seed)
+            with override_settings(POS_CART_BACKEND=CART_STORES[name]):
+                clients = [Client() for _ in range(registers)]
+                for client in clients:
+                    client.force_login(data.seller)
+
+                latencies = []
+                errors = session_writes = db_writes = 0
+                start = time.perf_counter()
+                for number in range(updates):
+                    with CaptureQueriesContext(connection) as ctx:
+                        begin = time.perf_counter()
+                        response = _cart_update(clients[number % registers], data, rng)
+                        latencies.append((time.perf_counter() - begin) * 1000)
+                    errors += response.status_code >= 400
+                    writes = [q['sql'] for q in ctx.captured_queries if q['sql'].lstrip().upper().startswith(_WRITE)]
+                    db_writes += len(writes)
+                    session_writes += sum('django_session' in sql for sql in writes)
+                elapsed = time.perf_counter() - start
+
+                for client in clients:
+                    client.post(reverse('sale_api_clear'))
+
+            results[name] = {
+                'updates': updates,
+                'errors': errors,
+                'updates_per_s': round(updates / elapsed, 1) if elapsed else 0.0,
+                'p50_ms': round(quantile(latencies, 0.5), 2),
+                'p95_ms': round(quantile(latencies, 0.95), 2),
+                'session_writes': session_writes,
+                'session_writes_per_update': round(session_writes / updates, 2),
+                'db_writes_per_update': round(db_writes / updates, 2),
+            }
+    return results
+
+
+# Tráfico de bench_asgi: reportes lentos (panel) mezclados con páginas rápidas
+SLOW_SCENARIOS = ('reports', 'admin_dashboard')
+FAST_SCENARIOS = ('home', 'products_by_category', 'search_products')
+SERVER_MODES = ('wsgi', 'asgi')
+
+
+class _SlowReportQueries:
+    """
+    execute_wrapper que simula un MySQL cargado: duerme `delay_ms` antes
+    de cada consulta a las tablas de ventas (órdenes y acumulados). Se pone
+    en cada conexión que se abre mientras corre la medición (cada hilo
+    tiene la suya).
+    """
+
+    def __init__(self, delay_ms):
+        self.delay = delay_ms / 1000
+        self.tables = {Order._meta.db_table, DailySalesRollup._meta.db_table, DailyOrderRollup._meta.db_table}
+        self.enabled = True
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.enabled and self.delay and any(table in sql for table in self.tables):
+            time.sleep(self.delay)
+        return execute(sql, params, many, context)
+
+    def install(self, sender=None, connection=None, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+
+def _traffic(rng, slow_ratio):
+    names = SLOW_SCENARIOS if rng.random() < slow_ratio else FAST_SCENARIOS
+    return rng.choice(names)
+
+
+def _errors_of(errors, names):
+    """Counter {motivo: veces} de los escenarios `names`; `errors` es {(escenario, motivo): veces}"""
+    found = Counter()
+    for (name, reason), count in errors.items():
+        if name in names:
+            found[reason] += count
+    return found
+
+
+def _mode_stats(samples, errors, elapsed):
+    """{'fast': ..., 'slow': ..., 'total': ...} con las estadísticas de _route_stats"""
+    return {
+        'fast': _route_stats([ms for name, ms in samples if name in FAST_SCENARIOS],
+                             _errors_of(errors, FAST_SCENARIOS), elapsed),
+        'slow': _route_stats([ms for name, ms in samples if name in SLOW_SCENARIOS],
+                             _errors_of(errors, SLOW_SCENARIOS), elapsed),
+        'total': _route_stats([ms for _, ms in samples], _errors_of(errors, SCENARIOS), elapsed),
+    }
+
+
+def _run_wsgi(data, clients, requests, workers, slow_ratio, seed):
+    """`workers` procesos síncronos (un semáforo): cada petición espera a que haya uno libre"""
+    free_workers = threading.Semaphore(workers)
+    samples = []
+    errors = Counter()
+    lock = threading.Lock()
+
+    def login():
+        sessions = {None: Client(), ADMIN_GROUP: Client()}
+        sessions[ADMIN_GROUP].force_login(data.admin)
+        return sessions
+
+    def simulate(client_id, sessions):
+        rng = random.Random(seed * 1000 + client_id)
+        try:
+            for _ in range(requests):
+                name = _traffic(rng, slow_ratio)
+                role, scenario, _ = SCENARIOS[name]
+                start = time.perf_counter()
+                try:
+                    with free_workers:
+                        status = scenario(sessions[role], data, rng).status_code
+                    error = f'HTTP {status}' if status >= 400 else None
+                except Exception as e:
+                    error = type(e).__name__
+                with lock:
+                    if error is None:
+                        samples.append((name, (time.perf_counter() - start) * 1000))
+                    else:
+                        errors[(name, error)] += 1
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=simulate, args=(i, login())) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, errors, time.perf_counter() - start
+
+
+def _run_asgi(data, clients, requests, slow_ratio, seed):
+    """Un solo event loop con las vistas async; cada petición con su hilo, como ASGIHandler"""
+    samples = []
+    errors = Counter()
+
+    sessions = []
+    for _ in range(clients):
+        admin = AsyncClient()
+        admin.force_login(data.admin)
+        sessions.append({None: AsyncClient(), ADMIN_GROUP: admin})
+
+    async def simulate(client_id):
+        rng = random.Random(seed * 1000 + client_id)
+        for _ in range(requests):
+            name = _traffic(rng, slow_ratio)
+            role, scenario, _ = SCENARIOS[name]
+            start = time.perf_counter()
+            try:
+                async with ThreadSensitiveContext():
+                    status = (await scenario(sessions[client_id][role], data, rng)).status_code
+                error = f'HTTP {status}' if status >= 400 else None
+            except Exception as e:
+                error = type(e).__name__
+            if error is None:
+                samples.append((name, (time.perf_counter() - start) * 1000))
+            else:
+                errors[(name, error)] += 1
+
+    async def main():
+        await asyncio.gather(*(simulate(i) for i in range(clients)))
+
+    start = time.perf_counter()
+    # Hilo aparte: el cliente puede llamarse desde un contexto que ya tiene event loop
+    runner = threading.Thread(target=asyncio.run, args=(main(),))
+    runner.start()
+    runner.join()
+    return samples, errors, time.perf_counter() - start
+
+
+def bench_asgi(modes=None, clients=16, requests=10, workers=2, slow_ratio=0.2, slow_ms=50, seed=0):
+    """
+    Compara el despliegue WSGI (gunicorn con `workers` procesos síncronos)
+    contra ASGI (un worker con las vistas de async_views.py) con tráfico
+    mezclado: `clients` clientes concurrentes hacen `requests` peticiones
+    cada uno; `slow_ratio` de ellas son reportes/dashboard cuyas consultas
+    a las tablas de ventas tardan `slow_ms` de más, el resto son home,
+    categorías y búsqueda (anónimas).
+
+    Regresa {modo: {'fast': stats, 'slow': stats, 'total': stats}} con las
+    estadísticas de _route_stats; la latencia incluye la espera por un
+    worker libre. Todo corre en este proceso: los workers WSGI son hilos
+    limitados por un semáforo, no procesos.
+    """
+    data = BenchmarkData()
+    slow = _SlowReportQueries(slow_ms)
+    results = {}
+    connection_created.connect(slow.install)
+    slow.install(connection=connection)
+    try:
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for mode in modes or SERVER_MODES:
+                if mode == 'wsgi':
+                    samples, errors, elapsed = _run_wsgi(data, clients, requests, workers, slow_ratio, seed)
+                else:
+                    with override_settings(ROOT_URLCONF='store.async_urls'):
+                        samples, errors, elapsed = _run_asgi(data, clients, requests, slow_ratio, seed)
+                results[mode] = _mode_stats(samples, errors, elapsed)
+    finally:
+        slow.enabled = False
+        connection_created.disconnect(slow.install)
+        connection.execute_wrappers.remove(slow)
+    return results
@@ -0,0 +1,43 @@
+# store/management/commands/audit_query_plans.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from store.query_audit import EXPLAIN_VENDORS, seed_dataset, audit_views, isolated_cache
+
+
+class Command(BaseCommand):
+    help = ('Corre EXPLAIN sobre las consultas de cada vista con datos de prueba '
+            'y falla si alguna recorre una tabla completa')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=200, help='Productos de prueba')
+        parser.add_argument('--orders', type=int, default=2000, help='Órdenes de prueba')
+        parser.add_argument('--noinput', '--no-input', action='store_false', dest='interactive',
+                            help='Borrar sin preguntar una base de datos de prueba anterior')
+
+    def handle(self, *args, **options):
+        if connection.vendor not in EXPLAIN_VENDORS:
+            raise CommandError(
+                f'La revisión no sabe leer EXPLAIN de {connection.vendor}; '
+                f'se puede correr con {", ".join(EXPLAIN_VENDORS)}'
+            )
+        # Igual que `manage.py test`: base de datos de prueba nueva, se borra al terminar
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=not options['interactive'])
+        try:
+            # Sin tocar la caché compartida: las llaves de los datos de prueba
+            # coincidirían con las versiones vigentes del servidor
+            with isolated_cache():
+                admin = seed_dataset(products=options['products'], orders=options['orders'])
+                problems = audit_views(admin)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        for name, url, table, sql in problems:
+            self.stdout.write(self.style.ERROR(f'✗ {name} ({url}) recorre {table}'))
+            self.stdout.write(f'    {sql}')
+        if problems:
+            raise CommandError(f'{len(problems)} consultas recorren tablas completas')
+        self.stdout.write(self.style.SUCCESS('✓ Ninguna vista recorre tablas completas'))
@@ -0,0 +1,67 @@
+# store/management/commands/bench_asgi.py
+import json
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+from store.loadtest import SERVER_MODES, bench_asgi
+
+
+class Command(BaseCommand):
+    help = ('Compara gunicorn con workers síncronos (WSGI) contra las vistas async (ASGI) '
+            'con reportes lentos mezclados con páginas rápidas')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=16, help='Clientes concurrentes')
+        parser.add_argument('--requests', type=int, default=10, help='Peticiones por cliente')
+        parser.add_argument('--workers', type=int, default=2, help='Workers síncronos del modo WSGI')
+        parser.add_argument('--slow-ratio', type=float, default=0.2,
+                            help='Fracción de peticiones a reportes y dashboard (0 a 1)')
+        parser.add_argument('--slow-ms', type=float, default=50,
+                            help='Milisegundos extra por consulta a las tablas de ventas')
+        parser.add_argument('--mode', action='append', choices=list(SERVER_MODES),
+                            help='Modo a medir (se puede repetir; por omisión ambos)')
+        parser.add_argument('--seed', type=int, default=0, help='Semilla de la mezcla de peticiones')
+        parser.add_argument('--output', help='Guardar los resultados en este archivo JSON')
+
+    def handle(self, *args, **options):
+        if options['clients'] < 1 or options['requests'] < 1 or options['workers'] < 1:
+            raise CommandError('--clients, --requests y --workers deben ser mayores que cero')
+        if not 0 <= options['slow_ratio'] <= 1:
+            raise CommandError('--slow-ratio debe estar entre 0 y 1')
+        # Los errores ya quedan contados por motivo; sin -v 2 no se imprime cada traceback
+        if options['verbosity'] < 2:
+            logging.disable(logging.ERROR)
+        try:
+            results = bench_asgi(
+                modes=options['mode'],
+                clients=options['clients'],
+                requests=options['requests'],
+                workers=options['workers'],
+                slow_ratio=options['slow_ratio'],
+                slow_ms=options['slow_ms'],
+                seed=options['seed'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        finally:
+            logging.disable(logging.NOTSET)
+
+        self.stdout.write(f'{"Modo":<6} {"Tráfico":<8} {"Pet.":>6} {"Err.":>5} {"Pet./s":>8} '
+                          f'{"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9}')
+        for mode, groups in results.items():
+            for group in ('fast', 'slow', 'total'):
+                stats = groups[group]
+                self.stdout.write(
+                    f'{mode:<6} {group:<8} {stats["requests"]:>6} {stats["errors"]:>5} {stats["rps"]:>8.1f} '
+                    f'{stats.get("p50_ms", 0):>9.1f} {stats.get("p95_ms", 0):>9.1f} {stats.get("p99_ms", 0):>9.1f}'
+                )
+        if {'wsgi', 'asgi'} <= set(results) and results['asgi']['fast'].get('p95_ms'):
+            ratio = results['wsgi']['fast'].get('p95_ms', 0) / results['asgi']['fast']['p95_ms']
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ p95 de las páginas rápidas: {ratio:.2f}× menor con ASGI'
+            ))
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f'Resultados guardados en {options["output"]}')
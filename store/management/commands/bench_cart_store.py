@@ -0,0 +1,44 @@
+# store/management/commands/bench_cart_store.py
+from django.core.management.base import BaseCommand, CommandError
+from store.loadtest import CART_STORES, bench_cart_stores
+
+
+class Command(BaseCommand):
+    help = ('Compara el almacén de carritos del punto de venta contra el carrito en la sesión '
+            '(cambios por segundo y escrituras a django_session)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--updates', type=int, default=500, help='Cambios de carrito por almacén')
+        parser.add_argument('--registers', type=int, default=4, help='Cajas (sesiones) simuladas')
+        parser.add_argument('--store', action='append', choices=list(CART_STORES),
+                            help='Almacén a medir (se puede repetir; por omisión todos)')
+        parser.add_argument('--seed', type=int, default=0, help='Semilla de la secuencia de cambios')
+
+    def handle(self, *args, **options):
+        if options['updates'] < 1 or options['registers'] < 1:
+            raise CommandError('--updates y --registers deben ser mayores que cero')
+        try:
+            results = bench_cart_stores(
+                stores=options['store'],
+                registers=options['registers'],
+                updates=options['updates'],
+                seed=options['seed'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f'{"Almacén":<10} {"Cambios":>8} {"Err.":>5} {"Cambios/s":>10} {"p50 ms":>8} '
+                          f'{"p95 ms":>8} {"Escr. sesión":>13} {"Escr. BD/cambio":>16}')
+        for name, stats in results.items():
+            self.stdout.write(
+                f'{name:<10} {stats["updates"]:>8} {stats["errors"]:>5} {stats["updates_per_s"]:>10.1f} '
+                f'{stats["p50_ms"]:>8.2f} {stats["p95_ms"]:>8.2f} {stats["session_writes"]:>13} '
+                f'{stats["db_writes_per_update"]:>16.2f}'
+            )
+        if 'cache' in results and 'session' in results and results['session']['updates_per_s']:
+            ratio = results['cache']['updates_per_s'] / results['session']['updates_per_s']
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ El almacén en caché hace {ratio:.2f}× los cambios por segundo y '
+                f'{results["session"]["session_writes"] - results["cache"]["session_writes"]} '
+                f'escrituras menos a django_session'
+            ))
@@ -0,0 +1,86 @@
+# store/management/commands/bench_order_numbers.py
+import inspect
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, IntegrityError, OperationalError
+from django.utils.module_loading import import_string
+from store.models import Order
+
+
+class Command(BaseCommand):
+    help = 'Mide inserciones de órdenes por segundo con cobros en paralelo y cuenta colisiones de order_number'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Cajas (hilos) en paralelo')
+        parser.add_argument('--orders', type=int, default=500, help='Órdenes por hilo')
+        parser.add_argument(
+            '--generator',
+            default='store.order_numbers.SequenceBlockGenerator',
+            help='Ruta a la clase generadora (una instancia por hilo, como un worker)'
+        )
+        parser.add_argument('--keep', action='store_true', help='No borrar las órdenes de prueba')
+
+    def handle(self, *args, **options):
+        generator_class = import_string(options['generator'])
+        threads = options['threads']
+        per_thread = options['orders']
+        stats = {'inserted': 0, 'collisions': 0, 'retries': 0}
+        lock = threading.Lock()
+        barrier = threading.Barrier(threads)
+
+        def register(worker_id):
+            # Cada hilo simula un worker de gunicorn con su propio generador
+            if 'worker_id' in inspect.signature(generator_class).parameters:
+                generator = generator_class(worker_id=worker_id)
+            else:
+                generator = generator_class()
+            inserted = collisions = retries = 0
+            try:
+                barrier.wait()
+                for _ in range(per_thread):
+                    while True:
+                        try:
+                            Order.objects.create(
+                                order_number=generator.take(1)[0],
+                                total=0,
+                                status='benchmark',
+                                payment_method='cash',
+                                payment_status='completed'
+                            )
+                            inserted += 1
+                            break
+                        except IntegrityError:
+                            collisions += 1
+                            break
+                        except OperationalError:
+                            # Bloqueos de SQLite; reintentar
+                            retries += 1
+            finally:
+                connection.close()
+                with lock:
+                    stats['inserted'] += inserted
+                    stats['collisions'] += collisions
+                    stats['retries'] += retries
+
+        workers = [threading.Thread(target=register, args=(i,)) for i in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(f'Generador:   {options["generator"]}')
+        self.stdout.write(f'Hilos:       {threads} x {per_thread} órdenes')
+        self.stdout.write(f'Insertadas:  {stats["inserted"]} en {elapsed:.2f}s')
+        self.stdout.write(f'Inserciones/s: {stats["inserted"] / elapsed:.1f}')
+        self.stdout.write(f'Reintentos por bloqueo: {stats["retries"]}')
+        if stats['collisions']:
+            self.stdout.write(self.style.ERROR(f'✗ Colisiones de order_number: {stats["collisions"]}'))
+        else:
+            self.stdout.write(self.style.SUCCESS('✓ Sin colisiones de order_number'))
+
+        if not options['keep']:
+            Order.objects.filter(status='benchmark').delete()
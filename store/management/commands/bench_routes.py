@@ -0,0 +1,67 @@
+# store/management/commands/bench_routes.py
+import json
+import logging
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from store.loadtest import SCENARIOS, run_benchmark, compare_results
+
+
+class Command(BaseCommand):
+    help = ('Prueba de carga: clientes concurrentes recorren las rutas de la tienda y se '
+            'reportan peticiones/s y p50/p95/p99 por ruta')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=8, help='Clientes simulados (hilos)')
+        parser.add_argument('--duration', type=float, default=30, help='Segundos de prueba')
+        parser.add_argument('--requests', type=int, help='Peticiones por cliente (en lugar de --duration)')
+        parser.add_argument('--scenario', action='append', choices=list(SCENARIOS),
+                            help='Escenario a incluir (se puede repetir; por omisión todos)')
+        parser.add_argument('--seed', type=int, default=0, help='Semilla de la mezcla de peticiones')
+        parser.add_argument('--output', help='Archivo JSON de resultados '
+                            '(por omisión benchmarks/<commit>-<fecha>.json)')
+        parser.add_argument('--compare', help='JSON de una corrida anterior para comparar')
+
+    def handle(self, *args, **options):
+        # Los errores ya quedan contados por motivo; sin -v 2 no se imprime cada traceback
+        if options['verbosity'] < 2:
+            logging.disable(logging.ERROR)
+        try:
+            results = run_benchmark(
+                clients=options['clients'],
+                duration=options['duration'],
+                requests=options['requests'],
+                scenarios=options['scenario'],
+                seed=options['seed'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        finally:
+            logging.disable(logging.NOTSET)
+
+        self.stdout.write(f'{"Ruta":<22} {"Pet.":>7} {"Err.":>5} {"Pet./s":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8}')
+        for name, stats in list(results['routes'].items()) + [('TOTAL', results['total'])]:
+            self.stdout.write(
+                f'{name:<22} {stats["requests"]:>7} {stats["errors"]:>5} {stats["rps"]:>8.1f} '
+                f'{stats.get("p50_ms", 0):>8.1f} {stats.get("p95_ms", 0):>8.1f} {stats.get("p99_ms", 0):>8.1f}'
+            )
+            for reason, count in stats['error_reasons'].items():
+                if name != 'TOTAL':
+                    self.stdout.write(self.style.WARNING(f'    {count} × {reason}'))
+
+        output = Path(options['output'] or Path(settings.BASE_DIR) / 'benchmarks' / (
+            f'{results["commit"] or "sin-commit"}-{results["started_at"][:19].replace(":", "")}.json'
+        ))
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+        self.stdout.write(self.style.SUCCESS(f'✓ Resultados en {output}'))
+
+        if options['compare']:
+            before = json.loads(Path(options['compare']).read_text())
+            self.stdout.write(f'\nComparación con {options["compare"]} ({before.get("commit") or "?"}):')
+            for name, field, old, new, change in compare_results(before, results):
+                # Más peticiones/s es mejor; en latencia, menos
+                better = change > 0 if field == 'rps' else change < 0
+                style = self.style.SUCCESS if better else self.style.ERROR if change else str
+                self.stdout.write(style(f'  {name:<22} {field:<7} {old:>9} → {new:<9} ({change:+.1f}%)'))
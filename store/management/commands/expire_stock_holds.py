@@ -0,0 +1,10 @@
+# store/management/commands/expire_stock_holds.py
+from django.core.management.base import BaseCommand
+from store.inventory import expire_holds
+
+class Command(BaseCommand):
+    help = 'Elimina los apartados de stock vencidos del punto de venta'
+
+    def handle(self, *args, **kwargs):
+        deleted = expire_holds()
+        self.stdout.write(self.style.SUCCESS(f'✓ {deleted} apartados vencidos eliminados'))
@@ -0,0 +1,51 @@
+# store/management/commands/generate_cafe_data.py
+import time
+
+from django.core.management.base import BaseCommand
+from store.loadtest import generate_cafe, SIM_PASSWORD
+
+
+class Command(BaseCommand):
+    help = ('Genera un café de prueba: menú, administradores y vendedores, y órdenes '
+            'repartidas en el último año (para pruebas de carga)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--categories', type=int, default=6, help='Categorías del menú')
+        parser.add_argument('--products', type=int, default=120, help='Productos')
+        parser.add_argument('--admins', type=int, default=2, help='Usuarios en el grupo Administrador')
+        parser.add_argument('--sellers', type=int, default=8, help='Usuarios en el grupo Vendedor')
+        parser.add_argument('--orders', type=int, default=100_000, help='Órdenes (acepta millones)')
+        parser.add_argument('--max-items', type=int, default=4, help='Máximo de productos por orden')
+        parser.add_argument('--days', type=int, default=365, help='Días de historial')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Órdenes por INSERT')
+        parser.add_argument('--seed', type=int, default=0, help='Semilla (mismos datos con la misma semilla)')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+
+        def progress(done, total):
+            if options['verbosity'] > 1 or done == total:
+                elapsed = time.perf_counter() - start
+                self.stdout.write(f'  {done:,}/{total:,} órdenes ({done / elapsed:,.0f}/s)')
+
+        counts = generate_cafe(
+            categories=options['categories'],
+            products=options['products'],
+            admins=options['admins'],
+            sellers=options['sellers'],
+            orders=options['orders'],
+            max_items=options['max_items'],
+            days=options['days'],
+            batch_size=options['batch_size'],
+            seed=options['seed'],
+            progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {counts["categories"]} categorías, {counts["products"]} productos, '
+            f'{counts["orders"]:,} órdenes con {counts["items"]:,} partidas '
+            f'en {time.perf_counter() - start:.1f}s'
+        ))
+        self.stdout.write(
+            f'  Usuarios: admin_sim_1..{counts["admins"]}, vendedor_sim_1..{counts["sellers"]} '
+            f'(contraseña "{SIM_PASSWORD}")'
+        )
@@ -0,0 +1,29 @@
+# store/management/commands/generate_image_variants.py
+from django.core.management.base import BaseCommand
+from store.images import generate_variants, variants_exist
+from store.models import Category, Product
+
+
+class Command(BaseCommand):
+    help = 'Genera las miniaturas y variantes WebP de las imágenes de productos y categorías'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerar también las que ya existen')
+
+    def handle(self, *args, **options):
+        names = set()
+        for model in (Product, Category):
+            names.update(model.objects.exclude(image='').exclude(image__isnull=True).values_list('image', flat=True))
+
+        generated = skipped = failed = 0
+        for name in sorted(names):
+            if not options['force'] and variants_exist(name):
+                skipped += 1
+            elif generate_variants(name):
+                generated += 1
+            else:
+                failed += 1
+                self.stdout.write(self.style.WARNING(f'○ {name}: no se pudo procesar'))
+        self.stdout.write(self.style.SUCCESS(f'✓ {generated} imágenes procesadas, {skipped} ya tenían variantes'))
+        if failed:
+            self.stdout.write(self.style.WARNING(f'  {failed} imágenes con error (ver el log store.images)'))
@@ -0,0 +1,25 @@
+# store/management/commands/rebuild_sales_rollups.py
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from store.rollups import rebuild_rollups
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'Fecha inválida: {value} (usa AAAA-MM-DD)')
+
+
+class Command(BaseCommand):
+    help = 'Recalcula las ventas acumuladas por día (reportes y dashboard) desde las órdenes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=_parse_date, help='Primer día a recalcular (AAAA-MM-DD)')
+        parser.add_argument('--end', type=_parse_date, help='Último día a recalcular (AAAA-MM-DD)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Filas por lote al leer e insertar')
+
+    def handle(self, *args, **options):
+        days, rows = rebuild_rollups(options['start'], options['end'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'✓ {days} días y {rows} filas por producto recalculados'))
@@ -0,0 +1,14 @@
+# store/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+from store.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el índice de búsqueda de productos con el backend configurado'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Productos por lote')
+
+    def handle(self, *args, **options):
+        count = rebuild_search_index(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'✓ {count} productos indexados'))
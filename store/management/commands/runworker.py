@@ -0,0 +1,56 @@
+# store/management/commands/runworker.py
+import multiprocessing
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from store.jobs import Worker
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta las tareas en segundo plano de la tabla jobs (imágenes, acumulados, índices)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=getattr(settings, 'JOBS_WORKER_THREADS', 4),
+                            help='Hilos por proceso')
+        parser.add_argument('--processes', type=int, default=1,
+                            help='Procesos (para tareas que usan CPU, como redimensionar imágenes)')
+        parser.add_argument('--burst', action='store_true',
+                            help='Terminar cuando no queden tareas listas (para cron o despliegues)')
+
+    def _run_worker(self, threads, burst):
+        worker = Worker(threads=threads)
+        # SIGTERM de systemd/supervisor: terminar la tarea en curso y salir
+        signal.signal(signal.SIGTERM, lambda *args: worker.stop())
+        signal.signal(signal.SIGINT, lambda *args: worker.stop())
+        return worker.run(burst=burst)
+
+    def handle(self, *args, **options):
+        threads, processes, burst = options['threads'], options['processes'], options['burst']
+        self.stdout.write(f'Worker: {processes} proceso(s) x {threads} hilo(s){" (burst)" if burst else ""}')
+
+        if processes <= 1:
+            processed = self._run_worker(threads, burst)
+            self.stdout.write(self.style.SUCCESS(f'✓ {processed} tareas ejecutadas'))
+            return
+
+        # Cada proceso hijo abre sus propias conexiones
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        children = [
+            context.Process(target=self._run_worker, args=(threads, burst), name=f'runworker-{i}')
+            for i in range(processes)
+        ]
+        for child in children:
+            child.start()
+
+        def forward(signum, frame):
+            for child in children:
+                if child.is_alive():
+                    child.terminate()
+        signal.signal(signal.SIGTERM, forward)
+        signal.signal(signal.SIGINT, forward)
+        for child in children:
+            child.join()
+        self.stdout.write(self.style.SUCCESS('✓ Procesos terminados'))
@@ -0,0 +1,62 @@
+# store/middleware.py - Middleware de la tienda
+"""
+Los dos middleware sirven en modo síncrono (WSGI) y asíncrono (ASGI): si
+alguno fuera solo síncrono, con ASGI Django pasaría cada petición a un
+hilo en ese punto de la cadena aunque la vista sea async.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.utils.functional import SimpleLazyObject
+
+from .carts import flush_cart
+from .roles import get_roles
+
+
+class UserRolesMiddleware:
+    """
+    Agrega `request.user_roles` (grupos del usuario, resueltos una sola
+    vez por petición). Va después de AuthenticationMiddleware.
+    """
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        # Perezoso: con ASGI solo se resuelve donde ya se puede consultar (plantillas, decoradores)
+        request.user_roles = SimpleLazyObject(lambda: get_roles(request.user))
+        return self.get_response(request)
+
+
+class CartMiddleware:
+    """
+    Escribe el carrito del punto de venta (store/carts.py) una sola vez al
+    final de la petición y solo si cambió. Va después de SessionMiddleware
+    para que SessionCartStore alcance a guardar la sesión.
+    """
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        # Igual que la sesión: una petición que falló no guarda cambios
+        if response.status_code != 500:
+            flush_cart(request)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if response.status_code != 500:
+            await sync_to_async(flush_cart)(request)
+        return response
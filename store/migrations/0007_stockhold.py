@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-16 09:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0006_alter_category_created_at_alter_category_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_key', models.CharField(max_length=40)),
+                ('quantity', models.IntegerField()),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='store.product')),
+            ],
+            options={
+                'db_table': 'stock_holds',
+                'indexes': [models.Index(fields=['product', 'expires_at'], name='stock_holds_product_690b34_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product', 'session_key'), name='unique_stock_hold_per_session')],
+            },
+        ),
+    ]
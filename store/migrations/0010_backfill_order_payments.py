@@ -0,0 +1,49 @@
+# Generated by Django 6.0 on 2026-10-16 14:20
+
+import re
+from decimal import Decimal
+
+from django.db import migrations
+
+PAYMENT_RE = re.compile(r'Pago:\s*\$(\d+\.?\d*)')
+CHANGE_RE = re.compile(r'Cambio:\s*\$(\d+\.?\d*)')
+BATCH_SIZE = 1000
+
+
+def backfill_payments(apps, schema_editor):
+    """Copia pago y cambio del texto de notes a sus columnas, en lotes por id"""
+    Order = apps.get_model('store', 'Order')
+    pending = Order.objects.filter(
+        payment_received__isnull=True,
+        notes__contains='Pago:'
+    ).order_by('id')
+
+    last_id = 0
+    while True:
+        batch = list(pending.filter(id__gt=last_id).only('id', 'notes')[:BATCH_SIZE])
+        if not batch:
+            break
+        last_id = batch[-1].id
+
+        changed = []
+        for order in batch:
+            payment = PAYMENT_RE.search(order.notes)
+            change = CHANGE_RE.search(order.notes)
+            if not payment:
+                continue
+            order.payment_received = Decimal(payment.group(1))
+            order.change_amount = Decimal(change.group(1)) if change else None
+            changed.append(order)
+
+        Order.objects.bulk_update(changed, ['payment_received', 'change_amount'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0009_ordersequence'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_payments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0 on 2026-10-16 15:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0010_backfill_order_payments'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReceiptDocument',
+            fields=[
+                ('order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='receipt', serialize=False, to='store.order')),
+                ('data', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'receipt_documents',
+            },
+        ),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+BATCH_SIZE = 1000
+
+
+def backfill_rollups(apps, schema_editor):
+    """
+    Llena los acumulados con el historial de orders/order_items: el
+    dashboard y los reportes solo leen de estas tablas. Misma lógica que
+    rollups.rebuild_rollups, copiada aquí para que la migración no cambie
+    si cambia el código de la app.
+    """
+    Order = apps.get_model('store', 'Order')
+    OrderItem = apps.get_model('store', 'OrderItem')
+    DailyOrderRollup = apps.get_model('store', 'DailyOrderRollup')
+    DailySalesRollup = apps.get_model('store', 'DailySalesRollup')
+
+    days = {}
+    for created_at, total in Order.objects.values_list('created_at', 'total').iterator(chunk_size=BATCH_SIZE):
+        totals = days.setdefault(timezone.localdate(created_at), {'order_count': 0, 'revenue': 0})
+        totals['order_count'] += 1
+        totals['revenue'] += total
+
+    rows = {}
+    items = OrderItem.objects.values_list(
+        'order__created_at', 'product_id', 'product__name',
+        'product__category_id', 'product__category__name', 'quantity', 'subtotal'
+    )
+    for created_at, product_id, name, category_id, category_name, quantity, subtotal in items.iterator(chunk_size=BATCH_SIZE):
+        if name is None:
+            # Producto eliminado
+            continue
+        row = rows.setdefault((timezone.localdate(created_at), product_id), {
+            'category_id': category_id,
+            'product_name': name,
+            'category_name': category_name,
+            'quantity': 0,
+            'revenue': 0,
+            'order_count': 0,
+        })
+        row['quantity'] += quantity
+        row['revenue'] += subtotal
+        row['order_count'] += 1
+
+    DailyOrderRollup.objects.bulk_create(
+        [DailyOrderRollup(date=day, **totals) for day, totals in days.items()],
+        batch_size=BATCH_SIZE
+    )
+    DailySalesRollup.objects.bulk_create(
+        [DailySalesRollup(date=day, product_id=product_id, **row) for (day, product_id), row in rows.items()],
+        batch_size=BATCH_SIZE
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0011_receiptdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyOrderRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('order_count', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+            ],
+            options={
+                'db_table': 'daily_order_rollups',
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('product_name', models.CharField(max_length=150)),
+                ('category_name', models.CharField(max_length=100)),
+                ('quantity', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('order_count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='store.category')),
+                ('product', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='store.product')),
+            ],
+            options={
+                'db_table': 'daily_sales_rollups',
+                'indexes': [models.Index(fields=['date', 'category'], name='daily_sales_date_322d0b_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'product'), name='unique_daily_sales_per_product')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
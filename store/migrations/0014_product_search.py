@@ -0,0 +1,129 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:46
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+# Copia del tokenizador de store/search.py tal como estaba al crear el
+# índice: la migración no debe cambiar si después cambia el código de la app
+STOPWORDS = {
+    'a', 'al', 'con', 'de', 'del', 'el', 'en', 'la', 'las', 'lo', 'los',
+    'o', 'para', 'por', 'sin', 'su', 'un', 'una', 'y',
+}
+FIELD_WEIGHTS = {'name': 4, 'tipo': 2, 'category': 2, 'description': 1}
+TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    """Minúsculas, sin acentos ni palabras vacías, sin repetir y en orden"""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    folded = ''.join(char for char in decomposed if not unicodedata.combining(char)).lower()
+    tokens = []
+    for token in TOKEN.findall(folded):
+        if token not in STOPWORDS and token not in tokens:
+            tokens.append(token[:64])
+    return tokens
+
+
+def product_terms(fields):
+    """{término: peso} de los campos de un producto"""
+    terms = {}
+    for field, text in fields.items():
+        for token in tokenize(text):
+            terms[token] = terms.get(token, 0) + FIELD_WEIGHTS[field]
+    return terms
+
+
+def product_body(fields):
+    """Texto para FULLTEXT; los campos con más peso se repiten"""
+    return ' '.join(
+        ' '.join(tokenize(text))
+        for field, text in fields.items()
+        for _ in range(FIELD_WEIGHTS[field])
+    )
+
+
+def add_fulltext_index(apps, schema_editor):
+    """Índice FULLTEXT para MySQLFullTextBackend (solo en MySQL)"""
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute(
+            'CREATE FULLTEXT INDEX product_search_documents_body_ft ON product_search_documents (body)'
+        )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute(
+            'DROP INDEX product_search_documents_body_ft ON product_search_documents'
+        )
+
+
+def build_index(apps, schema_editor):
+    """Indexa los productos activos existentes (ambas tablas), en lotes por id"""
+    Product = apps.get_model('store', 'Product')
+    ProductSearchTerm = apps.get_model('store', 'ProductSearchTerm')
+    ProductSearchDocument = apps.get_model('store', 'ProductSearchDocument')
+    active = Product.objects.filter(is_active=True).select_related('category').order_by('id')
+
+    last_id = 0
+    while True:
+        batch = list(active.filter(id__gt=last_id)[:BATCH_SIZE])
+        if not batch:
+            break
+        last_id = batch[-1].id
+
+        terms = []
+        documents = []
+        for product in batch:
+            fields = {
+                'name': product.name,
+                'tipo': product.tipo,
+                'category': product.category.name,
+                'description': product.description,
+            }
+            terms.extend(
+                ProductSearchTerm(term=term, product_id=product.id, weight=weight)
+                for term, weight in product_terms(fields).items()
+            )
+            documents.append(ProductSearchDocument(product_id=product.id, body=product_body(fields)))
+        ProductSearchTerm.objects.bulk_create(terms)
+        ProductSearchDocument.objects.bulk_create(documents)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0013_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSearchDocument',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='store.product')),
+                ('body', models.TextField()),
+            ],
+            options={
+                'db_table': 'product_search_documents',
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.IntegerField(default=1)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='store.product')),
+            ],
+            options={
+                'db_table': 'product_search_terms',
+                'constraints': [models.UniqueConstraint(fields=('term', 'product'), name='unique_search_term_per_product')],
+            },
+        ),
+        migrations.RunPython(add_fulltext_index, drop_fulltext_index),
+        migrations.RunPython(build_index, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 class Category(models.Model):
     name = models.CharField(max_length=100)
@@ -32,6 +33,13 @@ class Product(models.Model):
     
     class Meta:
         db_table = 'products'
+        indexes = [
+            # Productos activos de una categoría (is_active va segundo: Django
+            # filtra booleanos como `WHERE is_active`, que no usa el índice)
+            models.Index(fields=['category', 'is_active']),
+            # Poco stock en el dashboard: rango y orden por stock
+            models.Index(fields=['stock', 'is_active']),
+        ]
     
     def __str__(self):
         return self.name
@@ -49,12 +57,22 @@ class Order(models.Model):
     payment_received = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     change_amount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     notes = models.TextField(null=True, blank=True)
+    # Llave de idempotencia generada por la caja (ventas fuera de línea)
+    client_key = models.CharField(max_length=64, unique=True, null=True, blank=True)
     # CORREGIDO: Ahora Django asigna automáticamente las fechas
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'orders'
+        indexes = [
+            # Reportes por rango de fechas y últimas órdenes
+            models.Index(fields=['created_at']),
+            # Órdenes del panel filtradas por estado
+            models.Index(fields=['status', 'created_at']),
+            # Mis órdenes: las de un cliente, más recientes primero
+            models.Index(fields=['customer', 'created_at']),
+        ]
     
     def __str__(self):
         return self.order_number
@@ -79,4 +97,138 @@ class InventoryLog(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
-        db_table = 'inventory_logs'
\ No newline at end of file
+        db_table = 'inventory_logs'
+
+class StockHold(models.Model):
+    """Unidades apartadas temporalmente por una caja mientras arma la venta"""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    session_key = models.CharField(max_length=40)
+    quantity = models.IntegerField()
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'stock_holds'
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'session_key'], name='unique_stock_hold_per_session'),
+        ]
+        indexes = [
+            models.Index(fields=['product', 'expires_at']),
+            models.Index(fields=['session_key']),
+        ]
+
+
+class OrderSequence(models.Model):
+    """Secuencia para números de orden; cada worker toma bloques de valores"""
+    name = models.CharField(max_length=50, unique=True)
+    next_value = models.BigIntegerField(default=1)
+    
+    class Meta:
+        db_table = 'order_sequences'
+    
+    def __str__(self):
+        return f'{self.name} ({self.next_value})'
+
+
+class ReceiptDocument(models.Model):
+    """Ticket de una orden armado una sola vez al cobrar (no cambia después)"""
+    order = models.OneToOneField(Order, on_delete=models.CASCADE, primary_key=True, related_name='receipt')
+    data = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'receipt_documents'
+
+
+class DailySalesRollup(models.Model):
+    """Ventas acumuladas por día y producto (se actualiza al cobrar)"""
+    date = models.DateField()
+    product = models.ForeignKey(Product, null=True, on_delete=models.SET_NULL)
+    category = models.ForeignKey(Category, null=True, on_delete=models.SET_NULL)
+    # Copias del nombre para que los reportes no dependan de JOINs
+    product_name = models.CharField(max_length=150)
+    category_name = models.CharField(max_length=100)
+    quantity = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    order_count = models.IntegerField(default=0)
+    
+    class Meta:
+        db_table = 'daily_sales_rollups'
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'product'], name='unique_daily_sales_per_product'),
+        ]
+        indexes = [
+            models.Index(fields=['date', 'category']),
+        ]
+
+
+class DailyOrderRollup(models.Model):
+    """Totales de órdenes por día (ventas, número de órdenes)"""
+    date = models.DateField(unique=True)
+    order_count = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    
+    class Meta:
+        db_table = 'daily_order_rollups'
+
+
+class ProductSearchTerm(models.Model):
+    """Índice invertido de búsqueda: término (sin acentos) -> producto"""
+    term = models.CharField(max_length=64)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='search_terms')
+    # Suma de pesos de los campos donde aparece (nombre pesa más que descripción)
+    weight = models.IntegerField(default=1)
+    
+    class Meta:
+        db_table = 'product_search_terms'
+        constraints = [
+            models.UniqueConstraint(fields=['term', 'product'], name='unique_search_term_per_product'),
+        ]
+
+
+class ProductSearchDocument(models.Model):
+    """Texto sin acentos de un producto para el índice FULLTEXT de MySQL"""
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name='search_document')
+    body = models.TextField()
+    
+    class Meta:
+        db_table = 'product_search_documents'
+
+
+class Job(models.Model):
+    """Tarea en segundo plano (store/jobs.py); la ejecuta `manage.py runworker`"""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = [
+        (PENDING, 'Pendiente'),
+        (RUNNING, 'En proceso'),
+        (DONE, 'Terminada'),
+        (FAILED, 'Fallida'),
+    ]
+    
+    # Ruta de la función, p. ej. 'store.tasks.generate_image_variants'
+    task = models.CharField(max_length=200)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUSES, default=PENDING)
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    # No se ejecuta antes de esta hora (reintentos con espera)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, null=True, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'jobs'
+        indexes = [
+            models.Index(fields=['status', 'run_at']),
+        ]
+    
+    def __str__(self):
+        return f'{self.task} ({self.status})'
@@ -0,0 +1,129 @@
+# store/order_list.py - Listado de órdenes del panel con paginación por cursor
+"""
+El listado se ordena por (created_at, id) descendente y cada página se
+pide con un cursor que apunta a la última orden mostrada, así que abrir
+la página 1 o la 5,000 cuesta lo mismo (no hay OFFSET). Los filtros se
+aplican en SQL y los conteos salen de una sola consulta agregada.
+"""
+import base64
+from datetime import datetime, time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import Q, Count, Sum
+from django.utils import timezone
+
+from .models import Order
+
+ORDER_STATUSES = [
+    ('pending', 'Pendientes'),
+    ('completed', 'Completadas'),
+    ('cancelled', 'Canceladas'),
+]
+
+PAYMENT_METHODS = [
+    ('cash', 'Efectivo'),
+    ('card', 'Tarjeta'),
+    ('transfer', 'Transferencia'),
+]
+
+
+def page_size():
+    """Órdenes por página del panel"""
+    return getattr(settings, 'ADMIN_ORDERS_PAGE_SIZE', 50)
+
+
+def encode_cursor(order):
+    """Cursor opaco con la posición (created_at, id) de una orden"""
+    raw = f'{order.created_at.isoformat()}|{order.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(value):
+    """(created_at, id) de un cursor; None si no es válido"""
+    try:
+        created_at, order_id = base64.urlsafe_b64decode(value.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(order_id)
+    except (ValueError, UnicodeError):
+        return None
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_filters(params):
+    """
+    Filtros válidos del querystring: status, payment_method, cashier
+    (id del usuario que cobró), fecha_inicio y fecha_fin (AAAA-MM-DD).
+    Los valores inválidos se ignoran.
+    """
+    filters = {}
+    if params.get('status') in dict(ORDER_STATUSES):
+        filters['status'] = params['status']
+    if params.get('payment_method') in dict(PAYMENT_METHODS):
+        filters['payment_method'] = params['payment_method']
+    if (params.get('cashier') or '').isdigit():
+        filters['cashier'] = int(params['cashier'])
+    for name in ('fecha_inicio', 'fecha_fin'):
+        day = _parse_date(params.get(name))
+        if day:
+            filters[name] = day
+    return filters
+
+
+def filter_orders(filters):
+    """QuerySet de órdenes con los filtros de `parse_filters` (sin ordenar)"""
+    orders = Order.objects.all()
+    if 'status' in filters:
+        orders = orders.filter(status=filters['status'])
+    if 'payment_method' in filters:
+        orders = orders.filter(payment_method=filters['payment_method'])
+    if 'cashier' in filters:
+        orders = orders.filter(customer_id=filters['cashier'])
+    if 'fecha_inicio' in filters:
+        orders = orders.filter(created_at__gte=timezone.make_aware(datetime.combine(filters['fecha_inicio'], time.min)))
+    if 'fecha_fin' in filters:
+        orders = orders.filter(created_at__lte=timezone.make_aware(datetime.combine(filters['fecha_fin'], time.max)))
+    return orders
+
+
+def keyset_page(orders, cursor=None, size=None):
+    """
+    Una página de `orders` después de `cursor` (más recientes primero).
+    Regresa (órdenes, cursor de la siguiente página o None). Pide una
+    fila de más para saber si hay otra página sin contar.
+    """
+    size = size or page_size()
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        created_at, order_id = position
+        orders = orders.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=order_id)
+        )
+    page = list(orders.select_related('customer').order_by('-created_at', '-id')[:size + 1])
+    if len(page) > size:
+        return page[:size], encode_cursor(page[size - 1])
+    return page, None
+
+
+def order_summary(orders):
+    """Conteos y total vendido de las órdenes filtradas en una sola consulta"""
+    completed = Q(status='completed')
+    summary = orders.aggregate(
+        total_orders=Count('id'),
+        completed_orders=Count('id', filter=completed),
+        total_sales=Sum('total', filter=completed),
+    )
+    summary['total_sales'] = summary['total_sales'] or 0
+    return summary
+
+
+def cashiers():
+    """Usuarios que pueden cobrar (administradores y vendedores)"""
+    return User.objects.filter(
+        Q(is_staff=True) | Q(groups__name__in=['Administrador', 'Vendedor'])
+    ).distinct().order_by('username').only('id', 'username')
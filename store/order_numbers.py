@@ -0,0 +1,172 @@
+# store/order_numbers.py - Generadores de números de orden
+"""
+Generadores de números de orden únicos entre workers.
+
+El generador se elige con el setting ORDER_NUMBER_GENERATOR (ruta a la
+clase). Todos exponen take(count) y generan números cortos que se
+ordenan igual que su orden de creación dentro de cada worker.
+
+Los números se deben pedir FUERA de transacciones: si la transacción que
+reservó un bloque hace rollback, otro worker podría recibir el mismo bloque.
+"""
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models import F
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .models import OrderSequence
+
+
+class SequenceBlockGenerator:
+    """
+    Toma bloques de la tabla order_sequences (una consulta por bloque) y
+    los reparte en memoria: ORD-00000001, ORD-00000002, ...
+    Los valores son consecutivos dentro del bloque, así que las
+    inserciones llegan casi en orden al índice único.
+    """
+    prefix = 'ORD-'
+    width = 8
+
+    def __init__(self, sequence='orders', block_size=None):
+        self.sequence = sequence
+        self.block_size = block_size or getattr(settings, 'ORDER_NUMBER_BLOCK_SIZE', 50)
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0
+        self._pid = None
+
+    def _allocate(self, size):
+        """Reserva `size` valores en la base de datos; regresa el primero"""
+        with transaction.atomic():
+            OrderSequence.objects.get_or_create(name=self.sequence)
+            row = OrderSequence.objects.select_for_update().get(name=self.sequence)
+            start = row.next_value
+            OrderSequence.objects.filter(pk=row.pk).update(next_value=F('next_value') + size)
+        return start
+
+    def take(self, count=1):
+        """Regresa `count` números de orden nuevos"""
+        numbers = []
+        with self._lock:
+            # Un bloque heredado por fork (gunicorn --preload) no se reutiliza
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._next = self._end = 0
+
+            while len(numbers) < count:
+                if self._next >= self._end:
+                    size = max(self.block_size, count - len(numbers))
+                    self._next = self._allocate(size)
+                    self._end = self._next + size
+                numbers.append(f'{self.prefix}{self._next:0{self.width}d}')
+                self._next += 1
+        return numbers
+
+
+class SnowflakeGenerator:
+    """
+    Sin consultas: milisegundos (41 bits) + id de worker (10 bits) +
+    contador (12 bits), en base 36 de ancho fijo para que se ordene como texto.
+
+    El id de worker sale de ORDER_NUMBER_WORKER_ID (0-1023, distinto en
+    cada proceso de cada servidor) o, si no está, de la secuencia
+    'snowflake_workers' de order_sequences: una consulta al arrancar cada
+    proceso. El PID no sirve: dos servidores (o dos PID iguales módulo
+    1024) generarían los mismos números en el mismo milisegundo. Con la
+    secuencia solo se repetiría un id tras 1024 arranques de procesos,
+    si el primero sigue vivo.
+    """
+    prefix = 'ORD-'
+    epoch_ms = 1735689600000  # 2025-01-01 UTC
+    alphabet = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    width = 13
+
+    def __init__(self, worker_id=None):
+        self.worker_id = worker_id
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._counter = 0
+        self._pid = None
+        self._assigned_id = None
+
+    def _worker_id(self):
+        worker_id = self.worker_id
+        if worker_id is None:
+            worker_id = getattr(settings, 'ORDER_NUMBER_WORKER_ID', None)
+        if worker_id is not None:
+            if not 0 <= int(worker_id) < 1024:
+                raise ImproperlyConfigured('ORDER_NUMBER_WORKER_ID debe estar entre 0 y 1023')
+            return int(worker_id)
+        # Un id heredado por fork (gunicorn --preload) no se reutiliza
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._assigned_id = SequenceBlockGenerator('snowflake_workers', block_size=1)._allocate(1) % 1024
+        return self._assigned_id
+
+    def _encode(self, value):
+        digits = []
+        while value:
+            value, rest = divmod(value, 36)
+            digits.append(self.alphabet[rest])
+        return ''.join(reversed(digits)).rjust(self.width, '0')
+
+    def take(self, count=1):
+        """Regresa `count` números de orden nuevos"""
+        numbers = []
+        with self._lock:
+            worker_id = self._worker_id()
+            for _ in range(count):
+                now_ms = int(time.time() * 1000) - self.epoch_ms
+                if now_ms <= self._last_ms:
+                    # Mismo milisegundo (o reloj atrasado): usar el contador
+                    now_ms = self._last_ms
+                    self._counter += 1
+                    if self._counter >= 4096:
+                        now_ms += 1
+                        self._counter = 0
+                else:
+                    self._counter = 0
+                self._last_ms = now_ms
+                value = (now_ms << 22) | (worker_id << 12) | self._counter
+                numbers.append(f'{self.prefix}{self._encode(value)}')
+        return numbers
+
+
+_generator = None
+_generator_lock = threading.Lock()
+
+
+def get_generator():
+    """Instancia (una por proceso) del generador configurado"""
+    global _generator
+    if _generator is None:
+        with _generator_lock:
+            if _generator is None:
+                path = getattr(settings, 'ORDER_NUMBER_GENERATOR', 'store.order_numbers.SequenceBlockGenerator')
+                _generator = import_string(path)()
+    return _generator
+
+
+@receiver(setting_changed)
+def _reset_generator(setting, **kwargs):
+    """Vuelve a crear el generador si cambia su configuración (tests)"""
+    global _generator
+    if setting.startswith('ORDER_NUMBER_'):
+        _generator = None
+
+
+def next_order_number():
+    """Número de orden para una venta nueva"""
+    return get_generator().take(1)[0]
+
+
+def next_order_numbers(count):
+    """Varios números de orden (ventas sincronizadas en lote)"""
+    return get_generator().take(count) if count > 0 else []
@@ -0,0 +1,142 @@
+# store/page_cache.py - Caché HTTP de las páginas públicas del catálogo
+"""
+home, products_by_category y product_detail cambian solo cuando cambia
+el catálogo (productos, categorías o stock), unas cuantas veces al día,
+pero cada visitante volvía a consultar y a renderizar la plantilla.
+
+@catalog_page(*ámbitos) guarda en la caché compartida el HTML que ve un
+visitante anónimo, con una llave que incluye las versiones de esos
+ámbitos (invalidation.py): las señales y las ventas cambian la versión y
+las páginas viejas simplemente dejan de leerse, en todos los workers. La
+página de una categoría depende solo de esa categoría (y de la lista de
+categorías), así que vender pan no invalida la página de bebidas.
+Cada respuesta lleva ETag y Last-Modified; el navegador que ya tiene la
+página recibe un 304 sin cuerpo.
+
+Con sesión iniciada (menú con el nombre y el rol) o con mensajes
+pendientes la página se renderiza normal. La navegación por categorías,
+que comparten las tres páginas, además se guarda como fragmento
+({% cache %} con la versión de las categorías) para los usuarios con
+sesión.
+"""
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from .invalidation import CATALOG, CATEGORY, cache_key
+
+
+def page_timeout():
+    """Segundos que se guarda cada página"""
+    return getattr(settings, 'CATALOG_PAGE_CACHE_TIMEOUT', 3600)
+
+
+def fragment_context():
+    """Variables de {% cache %} para los fragmentos del catálogo"""
+    return {'categories_version': cache_key('categories', CATEGORY), 'catalog_cache_timeout': page_timeout()}
+
+
+def _cache_key(request, scopes):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return cache_key(f'store:catalog_page:{path}', *scopes)
+
+
+def _cacheable(request):
+    return (
+        request.method in ('GET', 'HEAD')
+        and not request.user.is_authenticated
+        and not len(get_messages(request))
+    )
+
+
+def _cacheable_key(request, scopes):
+    """Llave de la página o None si esta petición no usa la caché"""
+    return _cache_key(request, scopes) if _cacheable(request) else None
+
+
+def _respond(request, entry):
+    response = HttpResponse(entry['content'], content_type=entry['content_type'])
+    response['ETag'] = entry['etag']
+    response['Last-Modified'] = http_date(entry['last_modified'])
+    # Un proxy no debe dar la versión anónima a quien tiene sesión
+    patch_vary_headers(response, ['Cookie'])
+    patch_cache_control(response, max_age=getattr(settings, 'CATALOG_PAGE_MAX_AGE', 60))
+    return get_conditional_response(
+        request, etag=entry['etag'], last_modified=entry['last_modified'], response=response
+    )
+
+
+def _entry(response):
+    """Lo que se guarda de una respuesta; None si no se debe guardar"""
+    if response.status_code != 200 or response.streaming:
+        return None
+    return {
+        'content': response.content,
+        'content_type': response['Content-Type'],
+        'etag': f'"{hashlib.md5(response.content).hexdigest()}"',
+        'last_modified': int(timezone.now().timestamp()),
+    }
+
+
+def _cached(request, key, view, args, kwargs):
+    entry = cache.get(key)
+    if entry is None:
+        response = view(request, *args, **kwargs)
+        entry = _entry(response)
+        if entry is None:
+            return response
+        cache.set(key, entry, page_timeout())
+    return _respond(request, entry)
+
+
+async def _acached(request, key, view, args, kwargs):
+    entry = await cache.aget(key)
+    if entry is None:
+        response = await view(request, *args, **kwargs)
+        entry = _entry(response)
+        if entry is None:
+            return response
+        await cache.aset(key, entry, page_timeout())
+    return _respond(request, entry)
+
+
+def catalog_page(*scopes):
+    """
+    Caché por versión + ETag/Last-Modified para visitantes anónimos.
+    Cada ámbito es un nombre (invalidation.PRODUCT...) o una función que
+    recibe los kwargs de la vista (invalidation.category_scope); sin
+    ámbitos la página depende de todo el catálogo. Sirve también para
+    vistas async (async_views.py).
+    """
+    scopes = scopes or CATALOG
+
+    def resolve(kwargs):
+        return [scope(**kwargs) if callable(scope) else scope for scope in scopes]
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                # La sesión, el usuario y las versiones se leen con consultas/caché síncronas
+                key = await sync_to_async(_cacheable_key)(request, resolve(kwargs))
+                if key is None:
+                    return await view(request, *args, **kwargs)
+                return await _acached(request, key, view, args, kwargs)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key = _cacheable_key(request, resolve(kwargs))
+            if key is None:
+                return view(request, *args, **kwargs)
+            return _cached(request, key, view, args, kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,261 @@
+# store/profiling.py - Métricas por vista: consultas, tiempo de BD, plantillas y latencia
+"""
+MetricsMiddleware mide cada petición y la guarda por nombre de URL en
+una ventana móvil en memoria (las últimas METRICS_WINDOW peticiones de
+cada vista) más totales acumulados. Los datos son por proceso: cada
+worker de gunicorn reporta los suyos.
+
+- Consultas y tiempo de BD: connection.execute_wrapper (no requiere DEBUG).
+- Plantillas: el backend ProfiledDjangoTemplates mide el render de la
+  plantilla principal (los include quedan dentro de ese tiempo). Las
+  consultas que se hacen durante el render cuentan en ambos tiempos.
+
+Las peticiones que pasan METRICS_QUERY_BUDGET consultas o
+METRICS_LATENCY_BUDGET_MS milisegundos se registran en el logger
+'store.profiling'.
+"""
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.template.backends.django import DjangoTemplates, Template
+
+logger = logging.getLogger('store.profiling')
+
+# Campos de cada muestra: (consultas, BD ms, plantillas ms, total ms)
+FIELDS = ('queries', 'db_ms', 'template_ms', 'total_ms')
+QUANTILES = (0.5, 0.95, 0.99)
+
+_current = contextvars.ContextVar('store_request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Contadores de la petición en curso"""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper: cuenta y mide cada consulta
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - start
+
+
+class ProfiledTemplate(Template):
+    """Plantilla que suma su tiempo de render a la petición en curso"""
+
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return super().render(context, request)
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.template_time += time.perf_counter() - start
+
+
+class ProfiledDjangoTemplates(DjangoTemplates):
+    """Backend de plantillas de Django que mide el render (ver TEMPLATES)"""
+
+    def from_string(self, template_code):
+        return ProfiledTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return ProfiledTemplate(template.template, self)
+
+
+def quantile(values, q):
+    """Valor del cuantil `q` (0 a 1) de `values` (método del rango más cercano)"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class ViewStats:
+    """Ventana móvil y totales de una vista"""
+
+    def __init__(self, window):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.sums = dict.fromkeys(FIELDS, 0.0)
+        self.over_budget = 0
+
+    def add(self, sample, over_budget):
+        self.samples.append(sample)
+        self.count += 1
+        for field, value in zip(FIELDS, sample):
+            self.sums[field] += value
+        self.over_budget += over_budget
+
+    def summary(self):
+        """{campo: {'p50', 'p95', 'p99', 'max'}} de la ventana"""
+        columns = list(zip(*self.samples)) if self.samples else [[0]] * len(FIELDS)
+        return {
+            field: dict(
+                {f'p{int(q * 100)}': quantile(values, q) for q in QUANTILES},
+                max=max(values)
+            )
+            for field, values in zip(FIELDS, columns)
+        }
+
+
+class MetricsRegistry:
+    """Estadísticas de todas las vistas de este proceso"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view, sample, over_budget=False):
+        with self._lock:
+            stats = self._views.get(view)
+            if stats is None:
+                stats = self._views[view] = ViewStats(getattr(settings, 'METRICS_WINDOW', 1000))
+            stats.add(sample, over_budget)
+
+    def snapshot(self):
+        """Lista ordenada por p99 de latencia: [{'view', 'count', 'window', ...}]"""
+        with self._lock:
+            rows = [
+                dict(
+                    view=view,
+                    count=stats.count,
+                    window=len(stats.samples),
+                    over_budget=stats.over_budget,
+                    sums=dict(stats.sums),
+                    **stats.summary()
+                )
+                for view, stats in self._views.items()
+            ]
+        return sorted(rows, key=lambda row: -row['total_ms']['p99'])
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+registry = MetricsRegistry()
+
+
+def _over_budget(sample):
+    queries, _, _, total_ms = sample
+    query_budget = getattr(settings, 'METRICS_QUERY_BUDGET', None)
+    latency_budget = getattr(settings, 'METRICS_LATENCY_BUDGET_MS', None)
+    return bool(
+        (query_budget is not None and queries > query_budget)
+        or (latency_budget is not None and total_ms > latency_budget)
+    )
+
+
+def _wrap_connection(metrics):
+    """execute_wrapper en la conexión del hilo actual; regresa el context manager ya abierto"""
+    wrapper = connection.execute_wrapper(metrics)
+    wrapper.__enter__()
+    return wrapper
+
+
+class MetricsMiddleware:
+    """
+    Mide cada petición (va primero en MIDDLEWARE para incluir a los demás
+    middleware). Se desactiva con METRICS_ENABLED = False.
+
+    Con ASGI las consultas de la petición corren en su hilo de
+    sync_to_async (thread_sensitive), así que el execute_wrapper se pone
+    en la conexión de ese hilo y no en la del event loop.
+    """
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(metrics):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._record(request, metrics, start)
+        return response
+
+    async def __acall__(self, request):
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            return await self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        wrapper = await sync_to_async(_wrap_connection)(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(wrapper.__exit__)(None, None, None)
+            _current.reset(token)
+        self._record(request, metrics, start)
+        return response
+
+    def _record(self, request, metrics, start):
+        total_ms = (time.perf_counter() - start) * 1000
+        match = request.resolver_match
+        view = match.view_name if match else '<sin ruta>'
+        sample = (metrics.queries, metrics.db_time * 1000, metrics.template_time * 1000, total_ms)
+        over_budget = _over_budget(sample)
+        registry.record(view, sample, over_budget)
+        if over_budget:
+            logger.warning(
+                '%s %s (%s): %d consultas, %.1f ms BD, %.1f ms plantillas, %.1f ms total',
+                request.method, request.path, view, *sample
+            )
+
+
+def _labels(view):
+    return 'view="%s"' % view.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def prometheus_text(snapshot=None):
+    """Métricas en formato de texto de Prometheus (tipo summary)"""
+    snapshot = registry.snapshot() if snapshot is None else snapshot
+    metrics = [
+        ('store_view_latency_seconds', 'total_ms', 1000, 'Latencia total por vista'),
+        ('store_view_db_seconds', 'db_ms', 1000, 'Tiempo en la base de datos por vista'),
+        ('store_view_template_seconds', 'template_ms', 1000, 'Tiempo de render de plantillas por vista'),
+        ('store_view_queries', 'queries', 1, 'Consultas SQL por petición'),
+    ]
+    lines = []
+    for name, field, scale, help_text in metrics:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} summary')
+        for row in snapshot:
+            labels = _labels(row['view'])
+            for q in QUANTILES:
+                value = row[field][f'p{int(q * 100)}'] / scale
+                lines.append(f'{name}{{{labels},quantile="{q}"}} {value:g}')
+            lines.append(f'{name}_sum{{{labels}}} {row["sums"][field] / scale:g}')
+            lines.append(f'{name}_count{{{labels}}} {row["count"]}')
+    lines.append('# HELP store_view_over_budget_total Peticiones sobre el presupuesto de consultas o latencia')
+    lines.append('# TYPE store_view_over_budget_total counter')
+    for row in snapshot:
+        lines.append(f'store_view_over_budget_total{{{_labels(row["view"])}}} {row["over_budget"]}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,221 @@
+# store/query_audit.py - Revisión de planes de consulta (EXPLAIN) de las vistas
+"""
+Llena la base de datos con un café de prueba, visita las vistas con el
+cliente de pruebas de Django, captura sus SELECT y corre EXPLAIN sobre
+cada uno. Reporta los que recorren completa alguna de las tablas que
+crecen con las ventas (AUDITED_TABLES).
+
+Los SELECT sin WHERE ni ORDER BY (listas completas, conteos) no se
+revisan: ningún índice los evita. Se usa desde el comando
+`python manage.py audit_query_plans`, dentro de isolated_cache(): los
+datos de prueba no deben quedar en la caché compartida del servidor
+(catálogo del punto de venta, tickets, widgets) y una caché caliente
+escondería las consultas de las vistas.
+"""
+from contextlib import contextmanager
+
+import random
+import re
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Category, Product, Order, OrderItem
+from .rollups import rebuild_rollups
+from .search import rebuild_search_index
+
+# Tablas que crecen con el tiempo; las demás (categorías, grupos) son pequeñas
+AUDITED_TABLES = {
+    'products', 'orders', 'order_items', 'inventory_logs', 'stock_holds',
+    'receipt_documents', 'daily_sales_rollups', 'daily_order_rollups',
+    'product_search_terms', 'product_search_documents', 'jobs',
+}
+
+# Recorridos conocidos: {nombre de la URL: {tabla: motivo}}
+ALLOWED_SCANS = {
+    'home': {'products': 'LIMIT 20 sin orden: se detiene en las primeras filas'},
+    'multi_sale': {'products': 'arma el catálogo completo (queda en caché)'},
+    'admin_dashboard': {'daily_sales_rollups': 'más vendidos de todo el historial'},
+    'admin_jobs': {'jobs': 'últimas 50 en orden de id: recorre la llave primaria con LIMIT'},
+}
+
+_FILTERED_SELECT = re.compile(r'^\s*SELECT\b.*\b(WHERE|ORDER BY)\b', re.IGNORECASE | re.DOTALL)
+# COUNT(...) FILTER (WHERE ...) filtra el agregado, no las filas que se leen
+_AGGREGATE_FILTER = re.compile(r'\bFILTER \(WHERE\b', re.IGNORECASE)
+_SQLITE_SCAN = re.compile(r'^SCAN (?:TABLE )?"?(\w+)"?(?: AS \w+)?$')
+_POSTGRES_SCAN = re.compile(r'Seq Scan on "?(\w+)"?')
+
+
+def seed_dataset(products=200, orders=2000, items_per_order=3, days=90, admin=None):
+    """
+    Crea categorías, productos y órdenes repartidas en los últimos `days`
+    días (bulk_create, unos cuantos INSERT). Regresa el usuario
+    administrador con el que se visitan las vistas. Con `admin` agrega
+    más datos a los que ya existen (para medir con tamaños crecientes).
+    """
+    rng = random.Random(Order.objects.count())
+    if admin is None:
+        admin = User.objects.create_user(username='auditor', password='auditor', is_staff=True)
+        admin.groups.add(Group.objects.get_or_create(name='Administrador')[0])
+
+    categories = list(Category.objects.all()) or Category.objects.bulk_create([
+        Category(name=f'Categoría {i}') for i in range(8)
+    ])
+    if categories[0].pk is None:
+        # MySQL no regresa los ids de bulk_create
+        categories = list(Category.objects.order_by('id'))
+    first_product = Product.objects.count()
+    catalog = Product.objects.bulk_create([
+        Product(
+            name=f'Producto {i}',
+            description=f'Descripción del producto {i}',
+            category=categories[i % len(categories)],
+            price=Decimal(rng.randint(10, 90)),
+            stock=rng.randint(0, 100),
+            is_active=rng.random() > 0.1,
+        )
+        for i in range(first_product, first_product + products)
+    ])
+    if catalog and catalog[0].pk is None:
+        catalog = list(Product.objects.order_by('-id')[:len(catalog)])[::-1]
+
+    now = timezone.now()
+    first_order = Order.objects.count()
+    created = Order.objects.bulk_create([
+        Order(
+            order_number=f'AUD-{i:08d}',
+            customer=admin if i % 10 == 0 else None,
+            total=0,
+            status=rng.choice(['completed', 'pending', 'cancelled']),
+            payment_method='cash',
+            payment_status='completed',
+        )
+        for i in range(first_order, first_order + orders)
+    ])
+    if created and created[0].pk is None:
+        ids = dict(Order.objects.filter(
+            order_number__in=[order.order_number for order in created]
+        ).values_list('order_number', 'id'))
+        for order in created:
+            order.pk = ids[order.order_number]
+    # created_at es auto_now_add: se reparte en el historial después de crear
+    for order in created:
+        order.created_at = now - timedelta(minutes=rng.randint(0, days * 24 * 60))
+
+    items = []
+    for order in created:
+        for product in rng.sample(catalog, items_per_order):
+            quantity = rng.randint(1, 3)
+            items.append(OrderItem(
+                order=order,
+                product=product,
+                quantity=quantity,
+                unit_price=product.price,
+                subtotal=product.price * quantity,
+            ))
+            order.total += product.price * quantity
+    Order.objects.bulk_update(created, ['created_at', 'total'], batch_size=500)
+    OrderItem.objects.bulk_create(items, batch_size=500)
+
+    rebuild_rollups()
+    rebuild_search_index()
+    return admin
+
+
+def audited_urls(admin):
+    """(nombre, URL) de las vistas GET a revisar"""
+    order = Order.objects.filter(customer=admin).first()
+    other_order = Order.objects.exclude(customer=admin).first()
+    product = Product.objects.filter(is_active=True).first()
+    today = timezone.localdate()
+    return [
+        ('home', reverse('home')),
+        ('search_products', reverse('search_products') + '?q=producto'),
+        ('products_by_category', reverse('products_by_category', args=[product.category_id])),
+        ('product_detail', reverse('product_detail', args=[product.id])),
+        ('multi_sale', reverse('multi_sale')),
+        ('pos_catalog', reverse('pos_catalog')),
+        ('sale_api_cart', reverse('sale_api_cart')),
+        ('sale_receipt', reverse('sale_receipt', args=[other_order.id])),
+        ('receipt_document', reverse('receipt_document', args=[other_order.id, 'txt'])),
+        ('user_orders', reverse('user_orders')),
+        ('order_detail', reverse('order_detail', args=[order.id])),
+        ('admin_dashboard', reverse('admin_dashboard')),
+        ('admin_products', reverse('admin_products')),
+        ('admin_categories', reverse('admin_categories')),
+        ('admin_orders', reverse('admin_orders')),
+        ('admin_orders', reverse('admin_orders') + '?status=pending'),
+        ('admin_orders', reverse('admin_orders') + f'?cashier={admin.id}&payment_method=cash&fecha_inicio={today - timedelta(days=30):%Y-%m-%d}'),
+        ('admin_order_detail', reverse('admin_order_detail', args=[other_order.id])),
+        ('reports', reverse('reports')),
+        ('reports', reverse('reports') + f'?fecha_inicio={today - timedelta(days=30):%Y-%m-%d}&fecha_fin={today:%Y-%m-%d}'),
+        ('admin_users', reverse('admin_users')),
+        ('admin_jobs', reverse('admin_jobs')),
+        ('admin_jobs', reverse('admin_jobs') + '?status=failed'),
+    ]
+
+
+# Bases de datos cuyo EXPLAIN sabe leer full_table_scans()
+EXPLAIN_VENDORS = ('sqlite', 'mysql', 'postgresql')
+
+
+def full_table_scans(sql):
+    """Tablas que el plan de `sql` recorre completas (según EXPLAIN)"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            details = [row[-1] for row in cursor.fetchall()]
+            return {match.group(1) for match in map(_SQLITE_SCAN.match, details) if match}
+        if connection.vendor == 'mysql':
+            cursor.execute('EXPLAIN ' + sql)
+            columns = [column[0] for column in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            return {row['table'] for row in rows if row['type'] == 'ALL'}
+        if connection.vendor == 'postgresql':
+            cursor.execute('EXPLAIN ' + sql)
+            return {match.group(1) for (line,) in cursor.fetchall() for match in _POSTGRES_SCAN.finditer(line)}
+    raise ValueError(f'EXPLAIN no soportado para {connection.vendor} (solo {", ".join(EXPLAIN_VENDORS)})')
+
+
+@contextmanager
+def isolated_cache():
+    """Caché en memoria, vacía y solo de este proceso, en lugar de CACHES"""
+    with override_settings(
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'query-audit'}},
+        POS_CART_CACHE='default',
+    ):
+        cache.clear()
+        yield
+
+
+def audit_views(admin, urls=None):
+    """
+    Visita cada URL como `admin` y regresa los recorridos completos:
+    [(nombre, URL, tabla, sql)]. Una lista vacía significa que todo pasa.
+    """
+    client = Client()
+    client.force_login(admin)
+
+    problems = []
+    for name, url in urls or audited_urls(admin):
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+        if response.status_code >= 400:
+            raise AssertionError(f'{url} respondió {response.status_code}')
+
+        allowed = ALLOWED_SCANS.get(name, {})
+        for query in ctx.captured_queries:
+            sql = query['sql']
+            if not _FILTERED_SELECT.match(_AGGREGATE_FILTER.sub('', sql)):
+                continue
+            for table in sorted(full_table_scans(sql)):
+                if table in AUDITED_TABLES and table not in allowed:
+                    problems.append((name, url, table, sql))
+    return problems
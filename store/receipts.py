@@ -0,0 +1,234 @@
+# store/receipts.py - Tickets de venta precalculados
+"""
+El ticket de cada orden se arma una sola vez al cobrar (ReceiptDocument)
+y sus versiones en texto, ESC/POS, HTML compacto y PDF se sirven desde
+caché. Reimprimir o enviar una copia no consulta órdenes ni productos.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.dateformat import format as date_format
+
+from .models import Order, OrderItem, ReceiptDocument
+from .templatetags.receipt_extras import extract_payment, extract_change
+
+RECEIPT_FORMATS = {
+    'txt': 'text/plain; charset=utf-8',
+    'escpos': 'application/octet-stream',
+    'html': 'text/html; charset=utf-8',
+    'pdf': 'application/pdf',
+}
+
+STORE_HEADER = [
+    'CafeITO',
+    'Tu Panadería y Cafetería Favorita',
+    'Ciudad de México, México',
+    'Tel: +52 55 1234 5678',
+]
+STORE_FOOTER = [
+    '¡Gracias por su compra!',
+    'Conserve su ticket',
+    'www.cafeito.com',
+]
+
+
+def _cache_key(order_id, fmt='data'):
+    return f'store:receipt:{order_id}:{fmt}'
+
+
+def _cache_timeout():
+    return getattr(settings, 'RECEIPT_CACHE_TIMEOUT', 60 * 60 * 24 * 7)
+
+
+def build_receipt_data(order, lines, cashier=None):
+    """
+    Arma el documento del ticket. `lines` es una lista de
+    (nombre, cantidad, precio unitario, subtotal); no hace consultas.
+    """
+    if cashier is None:
+        cashier = order.customer.username if order.customer_id else ''
+
+    payment = order.payment_received
+    has_payment = payment is not None or bool(order.notes)
+
+    return {
+        'order_id': order.id,
+        'order_number': order.order_number,
+        'created_at': date_format(timezone.localtime(order.created_at), 'd/m/Y H:i'),
+        'cashier': cashier,
+        'payment_method': 'Efectivo' if order.payment_method == 'cash' else order.payment_method.title(),
+        'items': [
+            {
+                'name': name,
+                'quantity': quantity,
+                'unit_price': f'{unit_price:.2f}',
+                'subtotal': f'{subtotal:.2f}',
+            }
+            for name, quantity, unit_price, subtotal in lines
+        ],
+        'total': f'{order.total:.2f}',
+        'payment_received': extract_payment(order) if has_payment else None,
+        'change_amount': extract_change(order) if has_payment else None,
+    }
+
+
+def receipt_for_checkout(order, items, cashier):
+    """ReceiptDocument (sin guardar) para una venta recién cobrada"""
+    return ReceiptDocument(
+        order=order,
+        data=build_receipt_data(
+            order,
+            [(product.name, quantity, product.price, subtotal) for product, quantity, subtotal in items],
+            cashier=cashier
+        )
+    )
+
+
+def cache_receipts(documents):
+    """Guarda en caché los documentos de ticket recién creados"""
+    cache.set_many(
+        {_cache_key(document.order_id): document.data for document in documents},
+        _cache_timeout()
+    )
+
+
+def get_receipt(order_id):
+    """
+    Documento del ticket: caché -> tabla receipt_documents -> se arma desde
+    la orden (órdenes anteriores a los tickets precalculados). None si no existe.
+    """
+    data = cache.get(_cache_key(order_id))
+    if data is not None:
+        return data
+
+    document = ReceiptDocument.objects.filter(order_id=order_id).first()
+    if document is None:
+        order = Order.objects.select_related('customer').filter(id=order_id).first()
+        if order is None:
+            return None
+        lines = [
+            (item.product.name, item.quantity, item.unit_price, item.subtotal)
+            for item in OrderItem.objects.filter(order=order).select_related('product')
+        ]
+        document, _ = ReceiptDocument.objects.get_or_create(
+            order=order, defaults={'data': build_receipt_data(order, lines)}
+        )
+
+    cache.set(_cache_key(order_id), document.data, _cache_timeout())
+    return document.data
+
+
+def render_text(receipt, width=None):
+    """Ticket en texto plano de ancho fijo (impresora térmica)"""
+    width = width or getattr(settings, 'RECEIPT_TEXT_WIDTH', 42)
+    rule = '-' * width
+
+    def columns(left, right):
+        return f'{left[:width - len(right) - 1]:<{width - len(right)}}{right}'
+
+    lines = [line[:width].center(width).rstrip() for line in STORE_HEADER]
+    lines += [
+        rule,
+        columns('Ticket #:', receipt['order_number']),
+        columns('Fecha:', receipt['created_at']),
+        columns('Atendió:', receipt['cashier']),
+        columns('Método de pago:', receipt['payment_method']),
+        rule,
+    ]
+    for item in receipt['items']:
+        lines.append(item['name'][:width])
+        lines.append(columns(f"  {item['quantity']} x ${item['unit_price']}", f"${item['subtotal']}"))
+    lines += [
+        rule,
+        columns('TOTAL:', f"${receipt['total']} MXN"),
+    ]
+    if receipt['payment_received'] is not None:
+        lines.append(columns('Pago recibido:', f"${receipt['payment_received']} MXN"))
+        lines.append(columns('Cambio:', f"${receipt['change_amount']} MXN"))
+    lines.append(rule)
+    lines += [line[:width].center(width).rstrip() for line in STORE_FOOTER]
+    return '\n'.join(lines) + '\n'
+
+
+def render_escpos(receipt):
+    """Ticket con comandos ESC/POS: inicializa, página de códigos 850, texto y corte"""
+    return b''.join([
+        b'\x1b@',        # ESC @  inicializar impresora
+        b'\x1bt\x02',    # ESC t 2  página de códigos PC850 (acentos)
+        render_text(receipt).encode('cp850', errors='replace'),
+        b'\n\n\n',
+        b'\x1dVB\x00',   # GS V B 0  avanzar y cortar
+    ])
+
+
+def render_html(receipt):
+    """Ticket en HTML compacto e independiente (sin base.html)"""
+    return render_to_string('store/receipt_compact.html', {'receipt': receipt})
+
+
+def _pdf_escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def render_pdf(receipt):
+    """Ticket en PDF de una página, tamaño rollo de 80 mm, con fuente Courier"""
+    lines = render_text(receipt, width=42).rstrip('\n').split('\n')
+    font_size = 8
+    leading = 10
+    page_width = 227  # 80 mm en puntos
+    page_height = 40 + leading * len(lines)
+
+    text = [f'BT /F1 {font_size} Tf {leading} TL 12 {page_height - 20} Td']
+    for line in lines:
+        text.append(f'({_pdf_escape(line)}) Tj T*')
+    text.append('ET')
+    stream = '\n'.join(text).encode('cp1252', errors='replace')
+
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {page_width} {page_height}] '
+        f'/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>'.encode(),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>',
+        f'<< /Length {len(stream)} >>\nstream\n'.encode() + stream + b'\nendstream',
+    ]
+
+    pdf = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += f'{number} 0 obj\n'.encode() + body + b'\nendobj\n'
+
+    xref = len(pdf)
+    pdf += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    for offset in offsets:
+        pdf += f'{offset:010d} 00000 n \n'.encode()
+    pdf += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    return bytes(pdf)
+
+
+RENDERERS = {
+    'txt': render_text,
+    'escpos': render_escpos,
+    'html': render_html,
+    'pdf': render_pdf,
+}
+
+
+def render_receipt(order_id, fmt):
+    """Ticket ya renderizado en el formato pedido (desde caché si existe). None si no existe la orden"""
+    key = _cache_key(order_id, fmt)
+    content = cache.get(key)
+    if content is None:
+        receipt = get_receipt(order_id)
+        if receipt is None:
+            return None
+        content = RENDERERS[fmt](receipt)
+        cache.set(key, content, _cache_timeout())
+    return content
+
+
+def invalidate_receipt(order_id):
+    """Borra de caché el documento y todas las versiones renderizadas de un ticket"""
+    cache.delete_many([_cache_key(order_id)] + [_cache_key(order_id, fmt) for fmt in RENDERERS])
@@ -0,0 +1,64 @@
+# store/roles.py - Roles del usuario (grupos) con caché
+"""
+Los nombres de grupos de un usuario se leen una vez y se guardan en la
+caché compartida; dentro de la misma petición se reutiliza el objeto ya
+resuelto. Las señales (signals.py) borran la entrada cuando cambian los
+grupos del usuario, cuando se borra o renombra un grupo, o cuando se
+crea un usuario nuevo (su id pudo ser de otro usuario).
+
+UserRolesMiddleware expone el resultado como `request.user_roles`.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+ADMIN_GROUP = 'Administrador'
+SELLER_GROUP = 'Vendedor'
+
+
+def _cache_key(user_id):
+    return f'store:user_roles:{user_id}'
+
+
+class UserRoles:
+    """Grupos de un usuario y los permisos que se derivan de ellos"""
+
+    def __init__(self, user, groups):
+        self.is_staff = bool(getattr(user, 'is_staff', False))
+        self.groups = frozenset(groups)
+
+    def __contains__(self, group):
+        return group in self.groups
+
+    @property
+    def is_admin(self):
+        return self.is_staff or ADMIN_GROUP in self.groups
+
+    @property
+    def is_vendedor(self):
+        return SELLER_GROUP in self.groups
+
+    @property
+    def is_vendedor_or_admin(self):
+        return self.is_admin or self.is_vendedor
+
+
+def get_roles(user):
+    """
+    Roles de `user`: a lo más una consulta por usuario mientras siga en
+    caché, y ninguna si el mismo objeto ya se resolvió en esta petición.
+    """
+    if not user.is_authenticated:
+        return UserRoles(user, ())
+    roles = getattr(user, '_store_roles', None)
+    if roles is None:
+        groups = cache.get(_cache_key(user.pk))
+        if groups is None:
+            groups = list(user.groups.values_list('name', flat=True))
+            cache.set(_cache_key(user.pk), groups, getattr(settings, 'USER_ROLES_CACHE_TIMEOUT', 300))
+        roles = user._store_roles = UserRoles(user, groups)
+    return roles
+
+
+def invalidate_roles(user_ids):
+    """Olvida los roles en caché de estos usuarios"""
+    cache.delete_many([_cache_key(user_id) for user_id in user_ids])
@@ -0,0 +1,217 @@
+# store/rollups.py - Ventas acumuladas por día para reportes y dashboard
+"""
+Las tablas daily_sales_rollups (día x producto) y daily_order_rollups
+(día) se actualizan en la misma transacción que cada venta, así que los
+reportes y el dashboard leen unas cuantas filas por día en lugar de
+recorrer orders y order_items.
+
+El día es la fecha local (TIME_ZONE) de la orden. Las órdenes creadas o
+borradas por otros medios (admin de Django, scripts) no se reflejan
+hasta correr `python manage.py rebuild_sales_rollups`.
+"""
+from datetime import datetime, time
+
+from django.db import transaction
+from django.db.models import F, Q, Case, When, Sum
+from django.utils import timezone
+
+from .invalidation import ORDER, changed
+from .models import Category, Order, OrderItem, DailySalesRollup, DailyOrderRollup
+
+
+def _add_to_rollup(model, key_fields, deltas, defaults=None):
+    """
+    Suma `deltas` ({llave: {campo: incremento}}) a las filas de `model`
+    identificadas por `key_fields`. Siempre son dos consultas: un INSERT
+    que ignora las filas que ya existen (crea las faltantes en cero) y un
+    UPDATE ... CASE que incrementa todas. Dos cajas que cobran a la vez
+    no se pisan porque el incremento lo hace la base de datos.
+    `defaults(llaves)` da los campos extra de las filas nuevas.
+    """
+    if not deltas:
+        return
+
+    extra = defaults(list(deltas)) if defaults else {}
+    fields = next(iter(deltas.values())).keys()
+    model.objects.bulk_create([
+        model(**dict(zip(key_fields, key)), **extra.get(key, {}))
+        for key in deltas
+    ], ignore_conflicts=True)
+
+    match = Q()
+    for key in deltas:
+        match |= Q(**dict(zip(key_fields, key)))
+    model.objects.filter(match).update(**{
+        field: Case(
+            *[When(Q(**dict(zip(key_fields, key))), then=F(field) + row[field]) for key, row in deltas.items()],
+            default=F(field)
+        )
+        for field in fields
+    })
+
+
+def _product_defaults(products):
+    """Campos descriptivos de las filas nuevas (una consulta a categorías)"""
+    def defaults(keys):
+        category_ids = {products[product_id].category_id for day, product_id in keys}
+        names = dict(Category.objects.filter(id__in=category_ids).values_list('id', 'name'))
+        return {
+            (day, product_id): {
+                'category_id': products[product_id].category_id,
+                'product_name': products[product_id].name,
+                'category_name': names.get(products[product_id].category_id, ''),
+            }
+            for day, product_id in keys
+        }
+    return defaults
+
+
+def record_sales(sales):
+    """
+    Suma ventas recién creadas a los acumulados. `sales` es una lista de
+    (order, items) con items = [(product, quantity, subtotal)], tal como
+    los arma checkout. Debe llamarse dentro de la transacción de la venta.
+    """
+    order_deltas = {}
+    product_deltas = {}
+    products = {}
+    for order, items in sales:
+        day = timezone.localdate(order.created_at)
+
+        totals = order_deltas.setdefault((day,), {'order_count': 0, 'revenue': 0})
+        totals['order_count'] += 1
+        totals['revenue'] += order.total
+
+        for product, quantity, subtotal in items:
+            products[product.id] = product
+            row = product_deltas.setdefault((day, product.id), {'quantity': 0, 'revenue': 0, 'order_count': 0})
+            row['quantity'] += quantity
+            row['revenue'] += subtotal
+            row['order_count'] += 1
+
+    _add_to_rollup(DailyOrderRollup, ('date',), order_deltas)
+    _add_to_rollup(DailySalesRollup, ('date', 'product_id'), product_deltas, _product_defaults(products))
+
+
+def day_bounds(start, end):
+    """Rango [inicio, fin] en datetimes locales para filtrar orders.created_at"""
+    bounds = {}
+    if start:
+        bounds['created_at__gte'] = timezone.make_aware(datetime.combine(start, time.min))
+    if end:
+        bounds['created_at__lte'] = timezone.make_aware(datetime.combine(end, time.max))
+    return bounds
+
+
+def rebuild_rollups(start=None, end=None, batch_size=1000):
+    """
+    Recalcula los acumulados desde orders/order_items (todo el historial o
+    solo los días entre `start` y `end`). Recorre las tablas con iterator()
+    para no cargarlas completas en memoria.
+    Regresa (días, filas por producto).
+    """
+    days = {}
+    rows = {}
+
+    orders = Order.objects.filter(**day_bounds(start, end)).values_list('created_at', 'total')
+    for created_at, total in orders.iterator(chunk_size=batch_size):
+        day = timezone.localdate(created_at)
+        totals = days.setdefault(day, {'order_count': 0, 'revenue': 0})
+        totals['order_count'] += 1
+        totals['revenue'] += total
+
+    items = OrderItem.objects.filter(
+        **{f'order__{lookup}': value for lookup, value in day_bounds(start, end).items()}
+    ).values_list(
+        'order__created_at', 'product_id', 'product__name',
+        'product__category_id', 'product__category__name', 'quantity', 'subtotal'
+    )
+    for created_at, product_id, name, category_id, category_name, quantity, subtotal in items.iterator(chunk_size=batch_size):
+        if name is None:
+            # Producto eliminado (order_items conserva el id sin llave foránea válida)
+            continue
+        row = rows.setdefault((timezone.localdate(created_at), product_id), {
+            'category_id': category_id,
+            'product_name': name,
+            'category_name': category_name,
+            'quantity': 0,
+            'revenue': 0,
+            'order_count': 0,
+        })
+        row['quantity'] += quantity
+        row['revenue'] += subtotal
+        row['order_count'] += 1
+
+    with transaction.atomic():
+        date_range = {}
+        if start:
+            date_range['date__gte'] = start
+        if end:
+            date_range['date__lte'] = end
+        DailyOrderRollup.objects.filter(**date_range).delete()
+        DailySalesRollup.objects.filter(**date_range).delete()
+
+        DailyOrderRollup.objects.bulk_create(
+            [DailyOrderRollup(date=day, **totals) for day, totals in days.items()],
+            batch_size=batch_size
+        )
+        DailySalesRollup.objects.bulk_create(
+            [DailySalesRollup(date=day, product_id=product_id, **row) for (day, product_id), row in rows.items()],
+            batch_size=batch_size
+        )
+        changed(ORDER)
+
+    return len(days), len(rows)
+
+
+def _order_rollups(start, end):
+    rollups = DailyOrderRollup.objects.all()
+    if start:
+        rollups = rollups.filter(date__gte=start)
+    if end:
+        rollups = rollups.filter(date__lte=end)
+    return rollups
+
+
+def _totals(totals):
+    return {'revenue': totals['revenue'] or 0, 'order_count': totals['order_count'] or 0}
+
+
+def sales_totals(start=None, end=None):
+    """{'revenue': Decimal, 'order_count': int} de los días indicados"""
+    return _totals(_order_rollups(start, end).aggregate(revenue=Sum('revenue'), order_count=Sum('order_count')))
+
+
+async def asales_totals(start=None, end=None):
+    """sales_totals() para las vistas async"""
+    return _totals(await _order_rollups(start, end).aaggregate(revenue=Sum('revenue'), order_count=Sum('order_count')))
+
+
+def product_rollups(start=None, end=None):
+    """Acumulados por día y producto de los días indicados"""
+    rollups = DailySalesRollup.objects.all()
+    if start:
+        rollups = rollups.filter(date__gte=start)
+    if end:
+        rollups = rollups.filter(date__lte=end)
+    return rollups
+
+
+def top_selling_products(start=None, end=None, limit=10):
+    """Productos más vendidos: product_name, category_name, total_qty, total_revenue"""
+    return product_rollups(start, end).values(
+        'product_name', 'category_name'
+    ).annotate(
+        total_qty=Sum('quantity'),
+        total_revenue=Sum('revenue')
+    ).order_by('-total_qty')[:limit]
+
+
+def sales_by_category(start=None, end=None):
+    """Ventas por categoría: category_name, total_qty, total_revenue"""
+    return product_rollups(start, end).values(
+        'category_name'
+    ).annotate(
+        total_revenue=Sum('revenue'),
+        total_qty=Sum('quantity')
+    ).order_by('-total_revenue')
@@ -0,0 +1,245 @@
+# store/search.py - Búsqueda de productos con índice propio
+"""
+Búsqueda de productos por nombre, tipo, categoría y descripción.
+
+El texto se normaliza igual al indexar y al buscar: minúsculas, sin
+acentos ("Café" y "cafe" son el mismo término) y sin palabras vacías.
+Solo se indexan productos activos; las señales de Product y Category
+mantienen el índice al día.
+
+El backend se elige con el setting PRODUCT_SEARCH_BACKEND (ruta a la
+clase):
+
+- InvertedIndexBackend (por defecto): tabla product_search_terms
+  (término, producto, peso). Funciona en cualquier base de datos.
+- MySQLFullTextBackend: tabla product_search_documents con índice
+  FULLTEXT. InnoDB no ve en el índice los cambios sin commit, así que no
+  sirve dentro de TestCase.
+
+Al cambiar de backend: `python manage.py rebuild_search_index`.
+"""
+import re
+import threading
+import unicodedata
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connection, transaction
+from django.db.models import Q, F, Case, When, Value, Sum, Count, Max
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .models import Product, ProductSearchTerm, ProductSearchDocument
+
+STOPWORDS = {
+    'a', 'al', 'con', 'de', 'del', 'el', 'en', 'la', 'las', 'lo', 'los',
+    'o', 'para', 'por', 'sin', 'su', 'un', 'una', 'y',
+}
+
+# Peso de cada campo en la relevancia
+FIELD_WEIGHTS = {'name': 4, 'tipo': 2, 'category': 2, 'description': 1}
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+# Letras mínimas del último término para buscarlo como prefijo
+MIN_PREFIX_LENGTH = 3
+
+
+def fold(text):
+    """Minúsculas y sin acentos: 'Café Olé' -> 'cafe ole'"""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def tokenize(text):
+    """Términos de búsqueda de un texto, sin repetir y en orden"""
+    tokens = []
+    for token in _TOKEN.findall(fold(text)):
+        if token not in STOPWORDS and token not in tokens:
+            tokens.append(token[:64])
+    return tokens
+
+
+def product_fields(name, tipo, category, description):
+    """Campos indexables de un producto ({campo: texto})"""
+    return {'name': name, 'tipo': tipo, 'category': category, 'description': description}
+
+
+def product_terms(fields):
+    """{término: peso} de los campos de un producto"""
+    terms = {}
+    for field, text in fields.items():
+        for token in tokenize(text):
+            terms[token] = terms.get(token, 0) + FIELD_WEIGHTS[field]
+    return terms
+
+
+def product_body(fields):
+    """Texto para FULLTEXT; los campos con más peso se repiten"""
+    return ' '.join(
+        ' '.join(tokenize(text))
+        for field, text in fields.items()
+        for _ in range(FIELD_WEIGHTS[field])
+    )
+
+
+def _fields(product):
+    return product_fields(product.name, product.tipo, product.category.name, product.description)
+
+
+class InvertedIndexBackend:
+    """
+    Índice invertido en la tabla product_search_terms. Todos los términos
+    deben aparecer; el último también cuenta como prefijo ("caf" encuentra
+    "café"). Se ordena por la suma de pesos de los términos encontrados.
+    """
+
+    def index(self, products):
+        """Reemplaza los términos de `products` (con su categoría cargada)"""
+        with transaction.atomic():
+            ProductSearchTerm.objects.filter(product_id__in=[product.id for product in products]).delete()
+            ProductSearchTerm.objects.bulk_create([
+                ProductSearchTerm(term=term, product_id=product.id, weight=weight)
+                for product in products if product.is_active
+                for term, weight in product_terms(_fields(product)).items()
+            ], batch_size=1000)
+
+    def clear(self):
+        ProductSearchTerm.objects.all().delete()
+
+    def search(self, query):
+        """
+        QuerySet de ids de productos ordenados por relevancia; la suma de
+        pesos, el filtro de "todos los términos" y el orden se hacen en SQL,
+        así que paginarlo solo lee una página.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return ProductSearchTerm.objects.none().values_list('product_id', flat=True)
+        *whole, last = tokens
+        if len(last) >= MIN_PREFIX_LENGTH:
+            # Rango en lugar de LIKE para que el prefijo use el índice en cualquier base
+            prefix = Q(term__gte=last, term__lt=last + '{')
+        else:
+            # Una o dos letras coincidirían con casi todo el índice: solo exacto
+            prefix = Q(term=last)
+        match = prefix | Q(term__in=whole) if whole else prefix
+
+        return ProductSearchTerm.objects.filter(match).values('product_id').annotate(
+            # Coincidencia exacta vale el doble que un prefijo
+            score=Sum(Case(When(term__in=tokens, then=F('weight') * 2), default=F('weight'))),
+            # Términos de la búsqueda que aparecen (todos son obligatorios)
+            found=Count(Case(When(term__in=whole, then=F('term'))), distinct=True)
+            + Max(Case(When(prefix, then=Value(1)), default=Value(0))),
+        ).filter(found=len(tokens)).order_by('-score', 'product_id').values_list('product_id', flat=True)
+
+
+class _RawIds:
+    """
+    Ids de una consulta SQL cruda, con count() y rebanadas que corren
+    COUNT(*) y LIMIT/OFFSET: Paginator solo lee una página.
+    """
+
+    def __init__(self, sql, params):
+        self.sql = sql
+        self.params = params
+
+    def count(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM ({self.sql}) AS hits', self.params)
+            return cursor.fetchone()[0]
+
+    def __getitem__(self, window):
+        start = window.start or 0
+        with connection.cursor() as cursor:
+            cursor.execute(f'{self.sql} LIMIT %s OFFSET %s', [*self.params, window.stop - start, start])
+            return [row[0] for row in cursor.fetchall()]
+
+    def __iter__(self):
+        return iter(self[0:self.count()])
+
+
+class MySQLFullTextBackend:
+    """
+    Índice FULLTEXT de MySQL sobre product_search_documents.body (modo
+    booleano: todos los términos requeridos, como prefijo).
+    """
+
+    def index(self, products):
+        with transaction.atomic():
+            ProductSearchDocument.objects.filter(product_id__in=[product.id for product in products]).delete()
+            ProductSearchDocument.objects.bulk_create([
+                ProductSearchDocument(product_id=product.id, body=product_body(_fields(product)))
+                for product in products if product.is_active
+            ], batch_size=1000)
+
+    def clear(self):
+        ProductSearchDocument.objects.all().delete()
+
+    def search(self, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        against = ' '.join(f'+{token}*' for token in tokens)
+        return _RawIds(
+            'SELECT product_id FROM product_search_documents '
+            'WHERE MATCH(body) AGAINST (%s IN BOOLEAN MODE) '
+            'ORDER BY MATCH(body) AGAINST (%s IN BOOLEAN MODE) DESC, product_id',
+            [against, against]
+        )
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Instancia (una por proceso) del backend configurado"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                path = getattr(settings, 'PRODUCT_SEARCH_BACKEND', 'store.search.InvertedIndexBackend')
+                _backend = import_string(path)()
+    return _backend
+
+
+@receiver(setting_changed)
+def _reset_backend(setting, **kwargs):
+    """Vuelve a crear el backend si cambia su configuración (tests)"""
+    global _backend
+    if setting.startswith('PRODUCT_SEARCH_'):
+        _backend = None
+
+
+def index_products(product_ids):
+    """Vuelve a indexar productos (los inactivos salen del índice)"""
+    products = Product.objects.filter(id__in=list(product_ids)).select_related('category')
+    get_backend().index(list(products))
+
+
+def rebuild_search_index(batch_size=500):
+    """Reconstruye todo el índice; regresa cuántos productos se indexaron"""
+    backend = get_backend()
+    backend.clear()
+    count = 0
+    products = Product.objects.filter(is_active=True).select_related('category').order_by('id')
+    batch = []
+    for product in products.iterator(chunk_size=batch_size):
+        batch.append(product)
+        if len(batch) >= batch_size:
+            backend.index(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        backend.index(batch)
+        count += len(batch)
+    return count
+
+
+def search(query):
+    """
+    Ids de productos activos que coinciden con `query`, por relevancia.
+    Es perezoso (count() y rebanadas): se pasa a Paginator, no a list().
+    """
+    return get_backend().search(query)
@@ -0,0 +1,135 @@
+# store/signals.py - Receptores de señales de la tienda
+from django.contrib.auth.models import User, Group
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import pre_save, post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+
+from .models import Category, Product, Order
+from .carts import delete_cart
+from .invalidation import PRODUCT, CATEGORY, ORDER, catalog_changed, changed
+from .images import queue_variants, delete_variants
+from .receipts import invalidate_receipt
+from .search import index_products
+from .suggest import invalidate_suggestions
+from .roles import invalidate_roles
+
+
+@receiver(pre_save, sender=Product)
+def product_moving(sender, instance, raw=False, **kwargs):
+    """Recuerda la categoría anterior: su página también deja de mostrar el producto"""
+    instance._previous_category_id = None
+    if instance.pk and not raw:
+        instance._previous_category_id = sender.objects.filter(pk=instance.pk).values_list('category_id', flat=True).first()
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def product_changed(sender, instance, **kwargs):
+    """Sube las versiones del catálogo (invalidation.py) del producto y sus categorías"""
+    categories = {instance.category_id, getattr(instance, '_previous_category_id', None)} - {None}
+    changed(PRODUCT, product_ids=[instance.pk], category_ids=categories)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    """Sube las versiones de las categorías y de la categoría cambiada"""
+    changed(CATEGORY, category_ids=[instance.pk])
+
+
+@receiver(catalog_changed)
+def product_names_changed(sender, **kwargs):
+    """Las sugerencias del buscador se reconstruyen en cada worker (no con el stock)"""
+    if sender == PRODUCT:
+        invalidate_suggestions()
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, **kwargs):
+    """Actualiza el índice de búsqueda del producto"""
+    index_products([instance.id])
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, **kwargs):
+    """El nombre de la categoría también se busca: reindexar sus productos"""
+    index_products(instance.product_set.values_list('id', flat=True))
+
+
+@receiver(pre_save, sender=Product)
+@receiver(pre_save, sender=Category)
+def image_uploading(sender, instance, **kwargs):
+    """Recuerda si se está subiendo una imagen nueva y cuál reemplaza"""
+    instance._uploaded_image = bool(instance.image) and not instance.image._committed
+    instance._replaced_image = None
+    if instance._uploaded_image and instance.pk:
+        instance._replaced_image = sender.objects.filter(pk=instance.pk).values_list('image', flat=True).first()
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Category)
+def image_uploaded(sender, instance, **kwargs):
+    """Encola miniaturas y WebP de la imagen subida; borra las de la anterior"""
+    if getattr(instance, '_uploaded_image', False):
+        if instance._replaced_image:
+            delete_variants(instance._replaced_image)
+        queue_variants(instance.image.name)
+        instance._uploaded_image = False
+
+
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Category)
+def image_owner_deleted(sender, instance, **kwargs):
+    """Las variantes no sirven sin el registro"""
+    if instance.image:
+        delete_variants(instance.image.name)
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def order_changed(sender, instance, **kwargs):
+    """Los indicadores de ventas del dashboard (dashboard.py) ya no sirven"""
+    changed(ORDER)
+
+
+@receiver(post_delete, sender=Order)
+def order_deleted(sender, instance, **kwargs):
+    """Una orden eliminada ya no debe servir su ticket desde caché"""
+    invalidate_receipt(instance.id)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def user_groups_changed(sender, instance, action, pk_set, **kwargs):
+    """Los roles en caché de los usuarios afectados ya no sirven"""
+    if isinstance(instance, User):
+        if action.startswith('post_'):
+            instance.__dict__.pop('_store_roles', None)
+            invalidate_roles([instance.pk])
+    elif action == 'pre_clear':
+        # group.user_set.clear(): después ya no se sabe a quién afectó
+        invalidate_roles(instance.user_set.values_list('id', flat=True))
+    elif action.startswith('post_') and pk_set:
+        invalidate_roles(pk_set)
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def group_changed(sender, instance, created=False, **kwargs):
+    """Grupo renombrado o borrado: olvidar los roles de sus usuarios"""
+    if not created:
+        invalidate_roles(instance.user_set.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, created=True, **kwargs):
+    """Un usuario nuevo puede reutilizar el id de otro borrado"""
+    if created:
+        invalidate_roles([instance.pk])
+
+
+@receiver(user_logged_out)
+def discard_cart(sender, request, **kwargs):
+    """Al cerrar sesión el carrito de la caja se descarta, como antes con la sesión"""
+    if request is not None and hasattr(request, 'session'):
+        delete_cart(request.session.session_key)
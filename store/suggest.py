@@ -0,0 +1,146 @@
+# store/suggest.py - Sugerencias de búsqueda mientras se escribe
+"""
+Índice en memoria (por proceso) de los nombres de productos activos: una
+lista ordenada de claves sin acentos, una por cada palabra del nombre
+("cafe americano", "americano"), donde un prefijo se busca con bisect.
+Las respuestas se memorizan en un LRU acotado por prefijo.
+
+Cuando cambia un producto, las señales guardan una versión nueva en la
+caché compartida; cada worker compara esa versión y reconstruye su
+índice (y vacía su LRU) la siguiente vez que responde.
+"""
+import threading
+import uuid
+from bisect import bisect_left
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+
+from .models import Product
+from .search import fold
+
+SUGGEST_VERSION_CACHE_KEY = 'store:suggest_version'
+
+
+class LRUCache:
+    """Diccionario acotado: al llenarse descarta lo menos usado"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class PrefixIndex:
+    """Claves ordenadas -> productos; buscar un prefijo es O(log n + resultados)"""
+
+    def __init__(self, products):
+        self.products = products
+        entries = []
+        for position, product in enumerate(products):
+            words = fold(product['name']).split()
+            for start in range(len(words)):
+                # La primera palabra ordena antes que las siguientes
+                entries.append((' '.join(words[start:]), start > 0, position))
+        entries.sort()
+        self.keys = [key for key, _, _ in entries]
+        self.entries = entries
+
+    def lookup(self, prefix, limit):
+        """Productos cuyo nombre (o alguna de sus palabras) empieza con `prefix`"""
+        results = []
+        seen = set()
+        for index in range(bisect_left(self.keys, prefix), len(self.keys)):
+            if not self.keys[index].startswith(prefix):
+                break
+            _, later_word, position = self.entries[index]
+            if position not in seen:
+                seen.add(position)
+                results.append((later_word, self.products[position]['name'], position))
+        results.sort()
+        return [self.products[position] for _, _, position in results[:limit]]
+
+
+def build_index():
+    """Índice con los productos activos (una consulta)"""
+    products = [
+        {
+            'id': product_id,
+            'name': name,
+            'price': str(price),
+            'url': reverse('product_detail', args=[product_id]),
+        }
+        for product_id, name, price in Product.objects.filter(is_active=True).values_list('id', 'name', 'price')
+    ]
+    return PrefixIndex(products)
+
+
+class Suggester:
+    """
+    Índice y LRU de un proceso. Se reemplazan juntos cuando cambia la
+    versión, así una búsqueda sobre el índice viejo no ensucia el LRU nuevo.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = (None, None, None)
+
+    def _current(self):
+        version = cache.get(SUGGEST_VERSION_CACHE_KEY)
+        state = self._state
+        if state[1] is None or state[0] != version:
+            with self._lock:
+                state = self._state
+                if state[1] is None or state[0] != version:
+                    state = (version, build_index(), LRUCache(getattr(settings, 'SEARCH_SUGGEST_CACHE_SIZE', 1024)))
+                    self._state = state
+        return state[1], state[2]
+
+    def suggest(self, query, limit):
+        """Hasta `limit` productos para lo que se lleva escrito"""
+        prefix = ' '.join(fold(query).split())
+        if not prefix:
+            return []
+        index, results = self._current()
+        key = (prefix, limit)
+        found = results.get(key)
+        if found is None:
+            found = index.lookup(prefix, limit)
+            results.set(key, found)
+        return found
+
+
+_suggester = Suggester()
+
+
+def suggest(query, limit=8):
+    """Sugerencias para el buscador: [{'id', 'name', 'price', 'url'}]"""
+    return _suggester.suggest(query, limit)
+
+
+def invalidate_suggestions(**kwargs):
+    """Marca los índices de todos los workers como viejos (receptor de señales)"""
+    cache.set(SUGGEST_VERSION_CACHE_KEY, uuid.uuid4().hex, None)
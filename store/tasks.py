@@ -0,0 +1,34 @@
+# store/tasks.py - Tareas en segundo plano (se ejecutan con `manage.py runworker`)
+from django.utils.dateparse import parse_date
+
+from . import images, rollups, search
+from .jobs import task
+
+
+@task(max_attempts=3, retry_delay=10, unique=True)
+def generate_image_variants(name):
+    """Miniaturas y WebP de una imagen subida"""
+    return {'name': name, 'ok': images.generate_variants(name)}
+
+
+@task(max_attempts=2, retry_delay=60)
+def rebuild_sales_rollups(start=None, end=None):
+    """Recalcula los acumulados de ventas (fechas 'AAAA-MM-DD' opcionales)"""
+    days, products = rollups.rebuild_rollups(
+        parse_date(start) if start else None,
+        parse_date(end) if end else None,
+    )
+    return {'days': days, 'products': products}
+
+
+@task(max_attempts=2, retry_delay=60)
+def rebuild_search_index():
+    """Reconstruye el índice de búsqueda de productos"""
+    return {'products': search.rebuild_search_index()}
+
+
+# Tareas que el panel puede lanzar a mano: {nombre: (tarea, descripción)}
+ADMIN_TASKS = {
+    'rebuild_sales_rollups': (rebuild_sales_rollups, 'Recalcular acumulados de ventas'),
+    'rebuild_search_index': (rebuild_search_index, 'Reconstruir índice de búsqueda'),
+}
@@ -0,0 +1,41 @@
+# store/templatetags/image_tags.py
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+
+from store.images import image_sources
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(image, alt='', width=None, sizes=None, css_class='', loading='lazy'):
+    """
+    <picture> con variantes WebP y JPEG/PNG, srcset y carga diferida.
+
+    `image` es un ImageField o el nombre del archivo en el storage (el
+    catálogo del punto de venta guarda el nombre). `width` es el ancho
+    con que se muestra (px); `sizes` lo reemplaza para tarjetas cuyo
+    ancho cambia con la pantalla. Sin imagen no genera nada; si las
+    variantes no están disponibles usa el original.
+
+        {% responsive_image p.image p.name width=80 css_class="product-image-small" %}
+    """
+    name = getattr(image, 'name', image)
+    if not name:
+        return ''
+    sizes = sizes or (f'{width}px' if width else '100vw')
+    sources = image_sources(name, width)
+    if sources is None:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="{}" decoding="async">',
+            default_storage.url(name), alt, css_class, loading
+        )
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" loading="{}" decoding="async">'
+        '</picture>',
+        sources['webp_srcset'], sizes,
+        sources['src'], sources['srcset'], sizes, alt, css_class, loading
+    )
@@ -6,26 +6,31 @@ import re
 
 register = template.Library()
 
-@register.filter
-def extract_payment(notes):
-    """Extrae el monto del pago del campo notes"""
+# Formato que usaban las órdenes anteriores a payment_received/change_amount
+PAYMENT_RE = re.compile(r'Pago:\s*\$(\d+\.?\d*)')
+CHANGE_RE = re.compile(r'Cambio:\s*\$(\d+\.?\d*)')
+
+def _from_order(value, field, pattern):
+    """Lee la columna de la orden; solo las órdenes antiguas se parsean desde notes"""
+    amount = getattr(value, field, None)
+    if amount is not None:
+        return f'{amount:.2f}'
+    
+    notes = getattr(value, 'notes', value)
     if not notes:
         return "0.00"
     
-    # Buscar patrón: Pago: $100.00
-    match = re.search(r'Pago:\s*\$(\d+\.?\d*)', notes)
+    match = pattern.search(notes)
     if match:
         return match.group(1)
     return "0.00"
 
 @register.filter
-def extract_change(notes):
-    """Extrae el cambio del campo notes"""
-    if not notes:
-        return "0.00"
-    
-    # Buscar patrón: Cambio: $5.00
-    match = re.search(r'Cambio:\s*\$(\d+\.?\d*)', notes)
-    if match:
-        return match.group(1)
-    return "0.00"
\ No newline at end of file
+def extract_payment(order):
+    """Monto del pago recibido (acepta la orden o, por compatibilidad, el texto de notes)"""
+    return _from_order(order, 'payment_received', PAYMENT_RE)
+
+@register.filter
+def extract_change(order):
+    """Cambio entregado (acepta la orden o, por compatibilidad, el texto de notes)"""
+    return _from_order(order, 'change_amount', CHANGE_RE)
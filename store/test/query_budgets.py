@@ -0,0 +1,41 @@
+"""
+Máximo de consultas SQL por vista (nombre de URL), con la caché fría y
+caliente.
+Archivo: store/test/query_budgets.py
+
+test_query_budgets.py mide cada vista de query_audit.audited_urls con
+SIZES productos y órdenes, dos veces seguidas: 'cold' justo después de
+cache.clear() (ahí se ve un N+1 que la caché esconde) y 'warm' con la
+caché llena. Los presupuestos no dependen del tamaño: cada conteo no
+puede pasar del suyo ni cambiar entre 10 y 1000 registros. Una vista
+nueva necesita su línea aquí.
+"""
+
+# Productos y órdenes con los que se mide cada vista
+SIZES = (10, 100, 1000)
+
+QUERY_BUDGETS = {
+    # Catálogo público
+    'home': {'cold': 5, 'warm': 4},
+    'search_products': {'cold': 6, 'warm': 5},  # conteo + una página de ids
+    'products_by_category': {'cold': 6, 'warm': 5},
+    'product_detail': {'cold': 5, 'warm': 4},
+    # Punto de venta (sesión + usuario; el catálogo sale de caché)
+    'multi_sale': {'cold': 4, 'warm': 2},
+    'pos_catalog': {'cold': 3, 'warm': 2},
+    'sale_api_cart': {'cold': 4, 'warm': 2},
+    'sale_receipt': {'cold': 10, 'warm': 2},  # en frío arma y guarda el ticket
+    'receipt_document': {'cold': 3, 'warm': 2},
+    # Cliente
+    'user_orders': {'cold': 4, 'warm': 3},
+    'order_detail': {'cold': 5, 'warm': 4},
+    # Panel
+    'admin_dashboard': {'cold': 11, 'warm': 2},  # en frío, una consulta por indicador (dashboard.py)
+    'admin_products': {'cold': 4, 'warm': 3},
+    'admin_categories': {'cold': 4, 'warm': 3},
+    'admin_orders': {'cold': 6, 'warm': 5},
+    'admin_order_detail': {'cold': 5, 'warm': 4},
+    'reports': {'cold': 7, 'warm': 6},
+    'admin_users': {'cold': 5, 'warm': 4},
+    'admin_jobs': {'cold': 5, 'warm': 4},
+}
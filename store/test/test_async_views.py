@@ -0,0 +1,122 @@
+"""
+Tests para las variantes async de las páginas de solo lectura (ASGI)
+Archivo: store/test/test_async_views.py
+"""
+import warnings
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from django.test import TestCase, AsyncClient, Client, override_settings
+from django.urls import resolve, reverse
+from store import async_views, views
+from store.carts import load_cart
+from store.checkout import process_sale
+from store.models import Product, Category
+from store.profiling import registry
+from store.search import rebuild_search_index
+
+
+@override_settings(ROOT_URLCONF='store.async_urls')
+class AsyncViewsTest(TestCase):
+    """Tests para store/async_views.py con AsyncClient (middleware en modo async)"""
+
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        self.admin = User.objects.create_user(username='admin', password='test123')
+        self.admin.groups.add(Group.objects.create(name='Administrador'))
+        self.bebidas = Category.objects.create(name="Bebidas")
+        self.cafe = Product.objects.create(name="Café americano", price=25, category=self.bebidas, stock=5)
+        Product.objects.create(name="Té verde", price=20, category=self.bebidas, stock=30)
+        rebuild_search_index()
+        self.client = AsyncClient()
+
+    def test_urlconf_swaps_only_read_views(self):
+        """Test async_urls usa las vistas async solo en las rutas de lectura"""
+        self.assertIs(resolve('/', urlconf='store.async_urls').func, async_views.home)
+        self.assertIs(resolve(reverse('reports'), urlconf='store.async_urls').func, async_views.reports)
+        self.assertIs(resolve(reverse('multi_sale'), urlconf='store.async_urls').func, views.multi_sale)
+        self.assertIs(resolve('/', urlconf='store.urls').func, views.home)
+
+    async def test_home_and_category_use_page_cache(self):
+        """Test home y categoría responden y la segunda visita anónima sale de la caché"""
+        response = await self.client.get(reverse('home'))
+        self.assertContains(response, 'Café americano')
+        self.assertTrue(response.has_header('ETag'))
+
+        url = reverse('products_by_category', args=[self.bebidas.id])
+        self.assertContains(await self.client.get(url), 'Té verde')
+        not_modified = await self.client.get(url, headers={'if-none-match': (await self.client.get(url))['ETag']})
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual((await self.client.get(reverse('products_by_category', args=[999]))).status_code, 404)
+
+    async def test_search_with_and_without_query(self):
+        """Test la búsqueda async pagina igual que la síncrona"""
+        response = await self.client.get(reverse('search_products'), {'q': 'cafe'})
+        self.assertEqual([p.name for p in response.context['products']], ['Café americano'])
+
+        response = await self.client.get(reverse('search_products'))
+        self.assertEqual(response.context['page_obj'].paginator.count, 2)
+        self.assertEqual(len(response.context['products']), 2)
+
+    async def test_admin_pages_require_admin(self):
+        """Test reportes y dashboard redirigen sin sesión de administrador"""
+        for name in ('reports', 'admin_dashboard'):
+            self.assertEqual((await self.client.get(reverse(name))).status_code, 302)
+
+    def test_reports_and_dashboard_match_sync_views(self):
+        """Test reportes y dashboard async muestran los mismos datos que los síncronos"""
+        process_sale(self.admin, {str(self.cafe.id): 2}, '100')
+        sync_client = Client()
+        sync_client.force_login(self.admin)
+        self.client.force_login(self.admin)
+
+        for name, keys in (
+            ('reports', ('total_ventas', 'total_ordenes', 'ticket_promedio', 'dias_periodo')),
+            ('admin_dashboard', ('total_products', 'total_orders', 'monthly_sales', 'daily_sales')),
+        ):
+            with override_settings(ROOT_URLCONF='store.urls'):
+                expected = sync_client.get(reverse(name)).context
+            response = self._get(reverse(name))
+            self.assertEqual(response.status_code, 200)
+            for key in keys:
+                self.assertEqual(response.context[key], expected[key], key)
+
+        dashboard = self._get(reverse('admin_dashboard'))
+        self.assertEqual([p.name for p in dashboard.context['low_stock']], ['Café americano'])
+        self.assertEqual(len(dashboard.context['recent_orders']), 1)
+
+    @override_settings(ORDER_NUMBER_BLOCK_SIZE=1000)
+    def test_export_streams_with_async_iterator(self):
+        """Test la descarga con ASGI usa un iterador async (Django no la junta en una lista)"""
+        process_sale(self.admin, {str(self.cafe.id): 2}, '100')
+        self.client.force_login(self.admin)
+        response = self._get(reverse('reports_export', args=['items', 'csv']))
+        self.assertTrue(response.is_async)
+
+        async def consume():
+            return b''.join([part async for part in response])
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            content = async_to_sync(consume)().decode('utf-8-sig')
+        self.assertIn('Café americano', content)
+        self.assertEqual(len(content.splitlines()), 2)
+        self.assertEqual(self._get(reverse('reports_export', args=['users', 'csv'])).status_code, 404)
+
+    def test_async_middleware_saves_cart_and_metrics(self):
+        """Test con ASGI el carrito se guarda y las métricas cuentan las consultas de la vista"""
+        self.client.force_login(self.admin)
+        self._post(reverse('sale_api_add', args=[self.cafe.id]))
+        self.assertEqual(load_cart(self.client.session), {str(self.cafe.id): 1})
+
+        self._get(reverse('admin_dashboard'))
+        row = next(row for row in registry.snapshot() if row['view'] == 'admin_dashboard')
+        self.assertGreater(row['queries']['max'], 0)
+
+    def _get(self, url):
+        return async_to_sync(self.client.get)(url)
+
+    def _post(self, url):
+        return async_to_sync(self.client.post)(url)
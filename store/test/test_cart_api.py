@@ -0,0 +1,96 @@
+"""
+Tests para la API JSON del carrito del punto de venta
+Archivo: store/test/test_cart_api.py
+"""
+import json
+
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from store.models import Product, Category
+from store.carts import load_cart
+
+
+class CartApiTest(TestCase):
+    """Tests para los endpoints sale/api/"""
+    
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='vendedor', password='test123')
+        self.user.groups.add(Group.objects.create(name='Vendedor'))
+        self.client.login(username='vendedor', password='test123')
+        
+        self.category = Category.objects.create(name="Bebidas")
+        self.product1 = Product.objects.create(name="Café", price=25, category=self.category, stock=3)
+        self.product2 = Product.objects.create(name="Té", price=20, category=self.category, stock=10)
+    
+    def test_add_returns_cart_lines_and_total(self):
+        """Test agregar regresa líneas y total sin redirigir"""
+        self.client.post(reverse('sale_api_add', args=[self.product1.id]))
+        response = self.client.post(reverse('sale_api_add', args=[self.product1.id]))
+        
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['items'][0]['quantity'], 2)
+        self.assertEqual(data['total'], '50.00')
+        self.assertEqual(load_cart(self.client.session), {str(self.product1.id): 2})
+    
+    def test_set_quantity_is_limited_by_stock(self):
+        """Test fijar cantidad mayor al stock la limita y avisa"""
+        response = self.client.post(
+            reverse('sale_api_set', args=[self.product1.id]), {'quantity': 5}
+        )
+        data = response.json()
+        self.assertEqual(data['items'][0]['quantity'], 3)
+        self.assertEqual(len(data['warnings']), 1)
+    
+    def test_set_quantity_invalid(self):
+        """Test cantidad inválida"""
+        response = self.client.post(
+            reverse('sale_api_set', args=[self.product1.id]), {'quantity': 'x'}
+        )
+        self.assertEqual(response.status_code, 400)
+    
+    def test_remove_and_clear(self):
+        """Test eliminar un producto y vaciar el carrito"""
+        self.client.post(reverse('sale_api_add', args=[self.product1.id]))
+        self.client.post(reverse('sale_api_add', args=[self.product2.id]))
+        
+        data = self.client.post(reverse('sale_api_remove', args=[self.product1.id])).json()
+        self.assertEqual([item['id'] for item in data['items']], [self.product2.id])
+        
+        data = self.client.post(reverse('sale_api_clear')).json()
+        self.assertEqual(data['items'], [])
+        self.assertEqual(load_cart(self.client.session), {})
+    
+    def test_batch_update(self):
+        """Test actualizar varias cantidades en una petición"""
+        response = self.client.post(
+            reverse('sale_api_batch'),
+            data=json.dumps({'items': {str(self.product1.id): 2, str(self.product2.id): 4}}),
+            content_type='application/json'
+        )
+        data = response.json()
+        self.assertEqual(data['count'], 6)
+        self.assertEqual(data['total'], '130.00')
+    
+    def test_batch_invalid_body(self):
+        """Test cuerpo inválido en actualización por lote"""
+        response = self.client.post(
+            reverse('sale_api_batch'), data='no-json', content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+    
+    def test_get_not_allowed_on_mutations(self):
+        """Test los endpoints de cambio solo aceptan POST"""
+        response = self.client.get(reverse('sale_api_add', args=[self.product1.id]))
+        self.assertEqual(response.status_code, 405)
+    
+    def test_normal_user_cannot_use_api(self):
+        """Test usuario sin rol no puede usar la API"""
+        User.objects.create_user(username='normal', password='test123')
+        self.client.login(username='normal', password='test123')
+        response = self.client.get(reverse('sale_api_cart'))
+        self.assertEqual(response.status_code, 302)
@@ -0,0 +1,97 @@
+"""
+Tests para el almacén de carritos del punto de venta
+Archivo: store/test/test_carts.py
+"""
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from store.carts import CacheCartStore, load_cart
+from store.models import Product, Category
+
+
+class CountingStore(CacheCartStore):
+    """CacheCartStore que cuenta las escrituras"""
+    saves = 0
+
+    def save(self, session, items):
+        CountingStore.saves += 1
+        super().save(session, items)
+
+
+class CartStoreTest(TestCase):
+    """Tests para el carrito fuera de la sesión"""
+
+    def setUp(self):
+        cache.clear()
+        CountingStore.saves = 0
+        self.seller = User.objects.create_user(username='vendedor', password='test123')
+        self.seller.groups.add(Group.objects.create(name='Vendedor'))
+        self.client = Client()
+        self.client.force_login(self.seller)
+        category = Category.objects.create(name="Bebidas")
+        self.cafe = Product.objects.create(name="Café", price=25, category=category, stock=10)
+        self.te = Product.objects.create(name="Té", price=20, category=category, stock=10)
+
+    def test_cart_changes_do_not_write_the_session(self):
+        """Test agregar y cambiar cantidades no reescribe django_session"""
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(reverse('sale_api_add', args=[self.cafe.id]))
+            self.client.post(reverse('sale_api_set', args=[self.te.id]), {'quantity': 3})
+        self.assertFalse([q for q in ctx.captured_queries if 'django_session' in q['sql'] and 'SELECT' not in q['sql']])
+        self.assertEqual(load_cart(self.client.session), {str(self.cafe.id): 1, str(self.te.id): 3})
+
+    @override_settings(POS_CART_BACKEND='store.test.test_carts.CountingStore')
+    def test_writes_are_coalesced_per_request(self):
+        """Test una petición escribe una sola vez y solo si el carrito cambió"""
+        self.client.post(reverse('sale_api_batch'), f'{{"items": {{"{self.cafe.id}": 2, "{self.te.id}": 1}}}}',
+                         content_type='application/json')
+        self.assertEqual(CountingStore.saves, 1)
+
+        self.client.get(reverse('sale_api_cart'))
+        self.client.get(reverse('multi_sale'))
+        # Fijar la misma cantidad no cambia nada
+        self.client.post(reverse('sale_api_set', args=[self.cafe.id]), {'quantity': 2})
+        self.assertEqual(CountingStore.saves, 1)
+
+    def test_checkout_empties_the_cart(self):
+        """Test cobrar deja el carrito vacío y borra la entrada"""
+        self.client.post(reverse('sale_api_add', args=[self.cafe.id]), {'quantity': 2})
+        response = self.client.post(reverse('multi_sale'), {'payment_received': '100'})
+        self.assertIn('/receipt/', response['Location'])
+        self.assertEqual(load_cart(self.client.session), {})
+
+    def test_registers_have_separate_carts(self):
+        """Test cada caja (sesión) tiene su carrito"""
+        other = Client()
+        other.force_login(self.seller)
+        self.client.post(reverse('sale_api_add', args=[self.cafe.id]))
+        other.post(reverse('sale_api_add', args=[self.te.id]))
+        self.assertEqual(load_cart(self.client.session), {str(self.cafe.id): 1})
+        self.assertEqual(load_cart(other.session), {str(self.te.id): 1})
+
+    def test_legacy_session_cart_is_migrated(self):
+        """Test un carrito que quedó en la sesión se pasa al almacén"""
+        session = self.client.session
+        session['sale_items'] = {str(self.cafe.id): 4}
+        session.save()
+
+        response = self.client.get(reverse('sale_api_cart'))
+        self.assertEqual(response.json()['count'], 4)
+        self.assertNotIn('sale_items', self.client.session)
+        self.assertEqual(load_cart(self.client.session), {str(self.cafe.id): 4})
+
+    def test_logout_discards_cart(self):
+        """Test cerrar sesión descarta el carrito de la caja"""
+        self.client.post(reverse('sale_api_add', args=[self.cafe.id]))
+        session = self.client.session
+        self.client.get(reverse('logout'))
+        self.assertIsNone(cache.get(f'store:cart:{session.session_key}'))
+
+    @override_settings(POS_CART_BACKEND='store.carts.SessionCartStore')
+    def test_session_store_keeps_previous_behavior(self):
+        """Test SessionCartStore guarda el carrito en la sesión como antes"""
+        self.client.post(reverse('sale_api_add', args=[self.cafe.id]))
+        self.assertEqual(self.client.session['sale_items'], {str(self.cafe.id): 1})
@@ -0,0 +1,92 @@
+"""
+Tests para el catálogo precalculado del punto de venta
+Archivo: store/test/test_catalog.py
+"""
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from store.models import Product, Category
+from store.catalog import build_pos_catalog, get_pos_catalog, invalidate_pos_catalog
+from store.checkout import process_sale
+
+
+class PosCatalogTest(TestCase):
+    """Tests para el catálogo del punto de venta"""
+    
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='vendedor', password='test123')
+        self.user.groups.add(Group.objects.create(name='Vendedor'))
+        self.client.login(username='vendedor', password='test123')
+        
+        self.bebidas = Category.objects.create(name="Bebidas")
+        self.pan = Category.objects.create(name="Pan")
+        self.inactiva = Category.objects.create(name="Inactiva", is_active=False)
+        for i in range(5):
+            Product.objects.create(name=f"Café {i}", price=25, category=self.bebidas, stock=10)
+            Product.objects.create(name=f"Concha {i}", price=12, category=self.pan, stock=10)
+        Product.objects.create(name="Agotado", price=10, category=self.pan, stock=0)
+        Product.objects.create(name="Oculto", price=10, category=self.inactiva, stock=5)
+    
+    def test_build_uses_single_query(self):
+        """Test el catálogo se construye con una sola consulta"""
+        with self.assertNumQueries(1):
+            catalog = build_pos_catalog()
+        
+        names = [category['name'] for category in catalog['categories']]
+        self.assertEqual(names, ['Bebidas', 'Pan'])
+        self.assertEqual(len(catalog['categories'][1]['products']), 5)
+    
+    def test_cached_catalog_needs_no_queries(self):
+        """Test la segunda lectura sale de caché"""
+        get_pos_catalog()
+        with self.assertNumQueries(0):
+            get_pos_catalog()
+    
+    def test_product_save_invalidates_catalog(self):
+        """Test guardar un producto invalida el catálogo"""
+        get_pos_catalog()
+        product = Product.objects.get(name="Café 0")
+        product.price = 30
+        product.save()
+        
+        catalog = get_pos_catalog()
+        prices = {p['name']: p['price'] for p in catalog['categories'][0]['products']}
+        self.assertEqual(prices['Café 0'], '30.00')
+    
+    def test_checkout_invalidates_catalog(self):
+        """Test una venta actualiza el stock del catálogo"""
+        get_pos_catalog()
+        product = Product.objects.get(name="Café 0")
+        with self.captureOnCommitCallbacks(execute=True):
+            process_sale(self.user, {str(product.id): 4}, '1000')
+        
+        stock = {p['name']: p['stock'] for p in get_pos_catalog()['categories'][0]['products']}
+        self.assertEqual(stock['Café 0'], 6)
+    
+    def test_pos_catalog_json(self):
+        """Test endpoint JSON del catálogo"""
+        response = self.client.get(reverse('pos_catalog'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['categories']), 2)
+        self.assertNotIn(b': ', response.content)
+    
+    def test_multi_sale_get_query_count_is_flat(self):
+        """Test la pantalla de venta no hace una consulta por categoría"""
+        # La primera petición también resuelve los roles del usuario (quedan en caché)
+        self.client.get(reverse('multi_sale'))
+        invalidate_pos_catalog()
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('multi_sale'))
+        
+        for i in range(5):
+            category = Category.objects.create(name=f"Extra {i}")
+            Product.objects.create(name=f"Extra {i}", price=5, category=category, stock=3)
+        
+        with self.assertNumQueries(len(ctx)):
+            response = self.client.get(reverse('multi_sale'))
+        self.assertContains(response, "Extra 4")
@@ -0,0 +1,219 @@
+"""
+Tests para el servicio de cobro del punto de venta
+Archivo: store/test/test_checkout.py
+"""
+import json
+from unittest.mock import patch
+
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.contrib.auth.models import User, Group
+from store.models import Product, Category, Order, OrderItem, InventoryLog
+from store.checkout import process_sale, ingest_offline_sales, CheckoutError
+from store.order_numbers import get_generator, next_order_number
+from decimal import Decimal
+
+
+@override_settings(ORDER_NUMBER_BLOCK_SIZE=1000)
+class ProcessSaleTest(TestCase):
+    """Tests para process_sale"""
+    
+    def setUp(self):
+        # Reservar el bloque de números antes de medir consultas
+        next_order_number()
+        self.user = User.objects.create_user(username='cajero', password='test123')
+        self.category = Category.objects.create(name="Bebidas")
+        self.products = [
+            Product.objects.create(
+                name=f"Producto {i}",
+                price=10 + i,
+                category=self.category,
+                stock=20
+            )
+            for i in range(30)
+        ]
+    
+    def test_process_sale_creates_order_items_and_logs(self):
+        """Test venta válida crea orden, items, logs y descuenta stock"""
+        p1, p2 = self.products[0], self.products[1]
+        order, change = process_sale(self.user, {str(p1.id): 2, str(p2.id): 1}, '100')
+        
+        # Total: (10 * 2) + (11 * 1) = 31
+        self.assertEqual(order.total, Decimal('31'))
+        self.assertEqual(change, Decimal('69'))
+        self.assertEqual(OrderItem.objects.filter(order=order).count(), 2)
+        self.assertEqual(InventoryLog.objects.filter(quantity_change__lt=0).count(), 2)
+        
+        p1.refresh_from_db()
+        p2.refresh_from_db()
+        self.assertEqual(p1.stock, 18)
+        self.assertEqual(p2.stock, 19)
+    
+    def test_process_sale_query_count_is_flat(self):
+        """Test el número de consultas no crece con las líneas del ticket"""
+        small = {str(p.id): 1 for p in self.products[:2]}
+        large = {str(p.id): 1 for p in self.products[2:30]}
+        
+        with CaptureQueriesContext(connection) as ctx_small:
+            process_sale(self.user, small, '1000')
+        with self.assertNumQueries(len(ctx_small)):
+            process_sale(self.user, large, '1000')
+    
+    def test_process_sale_exceeds_stock(self):
+        """Test venta que excede stock no modifica nada"""
+        p1 = self.products[0]
+        with self.assertRaises(CheckoutError):
+            process_sale(self.user, {str(p1.id): 50}, '5000')
+        
+        p1.refresh_from_db()
+        self.assertEqual(p1.stock, 20)
+        self.assertFalse(Order.objects.exists())
+    
+    def test_process_sale_insufficient_payment(self):
+        """Test pago insuficiente"""
+        with self.assertRaises(CheckoutError):
+            process_sale(self.user, {str(self.products[0].id): 2}, '5')
+        self.assertFalse(Order.objects.exists())
+    
+    def test_process_sale_empty_cart(self):
+        """Test carrito vacío"""
+        with self.assertRaises(CheckoutError):
+            process_sale(self.user, {}, '100')
+    
+    def test_process_sale_invalid_payment(self):
+        """Test pago no numérico"""
+        with self.assertRaises(CheckoutError):
+            process_sale(self.user, {str(self.products[0].id): 1}, 'abc')
+
+    def test_process_sale_non_finite_or_huge_payment(self):
+        """Test NaN, Infinity y montos que no caben en la columna se rechazan"""
+        for payment in ('NaN', 'Infinity', '-Infinity', '100000000'):
+            with self.assertRaises(CheckoutError, msg=payment):
+                process_sale(self.user, {str(self.products[0].id): 1}, payment)
+        self.assertFalse(Order.objects.exists())
+
+
+@override_settings(ORDER_NUMBER_BLOCK_SIZE=1000)
+class OfflineSyncTest(TestCase):
+    """Tests para la sincronización de ventas fuera de línea"""
+    
+    def setUp(self):
+        next_order_number()
+        self.client = Client()
+        self.user = User.objects.create_user(username='vendedor', password='test123')
+        self.user.groups.add(Group.objects.create(name='Vendedor'))
+        self.client.login(username='vendedor', password='test123')
+        
+        self.category = Category.objects.create(name="Bebidas")
+        self.product1 = Product.objects.create(name="Café", price=25, category=self.category, stock=10)
+        self.product2 = Product.objects.create(name="Té", price=20, category=self.category, stock=1)
+    
+    def _sale(self, key, items, payment='100', sold_at=None):
+        sale = {'client_key': key, 'items': items, 'payment_received': payment}
+        if sold_at:
+            sale['sold_at'] = sold_at
+        return sale
+    
+    def test_ingest_creates_orders_and_updates_stock(self):
+        """Test el lote crea órdenes, items, logs y descuenta stock"""
+        results = ingest_offline_sales(self.user, [
+            self._sale('a', {str(self.product1.id): 2}),
+            self._sale('b', {str(self.product1.id): 1, str(self.product2.id): 1}),
+        ])
+        
+        self.assertEqual([r['status'] for r in results], ['created', 'created'])
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertEqual(OrderItem.objects.count(), 3)
+        self.assertEqual(InventoryLog.objects.count(), 3)
+        self.product1.refresh_from_db()
+        self.assertEqual(self.product1.stock, 7)
+    
+    def test_ingest_deduplicates_replays(self):
+        """Test reenviar la misma venta no la duplica"""
+        sales = [self._sale('a', {str(self.product1.id): 2})]
+        ingest_offline_sales(self.user, sales)
+        results = ingest_offline_sales(self.user, sales + sales)
+        
+        self.assertEqual([r['status'] for r in results], ['duplicate', 'duplicate'])
+        self.assertEqual(Order.objects.count(), 1)
+        self.product1.refresh_from_db()
+        self.assertEqual(self.product1.stock, 8)
+    
+    def test_ingest_reports_invalid_sales(self):
+        """Test ventas inválidas se reportan sin afectar al resto del lote"""
+        results = ingest_offline_sales(self.user, [
+            self._sale('a', {str(self.product2.id): 1}),
+            self._sale('b', {str(self.product2.id): 1}),
+            self._sale('c', {str(self.product1.id): 1}, payment='1'),
+            self._sale('', {str(self.product1.id): 1}),
+            self._sale('d', {'9999': 1}),
+        ])
+        
+        self.assertEqual(
+            [r['status'] for r in results],
+            ['created', 'error', 'error', 'error', 'error']
+        )
+        self.product2.refresh_from_db()
+        self.assertEqual(self.product2.stock, 0)
+    
+    def test_ingest_reserves_numbers_only_for_accepted_sales(self):
+        """Test reenviar un lote o ventas rechazadas no gasta números de orden"""
+        generator = get_generator()
+        sales = [
+            self._sale('a', {str(self.product1.id): 1}),
+            self._sale('b', {str(self.product2.id): 5}),
+        ]
+        with patch.object(generator, 'take', wraps=generator.take) as take:
+            ingest_offline_sales(self.user, sales)
+            ingest_offline_sales(self.user, sales)
+        self.assertEqual([c.args for c in take.call_args_list], [(1,)])
+    
+    def test_ingest_keeps_sale_time(self):
+        """Test se conserva la hora en que se hizo la venta"""
+        ingest_offline_sales(self.user, [
+            self._sale('a', {str(self.product1.id): 1}, sold_at='2026-01-15T10:30:00-06:00')
+        ])
+        order = Order.objects.get(client_key='a')
+        self.assertEqual(order.created_at.isoformat(), '2026-01-15T16:30:00+00:00')
+    
+    def test_ingest_query_count_is_flat(self):
+        """Test el número de consultas no crece con el tamaño del lote"""
+        with CaptureQueriesContext(connection) as ctx_small:
+            ingest_offline_sales(self.user, [self._sale('a', {str(self.product1.id): 1})])
+        
+        sales = [self._sale(f'b{i}', {str(self.product1.id): 1}) for i in range(5)]
+        with self.assertNumQueries(len(ctx_small)):
+            ingest_offline_sales(self.user, sales)
+    
+    def test_sync_endpoint(self):
+        """Test endpoint de sincronización"""
+        response = self.client.post(
+            reverse('sale_api_sync'),
+            data=json.dumps({'sales': [self._sale('a', {str(self.product1.id): 1})]}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['status'], 'created')
+    
+    def test_sync_endpoint_rejects_non_finite_payment_per_sale(self):
+        """Test un pago NaN o Infinity se rechaza solo en esa venta, sin error 500"""
+        response = self.client.post(
+            reverse('sale_api_sync'),
+            data=json.dumps({'sales': [
+                self._sale('a', {str(self.product1.id): 1}, payment='NaN'),
+                self._sale('b', {str(self.product1.id): 1}, payment='Infinity'),
+                self._sale('c', {str(self.product1.id): 1}),
+            ]}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['status'] for r in response.json()['results']], ['error', 'error', 'created'])
+    
+    def test_sync_endpoint_invalid_body(self):
+        """Test cuerpo inválido"""
+        response = self.client.post(
+            reverse('sale_api_sync'), data='[]', content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,124 @@
+"""
+Tests para los widgets del dashboard (caché por widget y cálculo en paralelo)
+Archivo: store/test/test_dashboard.py
+"""
+import threading
+import time
+from unittest.mock import patch
+
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, Client, override_settings
+from django.urls import reverse
+from store.checkout import process_sale
+from store.dashboard import WIDGETS, Widget, dashboard_widgets
+from store.models import Product, Category, Order
+
+
+class DashboardWidgetsTest(TestCase):
+    """Tests para dashboard_widgets() y la vista admin_dashboard"""
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(username='admin', password='test123')
+        self.admin.groups.add(Group.objects.create(name='Administrador'))
+        self.bebidas = Category.objects.create(name="Bebidas")
+        self.cafe = Product.objects.create(name="Café", price=25, category=self.bebidas, stock=12)
+        self.te = Product.objects.create(name="Té", price=20, category=self.bebidas, stock=30)
+
+    def test_second_load_comes_from_cache(self):
+        """Test la segunda carga no consulta ningún widget"""
+        first = dashboard_widgets()
+        self.assertEqual(list(first), list(WIDGETS))
+        with self.assertNumQueries(0):
+            self.assertEqual(dashboard_widgets(), first)
+
+    def test_sale_recomputes_only_its_widgets(self):
+        """Test una venta recalcula ventas y stock pero no el total de productos"""
+        dashboard_widgets()
+        with self.captureOnCommitCallbacks(execute=True):
+            process_sale(self.admin, {str(self.cafe.id): 3}, '100')
+
+        with patch.object(WIDGETS['total_products'], 'compute') as total_products:
+            widgets = dashboard_widgets()
+        total_products.assert_not_called()
+        self.assertEqual(widgets['total_products'], 2)
+        self.assertEqual(widgets['total_orders'], 1)
+        self.assertEqual(widgets['daily_sales'], 75)
+        self.assertEqual([p.name for p in widgets['low_stock']], ['Café'])
+        self.assertEqual(len(widgets['recent_orders']), 1)
+
+    def test_product_change_keeps_sales_widgets(self):
+        """Test crear un producto cambia el conteo sin recalcular las ventas"""
+        dashboard_widgets()
+        Product.objects.create(name="Pan", price=10, category=self.bebidas, stock=1)
+
+        with patch.object(WIDGETS['monthly_sales'], 'compute') as monthly_sales:
+            widgets = dashboard_widgets()
+        monthly_sales.assert_not_called()
+        self.assertEqual(widgets['total_products'], 3)
+        self.assertEqual([p.name for p in widgets['low_stock']], ['Pan'])
+
+    def test_order_status_change_invalidates_recent_orders(self):
+        """Test guardar una orden (cambio de estado) actualiza las últimas órdenes"""
+        process_sale(self.admin, {str(self.te.id): 1}, '100')
+        order = Order.objects.get()
+        self.assertEqual(dashboard_widgets(['recent_orders'])['recent_orders'][0].status, order.status)
+        order.status = 'cancelled'
+        order.save()
+        self.assertEqual(dashboard_widgets(['recent_orders'])['recent_orders'][0].status, 'cancelled')
+
+    def test_view_renders_widgets(self):
+        """Test el dashboard muestra los indicadores y solo consulta sesión y usuario con caché"""
+        client = Client()
+        client.force_login(self.admin)
+        response = client.get(reverse('admin_dashboard'))
+        self.assertContains(response, 'Panel de Administración')
+        self.assertEqual(response.context['total_products'], 2)
+        with self.assertNumQueries(2):
+            client.get(reverse('admin_dashboard'))
+
+
+class ParallelWidgetsTest(TransactionTestCase):
+    """Tests para el cálculo en paralelo (cada widget en un hilo del pool)"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_missing_widgets_run_concurrently(self):
+        """Test tres widgets lentos tardan lo que uno, en hilos del pool"""
+        threads = []
+
+        def slow(today):
+            threads.append(threading.current_thread().name)
+            time.sleep(0.3)
+            return today
+
+        slow_widgets = {name: Widget(name, slow, 60, ()) for name in ('uno', 'dos', 'tres')}
+        with patch.dict(WIDGETS, slow_widgets, clear=True):
+            started = time.monotonic()
+            widgets = dashboard_widgets()
+            elapsed = time.monotonic() - started
+        self.assertEqual(list(widgets), ['uno', 'dos', 'tres'])
+        self.assertLess(elapsed, 0.6)
+        self.assertTrue(all(name.startswith('dashboard') for name in threads))
+
+    def test_pool_threads_read_the_database(self):
+        """Test los hilos del pool ven los datos confirmados"""
+        category = Category.objects.create(name="Bebidas")
+        Product.objects.create(name="Café", price=25, category=category, stock=3)
+        widgets = dashboard_widgets()
+        self.assertEqual(widgets['total_products'], 1)
+        self.assertEqual([p.name for p in widgets['low_stock']], ['Café'])
+
+    @override_settings(DASHBOARD_WIDGET_THREADS=1)
+    def test_single_thread_runs_inline(self):
+        """Test con DASHBOARD_WIDGET_THREADS=1 se calculan en el hilo de la petición"""
+        threads = set()
+
+        def record(today):
+            threads.add(threading.current_thread())
+
+        with patch.dict(WIDGETS, {name: Widget(name, record, 60, ()) for name in ('uno', 'dos')}, clear=True):
+            dashboard_widgets()
+        self.assertEqual(threads, {threading.current_thread()})
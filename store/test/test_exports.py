@@ -0,0 +1,192 @@
+"""
+Tests para las descargas de reportes en CSV y XLSX
+Archivo: store/test/test_exports.py
+"""
+import csv
+import io
+import zipfile
+from datetime import date, timedelta
+from decimal import Decimal
+from xml.etree import ElementTree
+
+from django.contrib.auth.models import User, Group
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from store.checkout import process_sale
+from store.exports import report_range, csv_stream, safe_text, xlsx_stream
+from store.models import Product, Category, Order
+from store.order_numbers import next_order_number
+
+SHEET_NS = {'s': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+
+
+def read_csv(response):
+    content = b''.join(response.streaming_content).decode('utf-8-sig')
+    return list(csv.reader(io.StringIO(content)))
+
+
+def read_xlsx(content):
+    """Filas de la hoja como listas de textos"""
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        sheet = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+    return [
+        [''.join(cell.itertext()) for cell in row.findall('s:c', SHEET_NS)]
+        for row in sheet.find('s:sheetData', SHEET_NS)
+    ]
+
+
+class ReportRangeTest(TestCase):
+    """Tests para el rango de fechas compartido por reportes y descargas"""
+
+    def test_defaults_invalid_and_swapped(self):
+        """Test por defecto 7 días, fechas inválidas ignoradas y rango invertido"""
+        today = timezone.localdate()
+        self.assertEqual(report_range({}), (today - timedelta(days=7), today))
+        self.assertEqual(report_range({'fecha_inicio': 'x', 'fecha_fin': ''}), (today - timedelta(days=7), today))
+        self.assertEqual(
+            report_range({'fecha_inicio': '2024-03-10', 'fecha_fin': '2024-03-01'}),
+            (date(2024, 3, 1), date(2024, 3, 10))
+        )
+
+
+@override_settings(ORDER_NUMBER_BLOCK_SIZE=1000)
+class ReportExportTest(TestCase):
+    """Tests para panel/reports/export/"""
+
+    def setUp(self):
+        next_order_number()
+        self.admin = User.objects.create_user(username='admin', password='test123')
+        self.admin.groups.add(Group.objects.create(name='Administrador'))
+        self.client = Client()
+        self.client.force_login(self.admin)
+        self.bebidas = Category.objects.create(name="Bebidas")
+        self.pan = Category.objects.create(name="Pan")
+        self.cafe = Product.objects.create(name="Café", price=25, category=self.bebidas, stock=50)
+        self.concha = Product.objects.create(name="Concha", price=12, category=self.pan, stock=50)
+        process_sale(self.admin, {str(self.cafe.id): 2, str(self.concha.id): 1}, '100')
+        process_sale(self.admin, {str(self.cafe.id): 1}, '30')
+
+    def export(self, dataset, fmt, **params):
+        return self.client.get(reverse('reports_export', args=[dataset, fmt]), params)
+
+    def test_orders_csv_streams_every_order(self):
+        """Test el CSV de órdenes es un StreamingHttpResponse con una fila por orden"""
+        response = self.export('orders', 'csv')
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        today = timezone.localdate()
+        self.assertIn(f'ventas-ordenes-{today - timedelta(days=7)}_{today}.csv', response['Content-Disposition'])
+
+        rows = read_csv(response)
+        self.assertEqual(rows[0][:2], ['Orden', 'Fecha'])
+        self.assertEqual(sorted(row[0] for row in rows[1:]), sorted(Order.objects.values_list('order_number', flat=True)))
+        self.assertEqual(sorted(Decimal(row[7]) for row in rows[1:]), [Decimal('25'), Decimal('62')])
+
+    @override_settings(REPORT_EXPORT_CHUNK_SIZE=1)
+    def test_items_read_in_chunks(self):
+        """Test las partidas se leen por bloques sin perder filas"""
+        rows = read_csv(self.export('items', 'csv'))[1:]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(sorted((row[3], row[5]) for row in rows), [('Café', '1'), ('Café', '2'), ('Concha', '1')])
+
+    def test_rows_are_queried_while_streaming(self):
+        """Test la consulta de filas corre al enviar la respuesta, no al armarla"""
+        response = self.export('items', 'csv')
+        with CaptureQueriesContext(connection) as ctx:
+            rows = read_csv(response)
+        self.assertEqual(len(rows), 4)
+        self.assertTrue(any('order_items' in query['sql'] for query in ctx.captured_queries))
+
+    def test_summaries_from_rollups(self):
+        """Test los resúmenes por producto y categoría usan los acumulados"""
+        products = read_csv(self.export('products', 'csv'))
+        self.assertEqual(products[1][1:4], ['Café', 'Bebidas', '3'])
+        self.assertEqual(Decimal(products[1][5]), Decimal('75'))
+        categories = read_csv(self.export('categories', 'csv'))
+        self.assertEqual(
+            [(row[0], int(row[1]), Decimal(row[2])) for row in categories[1:]],
+            [('Bebidas', 3, Decimal('75')), ('Pan', 1, Decimal('12'))]
+        )
+
+    def test_date_window_filters_rows(self):
+        """Test solo se exportan las órdenes del rango del reporte"""
+        Order.objects.filter(total=25).update(created_at=timezone.now() - timedelta(days=30))
+        rows = read_csv(self.export('orders', 'csv'))
+        self.assertEqual(len(rows), 2)
+
+        old = (timezone.localdate() - timedelta(days=30)).isoformat()
+        rows = read_csv(self.export('orders', 'csv', fecha_inicio=old, fecha_fin=old))
+        self.assertEqual([Decimal(row[7]) for row in rows[1:]], [Decimal('25')])
+
+    def test_xlsx_is_a_valid_workbook(self):
+        """Test el XLSX es un zip con libro, hoja y celdas numéricas"""
+        response = self.export('categories', 'xlsx')
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content)
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertIn('[Content_Types].xml', archive.namelist())
+            self.assertIn('xl/workbook.xml', archive.namelist())
+        sheet = read_xlsx(content)
+        self.assertEqual(sheet[0], ['Categoría', 'Unidades', 'Ventas'])
+        self.assertEqual([(row[0], Decimal(row[2])) for row in sheet[1:]], [('Bebidas', Decimal('75')), ('Pan', Decimal('12'))])
+
+    def test_formula_text_is_neutralized(self):
+        """Test un nombre que empieza con =, +, - o @ sale como texto en CSV y XLSX"""
+        self.cafe.name = '=HYPERLINK("http://x","Café")'
+        self.cafe.save()
+        self.concha.name = '@SUM(A1)'
+        self.concha.save()
+        process_sale(self.admin, {str(self.cafe.id): 1, str(self.concha.id): 1}, '100')
+
+        rows = read_csv(self.export('items', 'csv'))
+        self.assertIn('\'=HYPERLINK("http://x","Café")', [row[3] for row in rows])
+        self.assertIn("'@SUM(A1)", [row[3] for row in rows])
+        # Los números no son texto: un monto negativo no lleva apóstrofo
+        self.assertEqual(list(csv_stream(['Monto'], [(Decimal('-5'),)]))[1], '-5\r\n')
+
+        sheet = read_xlsx(b''.join(self.export('items', 'xlsx').streaming_content))
+        self.assertIn("'@SUM(A1)", [row[3] for row in sheet])
+
+    def test_unknown_dataset_or_format(self):
+        """Test un reporte o formato desconocido responde 404"""
+        self.assertEqual(self.export('users', 'csv').status_code, 404)
+        self.assertEqual(self.export('orders', 'pdf').status_code, 404)
+
+    def test_requires_admin(self):
+        """Test un vendedor no puede descargar reportes"""
+        seller = User.objects.create_user(username='vendedor', password='test123')
+        self.client.force_login(seller)
+        self.assertEqual(self.export('orders', 'csv').status_code, 302)
+
+    @override_settings(REPORTS_MAX_ORDERS=1)
+    def test_reports_page_limits_orders_and_links_export(self):
+        """Test la página lista las órdenes más recientes y enlaza a la descarga"""
+        response = self.client.get(reverse('reports'))
+        self.assertEqual(len(response.context['orders']), 1)
+        self.assertContains(response, 'de 2.')
+        self.assertContains(response, reverse('reports_export', args=['orders', 'csv']))
+
+
+class XlsxStreamTest(TestCase):
+    """Tests para el escritor XLSX"""
+
+    def test_escapes_text_and_flushes_in_pieces(self):
+        """Test escapa XML, quita caracteres de control y envía la hoja por partes"""
+        rows = ([i, f'<fila {i}> & "texto"\x01', None, Decimal('1.50')] for i in range(5000))
+        pieces = list(xlsx_stream(['#', 'Texto', 'Vacío', 'Monto'], rows))
+        self.assertGreater(len(pieces), 2)
+
+        sheet = read_xlsx(b''.join(pieces))
+        self.assertEqual(len(sheet), 5001)
+        self.assertEqual(sheet[10], ['9', '<fila 9> & "texto"', '1.50'])
+
+    def test_safe_text(self):
+        """Test solo los textos que parecen fórmula llevan apóstrofo"""
+        self.assertEqual(
+            [safe_text(value) for value in ['=1+1', '+52 55', '-2', '@A1', '\tx', 'Café', '', 'a=b']],
+            ["'=1+1", "'+52 55", "'-2", "'@A1", "'\tx", 'Café', '', 'a=b']
+        )
@@ -0,0 +1,189 @@
+"""
+Tests para las miniaturas y variantes WebP de las imágenes
+Archivo: store/test/test_images.py
+"""
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest.mock import patch
+
+from PIL import Image
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from store.images import variant_name, variant_names, variants_ready, queue_variants
+from store.jobs import run_pending
+from store.models import Product, Category, Job
+
+
+def image_file(name='foto.jpg', size=(1200, 800), mode='RGB', format='JPEG'):
+    buffer = BytesIO()
+    Image.new(mode, size, (120, 80, 40) if mode == 'RGB' else (120, 80, 40, 128)).save(buffer, format)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type=f'image/{format.lower()}')
+
+
+class ImageTestCase(TestCase):
+    """MEDIA_ROOT temporal por test"""
+
+    def setUp(self):
+        cache.clear()
+        self.media = tempfile.mkdtemp()
+        override = override_settings(MEDIA_ROOT=self.media, IMAGE_VARIANT_WIDTHS=(80, 320))
+        override.enable()
+        self.addCleanup(override.disable)
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        self.category = Category.objects.create(name="Bebidas")
+
+
+class GenerateOnUploadTest(ImageTestCase):
+    """Tests para la generación al subir la imagen"""
+
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_user(username='admin', password='test123', is_staff=True)
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def test_product_form_upload_generates_variants(self):
+        """Test subir una imagen con ProductForm encola miniaturas JPEG y WebP"""
+        self.client.post(reverse('admin_product_create'), {
+            'name': 'Latte', 'category': self.category.id, 'price': '45', 'stock': 10,
+            'is_active': 'on', 'image': image_file(),
+        })
+        product = Product.objects.get(name='Latte')
+        # La petición no procesa la imagen: queda una tarea para runworker
+        self.assertFalse(default_storage.exists(variant_name(product.image.name, 80, 'webp')))
+        self.assertEqual(run_pending(), 1)
+
+        for name in variant_names(product.image.name):
+            self.assertTrue(default_storage.exists(name), name)
+        with default_storage.open(variant_name(product.image.name, 320, 'webp')) as f:
+            image = Image.open(f)
+            self.assertEqual((image.format, image.size), ('WEBP', (320, 213)))
+
+    def test_replacing_image_deletes_old_variants(self):
+        """Test al reemplazar la imagen se borran las variantes de la anterior"""
+        product = Product.objects.create(name="Latte", price=45, category=self.category, image=image_file())
+        old = product.image.name
+        run_pending()
+
+        product.image = image_file('nueva.jpg')
+        product.save()
+        run_pending()
+
+        self.assertFalse(default_storage.exists(variant_name(old, 80, 'webp')))
+        self.assertTrue(default_storage.exists(variant_name(product.image.name, 80, 'webp')))
+
+    def test_saving_without_new_image_does_not_regenerate(self):
+        """Test guardar otros campos no vuelve a encolar la imagen"""
+        product = Product.objects.create(name="Latte", price=45, category=self.category, image=image_file())
+        run_pending()
+
+        product.stock = 3
+        product.save()
+        self.assertFalse(Job.objects.filter(status=Job.PENDING).exists())
+
+    def test_category_create_upload_generates_variants(self):
+        """Test la imagen de admin_category_create también genera variantes"""
+        self.client.post(reverse('admin_category_create'), {
+            'name': 'Pan', 'is_active': 'on', 'image': image_file('pan.png', mode='RGBA', format='PNG'),
+        })
+        run_pending()
+        category = Category.objects.get(name='Pan')
+
+        self.assertTrue(category.image.name.endswith('.png'))
+        # Con transparencia la alternativa a WebP es PNG
+        self.assertTrue(default_storage.exists(variant_name(category.image.name, 80, 'png')))
+
+    def test_delete_removes_variants(self):
+        """Test eliminar el producto borra sus variantes"""
+        product = Product.objects.create(name="Latte", price=45, category=self.category, image=image_file())
+        run_pending()
+        name = product.image.name
+        product.delete()
+        self.assertFalse(default_storage.exists(variant_name(name, 80, 'webp')))
+
+
+class ResponsiveImageTagTest(ImageTestCase):
+    """Tests para {% responsive_image %}"""
+
+    def render(self, image, **kwargs):
+        args = ' '.join(f'{key}={value!r}' if isinstance(value, str) else f'{key}={value}' for key, value in kwargs.items())
+        return Template('{% load image_tags %}{% responsive_image image "Latte" ' + args + ' %}').render(Context({'image': image}))
+
+    def test_picture_with_webp_srcset_and_lazy_loading(self):
+        """Test emite <picture> con srcset WebP, JPEG y loading lazy"""
+        product = Product.objects.create(name="Latte", price=45, category=self.category, image=image_file())
+        run_pending()
+        html = self.render(product.image, width=80, css_class='product-image-small')
+
+        self.assertIn('<source type="image/webp"', html)
+        self.assertIn('-80w.webp 80w', html)
+        self.assertIn('-320w.jpg 320w', html)
+        self.assertIn('sizes="80px"', html)
+        self.assertIn('loading="lazy"', html)
+        self.assertIn('class="product-image-small"', html)
+        self.assertIn(f'src="/media/{variant_name(product.image.name, 80, "jpg")}"', html)
+
+    def test_existing_image_shows_original_without_queueing(self):
+        """Test una imagen sin variantes se muestra original sin encolar nada; el comando las genera"""
+        name = default_storage.save('products/vieja.jpg', ContentFile(image_file().read()))
+        # Ya guardada: no pasa por la señal de subida
+        Product.objects.create(name="Latte", price=45, category=self.category, image=name)
+
+        with patch.object(FileSystemStorage, 'exists', autospec=True, return_value=False) as exists:
+            self.assertIn(f'src="/media/{name}"', self.render(name))
+            self.render(name)
+        # Un solo archivo revisado con la caché fría, ninguno con la caliente
+        self.assertEqual(exists.call_count, 1)
+        self.assertFalse(Job.objects.exists())
+
+        call_command('generate_image_variants', stdout=StringIO())
+        self.assertIn('<picture>', self.render(name))
+        # Con la caché caliente ya no se revisa el storage
+        default_storage.delete(variant_name(name, 320, 'jpg'))
+        self.assertTrue(variants_ready(name))
+
+    def test_broken_image_falls_back_to_original(self):
+        """Test un archivo que no es imagen se muestra tal cual y no se vuelve a encolar"""
+        name = default_storage.save('products/rota.jpg', ContentFile(b'no es una imagen'))
+        # Ya guardada: no pasa por la señal de subida
+        Product.objects.create(name="Latte", price=45, category=self.category, image=name)
+        with self.assertLogs('store.images', 'WARNING'):
+            call_command('generate_image_variants', stdout=StringIO())
+        self.render(name)
+        html = self.render(name)
+
+        self.assertNotIn('<picture>', html)
+        self.assertIn(f'src="/media/{name}"', html)
+        self.assertIn('loading="lazy"', html)
+        self.assertFalse(Job.objects.exists())
+
+    def test_upload_is_queued_once(self):
+        """Test volver a encolar una imagen que sigue en la cola no agrega otra tarea"""
+        product = Product.objects.create(name="Latte", price=45, category=self.category, image=image_file())
+        queue_variants(product.image.name)
+        self.assertEqual(Job.objects.filter(status=Job.PENDING).count(), 1)
+
+    def test_without_image_renders_nothing(self):
+        """Test sin imagen no genera nada (la plantilla muestra su placeholder)"""
+        product = Product.objects.create(name="Latte", price=45, category=self.category)
+        self.assertEqual(self.render(product.image), '')
+        self.assertEqual(self.render(None), '')
+
+    def test_pos_screen_uses_thumbnails(self):
+        """Test la pantalla de venta muestra miniaturas en lugar del original"""
+        product = Product.objects.create(name="Latte", price=45, category=self.category, stock=5, image=image_file())
+        run_pending()
+        seller = User.objects.create_user(username='vendedor', password='test123', is_staff=True)
+        self.client.force_login(seller)
+
+        response = self.client.get(reverse('multi_sale'))
+        self.assertContains(response, variant_name(product.image.name, 80, 'webp'))
+        self.assertNotContains(response, f'src="/media/{product.image.name}"')
@@ -0,0 +1,131 @@
+"""
+Tests para las versiones del catálogo y la invalidación de cachés
+Archivo: store/test/test_invalidation.py
+"""
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+from store.catalog import get_pos_catalog
+from store.checkout import process_sale
+from store.invalidation import (
+    PRODUCT, CATEGORY, STOCK, ALL, batch, cache_key, catalog_changed, category_scope, changed, version, versions
+)
+from store.models import Product, Category
+from store.suggest import SUGGEST_VERSION_CACHE_KEY
+
+
+class VersionCountersTest(TestCase):
+    """Tests para los contadores por entidad y por categoría"""
+
+    def setUp(self):
+        cache.clear()
+        self.bebidas = Category.objects.create(name="Bebidas")
+        self.pan = Category.objects.create(name="Pan")
+        self.cafe = Product.objects.create(name="Café", price=25, category=self.bebidas, stock=10)
+        self.received = []
+        catalog_changed.connect(self.receive)
+
+    def tearDown(self):
+        catalog_changed.disconnect(self.receive)
+
+    def receive(self, sender, product_ids, category_ids, **kwargs):
+        self.received.append((sender, product_ids, category_ids))
+
+    def test_counters_only_go_up_and_change_keys(self):
+        """Test cambiar una entidad sube su contador y la llave derivada"""
+        key = cache_key('prueba', PRODUCT)
+        before = version(PRODUCT)
+        changed(PRODUCT, product_ids=[self.cafe.id])
+        self.assertEqual(version(PRODUCT), before + 1)
+        self.assertNotEqual(cache_key('prueba', PRODUCT), key)
+
+    def test_missing_counter_is_seeded(self):
+        """Test sin contador (caché vacía) se empieza en un valor nuevo"""
+        cache.clear()
+        first = versions(PRODUCT, CATEGORY)
+        self.assertEqual(versions(PRODUCT, CATEGORY), first)
+        self.assertGreater(first[0], 0)
+
+    def test_stock_change_only_bumps_its_category(self):
+        """Test vender café no cambia la versión de la categoría Pan"""
+        pan, bebidas = version(category_scope(self.pan.id)), version(category_scope(self.bebidas.id))
+        products = version(PRODUCT)
+        changed(STOCK, product_ids=[self.cafe.id])
+        self.assertEqual(version(category_scope(self.pan.id)), pan)
+        self.assertGreater(version(category_scope(self.bebidas.id)), bebidas)
+        self.assertEqual(version(PRODUCT), products)
+
+    def test_moving_a_product_bumps_both_categories(self):
+        """Test cambiar de categoría invalida la anterior y la nueva"""
+        before = versions(category_scope(self.bebidas.id), category_scope(self.pan.id))
+        self.cafe.category = self.pan
+        self.cafe.save()
+        after = versions(category_scope(self.bebidas.id), category_scope(self.pan.id))
+        self.assertTrue(all(a > b for a, b in zip(after, before)))
+
+    def test_change_without_ids_invalidates_everything(self):
+        """Test un cambio sin ids (carga masiva) sube ALL"""
+        before = version(ALL)
+        changed(PRODUCT)
+        self.assertGreater(version(ALL), before)
+        self.assertEqual(self.received, [(PRODUCT, None, None)])
+
+    def test_bump_again_on_commit(self):
+        """Test dentro de una transacción la versión sube otra vez al confirmar"""
+        before = version(STOCK)
+        with self.captureOnCommitCallbacks(execute=True):
+            changed(STOCK, product_ids=[self.cafe.id])
+            self.assertEqual(version(STOCK), before + 1)
+        self.assertEqual(version(STOCK), before + 2)
+
+    def test_batch_coalesces_changes(self):
+        """Test batch() junta los cambios y avisa una vez por entidad"""
+        te = Product.objects.create(name="Té", price=20, category=self.bebidas, stock=5)
+        bebidas_id = self.bebidas.id
+        self.received = []
+        before = version(PRODUCT)
+        with batch():
+            self.bebidas.delete()
+            self.assertEqual(version(PRODUCT), before)
+        self.assertEqual(version(PRODUCT), before + 1)
+        self.assertEqual(sorted(self.received), [
+            (CATEGORY, None, {bebidas_id}),
+            (PRODUCT, {self.cafe.id, te.id}, {bebidas_id}),
+        ])
+
+
+class CacheConsumersTest(TestCase):
+    """Tests para las cachés que dependen de las versiones"""
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(username='admin', password='test123')
+        self.admin.groups.add(Group.objects.create(name='Administrador'))
+        self.client = Client()
+        self.client.force_login(self.admin)
+        self.bebidas = Category.objects.create(name="Bebidas")
+        self.cafe = Product.objects.create(name="Café", price=25, category=self.bebidas, stock=10)
+
+    def test_pos_catalog_follows_sales(self):
+        """Test el catálogo del punto de venta muestra el stock después de vender"""
+        self.assertEqual(get_pos_catalog()['categories'][0]['products'][0]['stock'], 10)
+        process_sale(self.admin, {str(self.cafe.id): 3}, '100')
+        self.assertEqual(get_pos_catalog()['categories'][0]['products'][0]['stock'], 7)
+
+    def test_suggestions_ignore_stock_changes(self):
+        """Test vender no marca como viejo el índice de sugerencias"""
+        suggest_version = cache.get(SUGGEST_VERSION_CACHE_KEY)
+        process_sale(self.admin, {str(self.cafe.id): 1}, '100')
+        self.assertEqual(cache.get(SUGGEST_VERSION_CACHE_KEY), suggest_version)
+
+        self.cafe.name = "Café de olla"
+        self.cafe.save()
+        self.assertNotEqual(cache.get(SUGGEST_VERSION_CACHE_KEY), suggest_version)
+
+    def test_admin_category_delete_bumps_once(self):
+        """Test borrar una categoría con productos desde el panel sube cada versión una vez"""
+        Product.objects.create(name="Té", price=20, category=self.bebidas, stock=5)
+        before = versions(PRODUCT, CATEGORY)
+        self.client.post(reverse('admin_category_delete', args=[self.bebidas.id]))
+        self.assertEqual(versions(PRODUCT, CATEGORY), tuple(v + 1 for v in before))
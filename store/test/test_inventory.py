@@ -0,0 +1,133 @@
+"""
+Tests para reservas de stock del punto de venta
+Archivo: store/test/test_inventory.py
+"""
+import threading
+from datetime import timedelta
+
+from django.db import connection, OperationalError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.contrib.auth.models import User
+from django.utils import timezone
+from store.models import Product, Category, Order, InventoryLog, StockHold
+from store.inventory import hold_stock, release_holds, expire_holds, available_stock
+from store.checkout import process_sale, CheckoutError
+
+
+@override_settings(POS_STOCK_HOLD_SECONDS=300)
+class StockHoldTest(TestCase):
+    """Tests para apartados de stock"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='cajero', password='test123')
+        self.category = Category.objects.create(name="Pan")
+        self.product = Product.objects.create(
+            name="Concha",
+            price=12,
+            category=self.category,
+            stock=5
+        )
+    
+    def test_hold_limits_other_sessions(self):
+        """Test lo apartado por una caja no está disponible para otra"""
+        self.assertEqual(hold_stock(self.product, 'caja-1', 3), 3)
+        self.assertEqual(hold_stock(self.product, 'caja-2', 3), 2)
+        self.assertEqual(available_stock(self.product, 'caja-3'), 0)
+    
+    def test_hold_update_replaces_quantity(self):
+        """Test volver a apartar reemplaza la cantidad de la misma caja"""
+        hold_stock(self.product, 'caja-1', 2)
+        hold_stock(self.product, 'caja-1', 4)
+        self.assertEqual(StockHold.objects.get(session_key='caja-1').quantity, 4)
+    
+    def test_expired_holds_are_ignored_and_removed(self):
+        """Test los apartados vencidos no cuentan y se eliminan"""
+        hold_stock(self.product, 'caja-1', 5)
+        StockHold.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        
+        self.assertEqual(available_stock(self.product, 'caja-2'), 5)
+        self.assertEqual(expire_holds(), 1)
+        self.assertFalse(StockHold.objects.exists())
+    
+    def test_checkout_respects_and_releases_holds(self):
+        """Test la venta respeta apartados ajenos y libera los propios"""
+        hold_stock(self.product, 'caja-1', 4)
+        with self.assertRaises(CheckoutError):
+            process_sale(self.user, {str(self.product.id): 2}, '100', session_key='caja-2')
+        
+        hold_stock(self.product, 'caja-2', 1)
+        process_sale(self.user, {str(self.product.id): 4}, '100', session_key='caja-1')
+        self.assertFalse(StockHold.objects.filter(session_key='caja-1').exists())
+        self.assertTrue(StockHold.objects.filter(session_key='caja-2').exists())
+        
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 1)
+    
+    def test_release_holds(self):
+        """Test liberar apartados de una caja"""
+        hold_stock(self.product, 'caja-1', 2)
+        self.assertEqual(release_holds('caja-1'), 1)
+        self.assertEqual(available_stock(self.product, 'caja-2'), 5)
+
+
+@override_settings(POS_STOCK_HOLD_SECONDS=300)
+class ConcurrentStockTest(TransactionTestCase):
+    """Prueba de estrés: N cajas cobrando el mismo producto al mismo tiempo"""
+    
+    REGISTERS = 8
+    STOCK = 50
+    HELD = 10
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='cajero', password='test123')
+        self.category = Category.objects.create(name="Bebidas")
+        self.product = Product.objects.create(
+            name="Café",
+            price=25,
+            category=self.category,
+            stock=self.STOCK
+        )
+        # Otra caja tiene unidades apartadas: nadie más las puede vender
+        hold_stock(self.product, 'caja-apartado', self.HELD)
+    
+    def _register(self, session_key, barrier, results):
+        """Una caja cobra una unidad a la vez hasta que ya no hay disponibles"""
+        barrier.wait()
+        sold = 0
+        try:
+            while True:
+                try:
+                    process_sale(self.user, {str(self.product.id): 1}, '100', session_key=session_key)
+                    sold += 1
+                except CheckoutError:
+                    # Otra caja ganó la última unidad o ya no hay: seguir solo si queda algo
+                    if Product.objects.get(id=self.product.id).stock <= self.HELD:
+                        break
+                except OperationalError:
+                    # SQLite bloquea la tabla completa; reintentar
+                    continue
+        finally:
+            results.append(sold)
+            connection.close()
+    
+    def test_no_oversell_with_concurrent_registers(self):
+        """Test process_sale nunca vende más que el stock libre de apartados"""
+        barrier = threading.Barrier(self.REGISTERS)
+        results = []
+        threads = [
+            threading.Thread(target=self._register, args=(f'caja-{n}', barrier, results))
+            for n in range(self.REGISTERS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.product.refresh_from_db()
+        self.assertEqual(sum(results), self.STOCK - self.HELD)
+        self.assertEqual(self.product.stock, self.HELD)
+        self.assertEqual(Order.objects.count(), self.STOCK - self.HELD)
+        self.assertEqual(
+            InventoryLog.objects.filter(product=self.product).count(), self.STOCK - self.HELD
+        )
+        self.assertTrue(StockHold.objects.filter(session_key='caja-apartado').exists())
@@ -0,0 +1,217 @@
+"""
+Tests para la cola de tareas en segundo plano
+Archivo: store/test/test_jobs.py
+"""
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from store.jobs import task, enqueue, claim_next, execute, heartbeat, requeue_stale, run_pending, Worker
+from store.models import Job, DailyOrderRollup, Order
+
+calls = []
+
+
+@task(max_attempts=3, retry_delay=10)
+def record(value):
+    calls.append(value)
+    return {'value': value}
+
+
+@task(max_attempts=2, retry_delay=10)
+def explode():
+    raise ValueError('falló a propósito')
+
+
+@task(unique=True)
+def refresh(name, full=False):
+    calls.append(name)
+
+
+def not_a_task():
+    pass
+
+
+class JobQueueTest(TestCase):
+    """Tests para enqueue, claim_next y execute"""
+    
+    def setUp(self):
+        calls.clear()
+    
+    def test_enqueue_and_run(self):
+        """Test una tarea encolada se ejecuta y guarda su resultado"""
+        job = record.enqueue('café')
+        self.assertEqual((job.status, job.task), (Job.PENDING, 'store.test.test_jobs.record'))
+        
+        self.assertEqual(run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual(calls, ['café'])
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(job.result, {'value': 'café'})
+        self.assertEqual(job.attempts, 1)
+    
+    def test_enqueue_by_path_requires_task(self):
+        """Test solo se encolan funciones marcadas con @task"""
+        enqueue('store.test.test_jobs.record', 1)
+        with self.assertRaises(ValueError):
+            enqueue(not_a_task)
+    
+    def test_unique_task_is_not_queued_twice(self):
+        """Test una tarea unique con los mismos argumentos pendiente o en curso no se duplica"""
+        first = refresh.enqueue('foto.jpg')
+        self.assertEqual(refresh.enqueue('foto.jpg'), first)
+        self.assertNotEqual(refresh.enqueue('foto.jpg', full=True), first)
+        self.assertNotEqual(refresh.enqueue('otra.jpg'), first)
+
+        claim_next('w1')
+        self.assertEqual(refresh.enqueue('foto.jpg'), first)
+        Job.objects.filter(pk=first.pk).update(status=Job.DONE)
+        self.assertNotEqual(refresh.enqueue('foto.jpg'), first)
+        # Las que no son unique se encolan siempre
+        self.assertNotEqual(record.enqueue(1), record.enqueue(1))
+
+    def test_job_is_claimed_once(self):
+        """Test dos hilos no reclaman la misma tarea"""
+        record.enqueue(1)
+        first = claim_next('worker#0')
+        self.assertEqual(first.locked_by, 'worker#0')
+        self.assertIsNone(claim_next('worker#1'))
+    
+    def test_failure_retries_with_backoff_then_fails(self):
+        """Test un error reintenta con espera y después queda fallida"""
+        job = explode.enqueue()
+        with self.assertLogs('store.jobs', 'WARNING'):
+            run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.PENDING)
+        self.assertIn('falló a propósito', job.last_error)
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=5))
+        
+        # El reintento espera su hora
+        self.assertEqual(run_pending(), 0)
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs('store.jobs', 'WARNING'):
+            run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+        self.assertIsNotNone(job.finished_at)
+    
+    @override_settings(JOBS_STALE_SECONDS=60)
+    def test_stale_running_jobs_are_requeued(self):
+        """Test una tarea de un worker muerto vuelve a la cola"""
+        job = record.enqueue(1)
+        claim_next('muerto#0')
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(minutes=5))
+        
+        self.assertEqual(requeue_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), (Job.PENDING, None))
+    
+    @override_settings(JOBS_STALE_SECONDS=60)
+    def test_heartbeat_keeps_long_jobs_running(self):
+        """Test una tarea larga con heartbeat no vuelve a la cola"""
+        job = record.enqueue(1)
+        claim_next('caja:1#0')
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(minutes=5))
+        
+        self.assertEqual(heartbeat('caja:12'), 0)
+        self.assertEqual(heartbeat('caja:1'), 1)
+        self.assertEqual(requeue_stale(), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.RUNNING)
+    
+    def test_requeued_job_result_is_not_overwritten(self):
+        """Test la primera corrida de una tarea reclamada de nuevo no pisa a la segunda"""
+        record.enqueue(1)
+        first = claim_next('lento#0')
+        Job.objects.filter(pk=first.pk).update(status=Job.PENDING, locked_by=None)
+        second = claim_next('otro#0')
+        
+        with self.assertLogs('store.jobs', 'WARNING'):
+            execute(first)
+        second.refresh_from_db()
+        self.assertEqual((second.status, second.locked_by), (Job.RUNNING, 'otro#0'))
+        
+        execute(second)
+        second.refresh_from_db()
+        self.assertEqual(second.status, Job.DONE)
+    
+    def test_rollup_task(self):
+        """Test la tarea de acumulados los recalcula"""
+        Order.objects.create(order_number='ORD-1', total=50, status='completed',
+                             payment_method='cash', payment_status='completed')
+        DailyOrderRollup.objects.all().delete()
+        
+        enqueue('store.tasks.rebuild_sales_rollups')
+        run_pending()
+        self.assertEqual(DailyOrderRollup.objects.get().order_count, 1)
+        self.assertEqual(Job.objects.get().result['days'], 1)
+
+
+class JobAdminViewsTest(TestCase):
+    """Tests para el panel de tareas"""
+    
+    def setUp(self):
+        self.client = Client()
+        self.admin = User.objects.create_user(username='admin', password='test123', is_staff=True)
+        self.client.force_login(self.admin)
+    
+    def test_status_page_lists_jobs_and_counts(self):
+        """Test el panel muestra las tareas y los conteos por estado"""
+        record.enqueue('visible')
+        response = self.client.get(reverse('admin_jobs'))
+        self.assertContains(response, 'store.test.test_jobs.record')
+        self.assertEqual(dict((v, n) for v, _, n in response.context['status_counts'])['pending'], 1)
+        
+        response = self.client.get(reverse('admin_jobs') + '?status=failed')
+        self.assertNotContains(response, 'store.test.test_jobs.record')
+    
+    def test_enqueue_admin_task(self):
+        """Test el panel encola tareas pesadas sin ejecutarlas en la petición"""
+        response = self.client.post(reverse('admin_job_enqueue'), {'task': 'rebuild_search_index'})
+        self.assertRedirects(response, reverse('admin_jobs'))
+        self.assertEqual(Job.objects.get().task, 'store.tasks.rebuild_search_index')
+        
+        self.client.post(reverse('admin_job_enqueue'), {'task': 'os.system'})
+        self.assertEqual(Job.objects.count(), 1)
+    
+    def test_retry_failed_job(self):
+        """Test reintentar regresa la tarea fallida a la cola"""
+        job = Job.objects.create(task='store.tasks.rebuild_search_index', status=Job.FAILED, attempts=2)
+        self.client.post(reverse('admin_job_retry', args=[job.id]))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.PENDING, 0))
+    
+    def test_non_admin_cannot_enqueue(self):
+        """Test un vendedor no puede lanzar tareas"""
+        self.client.force_login(User.objects.create_user(username='vendedor', password='test123'))
+        self.client.post(reverse('admin_job_enqueue'), {'task': 'rebuild_search_index'})
+        self.assertFalse(Job.objects.exists())
+
+
+class WorkerThreadsTest(TransactionTestCase):
+    """Tests para el worker con varios hilos"""
+    
+    def setUp(self):
+        calls.clear()
+    
+    def test_threads_run_every_job_once(self):
+        """Test cada tarea corre una sola vez con varios hilos"""
+        for value in range(20):
+            record.enqueue(value)
+        
+        processed = Worker(threads=3, poll_interval=0.01).run(burst=True)
+        self.assertEqual(processed, 20)
+        self.assertEqual(sorted(calls), list(range(20)))
+        self.assertEqual(Job.objects.filter(status=Job.DONE).count(), 20)
+    
+    def test_runworker_burst(self):
+        """Test runworker --burst vacía la cola y termina"""
+        record.enqueue('cli')
+        out = StringIO()
+        call_command('runworker', threads=1, burst=True, stdout=out)
+        self.assertIn('1 tareas ejecutadas', out.getvalue())
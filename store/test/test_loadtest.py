@@ -0,0 +1,167 @@
+"""
+Tests para el generador de datos y las pruebas de carga
+Archivo: store/test/test_loadtest.py
+"""
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase
+from store.models import Category, Product, Order, DailyOrderRollup
+from store.loadtest import (
+    generate_cafe, run_benchmark, compare_results, bench_cart_stores, bench_asgi, _menu, SCENARIOS
+)
+
+
+class GenerateCafeTest(TestCase):
+    """Tests para generate_cafe"""
+    
+    def test_menu_has_requested_size_and_unique_names(self):
+        """Test el menú tiene las categorías y productos pedidos sin nombres repetidos"""
+        menu = _menu(8, 300)
+        names = [name for _, items in menu for name, _ in items]
+        self.assertEqual(len(menu), 8)
+        self.assertEqual(len(names), 300)
+        self.assertEqual(len(set(names)), 300)
+    
+    def test_generates_users_products_and_orders(self):
+        """Test crea usuarios en sus grupos, productos y órdenes en el historial"""
+        counts = generate_cafe(categories=3, products=20, admins=1, sellers=2, orders=120, days=10, batch_size=50)
+        
+        self.assertEqual(counts['orders'], 120)
+        self.assertEqual(Category.objects.count(), 3)
+        self.assertEqual(Product.objects.count(), 20)
+        self.assertTrue(User.objects.get(username='admin_sim_1').groups.filter(name='Administrador').exists())
+        self.assertTrue(User.objects.get(username='vendedor_sim_2').groups.filter(name='Vendedor').exists())
+        
+        orders = Order.objects.all()
+        self.assertEqual(orders.count(), 120)
+        self.assertGreater(len({order.created_at.date() for order in orders}), 5)
+        # Los acumulados quedan al día
+        self.assertEqual(DailyOrderRollup.objects.aggregate(n=Sum('order_count'))['n'], 120)
+    
+    def test_second_run_adds_orders_without_number_collisions(self):
+        """Test correr el generador dos veces agrega órdenes nuevas"""
+        generate_cafe(categories=2, products=5, admins=1, sellers=1, orders=30, days=3)
+        generate_cafe(categories=2, products=5, admins=1, sellers=1, orders=30, days=3, seed=1)
+        self.assertEqual(Order.objects.count(), 60)
+        self.assertEqual(User.objects.count(), 2)
+
+
+class RunBenchmarkTest(TransactionTestCase):
+    """Tests para run_benchmark (los clientes corren en otros hilos)"""
+    
+    def setUp(self):
+        cache.clear()
+        generate_cafe(categories=2, products=10, admins=1, sellers=1, orders=40, days=5)
+    
+    def test_reports_every_scenario(self):
+        """Test cada escenario reporta peticiones y percentiles"""
+        results = run_benchmark(clients=1, requests=30, seed=3)
+        
+        self.assertEqual(set(results['routes']), set(SCENARIOS))
+        self.assertEqual(results['total']['requests'], 30)
+        self.assertEqual(results['total']['errors'], 0)
+        self.assertIn('p99_ms', results['total'])
+        json.dumps(results)
+    
+    def test_concurrent_clients_account_for_every_request(self):
+        """Test con varios clientes cada petición cuenta como éxito o error con su motivo"""
+        results = run_benchmark(clients=3, requests=10, seed=1)
+        
+        total = results['total']
+        self.assertEqual(total['requests'] + total['errors'], 30)
+        self.assertEqual(sum(total['error_reasons'].values()), total['errors'])
+    
+    def test_checkout_creates_orders(self):
+        """Test el escenario de cobro registra ventas reales"""
+        before = Order.objects.count()
+        results = run_benchmark(clients=1, requests=3, scenarios=['checkout'])
+        self.assertEqual(results['routes']['checkout']['errors'], 0)
+        self.assertEqual(Order.objects.count(), before + 3)
+    
+    def test_command_saves_json_and_compares(self):
+        """Test bench_routes guarda el JSON y compara con una corrida anterior"""
+        with tempfile.TemporaryDirectory() as tmp:
+            first = os.path.join(tmp, 'antes.json')
+            second = os.path.join(tmp, 'despues.json')
+            call_command('bench_routes', clients=1, requests=4, output=first, stdout=StringIO())
+            out = StringIO()
+            call_command('bench_routes', clients=1, requests=4, output=second, compare=first, stdout=out)
+            
+            with open(second) as f:
+                saved = json.load(f)
+        self.assertEqual(saved['clients'], 1)
+        self.assertIn('Comparación', out.getvalue())
+
+
+class BenchCartStoresTest(TestCase):
+    """Tests para bench_cart_stores"""
+    
+    def setUp(self):
+        cache.clear()
+        generate_cafe(categories=2, products=10, admins=1, sellers=1, orders=10, days=2)
+    
+    def test_cache_store_skips_session_writes(self):
+        """Test el almacén en caché no escribe django_session y el de sesión sí"""
+        results = bench_cart_stores(registers=2, updates=20)
+        
+        self.assertEqual(results['cache']['errors'], 0)
+        self.assertEqual(results['cache']['session_writes'], 0)
+        self.assertGreater(results['session']['session_writes'], 0)
+        self.assertIn('updates_per_s', results['session'])
+    
+    def test_command_prints_comparison(self):
+        """Test bench_cart_store imprime ambos almacenes y la comparación"""
+        out = StringIO()
+        call_command('bench_cart_store', updates=5, registers=1, stdout=out)
+        self.assertIn('session', out.getvalue())
+        self.assertIn('escrituras menos', out.getvalue())
+
+
+class BenchAsgiTest(TransactionTestCase):
+    """Tests para bench_asgi (WSGI con hilos y ASGI con un event loop)"""
+    
+    def setUp(self):
+        cache.clear()
+        generate_cafe(categories=2, products=10, admins=1, sellers=1, orders=20, days=3)
+    
+    def test_both_modes_serve_mixed_traffic(self):
+        """Test cada modo responde todas las peticiones rápidas y lentas"""
+        results = bench_asgi(clients=2, requests=5, workers=1, slow_ratio=0.5, slow_ms=5, seed=2)
+        
+        self.assertEqual(set(results), {'wsgi', 'asgi'})
+        for mode, groups in results.items():
+            total = groups['total']
+            self.assertEqual(total['requests'] + total['errors'], 10, mode)
+            self.assertEqual(groups['fast']['requests'] + groups['slow']['requests'], total['requests'])
+            self.assertGreater(groups['slow']['requests'], 0)
+        json.dumps(results)
+    
+    def test_command_prints_modes(self):
+        """Test bench_asgi imprime una fila por modo y tráfico"""
+        out = StringIO()
+        call_command('bench_asgi', clients=1, requests=2, slow_ms=0, mode=['asgi'], stdout=out)
+        self.assertIn('asgi   slow', out.getvalue())
+
+
+class CompareResultsTest(TestCase):
+    """Tests para compare_results"""
+    
+    def test_percent_change_per_field(self):
+        """Test calcula el cambio porcentual de cada métrica"""
+        before = {'routes': {'home': {'rps': 100, 'p50_ms': 10, 'p95_ms': 20, 'p99_ms': 40}},
+                  'total': {'rps': 100, 'p50_ms': 10, 'p95_ms': 20, 'p99_ms': 40}}
+        after = {'routes': {'home': {'rps': 150, 'p50_ms': 5, 'p95_ms': 20, 'p99_ms': 30}, 'reports': {'rps': 1}},
+                 'total': {'rps': 150, 'p50_ms': 5, 'p95_ms': 20, 'p99_ms': 30}}
+        rows = {(name, field): change for name, field, _, _, change in compare_results(before, after)}
+        
+        self.assertEqual(rows[('home', 'rps')], 50.0)
+        self.assertEqual(rows[('home', 'p50_ms')], -50.0)
+        self.assertEqual(rows[('TOTAL', 'p99_ms')], -25.0)
+        self.assertNotIn(('reports', 'rps'), rows)
@@ -0,0 +1,92 @@
+"""
+Tests para el listado de órdenes paginado por cursor
+Archivo: store/test/test_order_list.py
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from store.models import Order
+from store.order_list import filter_orders, keyset_page, order_summary, parse_filters
+
+
+@override_settings(ADMIN_ORDERS_PAGE_SIZE=5)
+class AdminOrderListTest(TestCase):
+    """Tests para paginación, filtros y conteos del panel de órdenes"""
+    
+    def setUp(self):
+        self.client = Client()
+        self.admin = User.objects.create_user(username='admin', password='admin123', is_staff=True)
+        self.cajero = User.objects.create_user(username='cajero', password='test123', is_staff=True)
+        self.client.force_login(self.admin)
+        
+        now = timezone.now()
+        orders = Order.objects.bulk_create([
+            Order(
+                order_number=f'LST-{i:03d}',
+                customer=self.cajero if i % 2 else self.admin,
+                total=10,
+                status='completed' if i % 3 else 'pending',
+                payment_method='card' if i % 4 == 0 else 'cash',
+                payment_status='completed',
+            )
+            for i in range(12)
+        ])
+        # Dos órdenes con la misma fecha para probar el desempate por id
+        for i, order in enumerate(orders):
+            order.created_at = now - timedelta(hours=i // 2)
+        Order.objects.bulk_update(orders, ['created_at'])
+    
+    def test_pages_cover_every_order_once(self):
+        """Test recorrer las páginas con el cursor da cada orden una sola vez"""
+        seen = []
+        cursor = None
+        while True:
+            page, cursor = keyset_page(Order.objects.all(), cursor)
+            seen.extend(order.order_number for order in page)
+            if cursor is None:
+                break
+        self.assertEqual(len(seen), 12)
+        self.assertEqual(len(set(seen)), 12)
+        expected = list(Order.objects.order_by('-created_at', '-id').values_list('order_number', flat=True))
+        self.assertEqual(seen, expected)
+    
+    def test_filters_are_pushed_to_sql(self):
+        """Test los filtros del querystring se aplican y los inválidos se ignoran"""
+        filters = parse_filters({
+            'status': 'completed',
+            'payment_method': 'cash',
+            'cashier': str(self.cajero.id),
+            'fecha_inicio': 'no-es-fecha',
+        })
+        self.assertNotIn('fecha_inicio', filters)
+        orders = filter_orders(filters)
+        self.assertTrue(orders.exists())
+        for order in orders:
+            self.assertEqual((order.status, order.payment_method, order.customer_id), ('completed', 'cash', self.cajero.id))
+    
+    def test_summary_single_query(self):
+        """Test conteos y total vendido salen de una sola consulta"""
+        with self.assertNumQueries(1):
+            summary = order_summary(Order.objects.all())
+        self.assertEqual(summary['total_orders'], 12)
+        self.assertEqual(summary['completed_orders'], 8)
+        self.assertEqual(summary['total_sales'], Decimal('80'))
+    
+    def test_page_query_count_is_bounded(self):
+        """Test la página cuesta las mismas consultas sin importar el historial"""
+        self.client.get(reverse('admin_orders'))
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('admin_orders'), {'status': 'completed'})
+        self.assertEqual(len(response.context['orders']), 5)
+        self.assertIsNotNone(response.context['next_url'])
+        self.assertIn('status=completed', response.context['next_url'])
+        
+        # La siguiente página usa el cursor y conserva los filtros
+        response = self.client.get(reverse('admin_orders') + response.context['next_url'])
+        self.assertEqual(len(response.context['orders']), 3)
+        self.assertIsNone(response.context['next_url'])
+        self.assertIsNotNone(response.context['first_url'])
@@ -0,0 +1,104 @@
+"""
+Tests para los generadores de números de orden
+Archivo: store/test/test_order_numbers.py
+"""
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, OperationalError
+from django.test import TestCase, TransactionTestCase, override_settings
+from store.models import OrderSequence
+from store.order_numbers import (
+    SequenceBlockGenerator, SnowflakeGenerator, get_generator, next_order_numbers
+)
+
+
+class SequenceBlockGeneratorTest(TestCase):
+    """Tests para el generador por bloques"""
+    
+    def test_numbers_are_sequential_and_sortable(self):
+        """Test números consecutivos, cortos y ordenables como texto"""
+        numbers = SequenceBlockGenerator(block_size=3).take(7)
+        self.assertEqual(numbers[0], 'ORD-00000001')
+        self.assertEqual(numbers, sorted(numbers))
+        self.assertEqual(len(set(numbers)), 7)
+    
+    def test_generators_share_sequence_without_overlap(self):
+        """Test dos workers nunca reciben el mismo bloque"""
+        worker1 = SequenceBlockGenerator(block_size=5)
+        worker2 = SequenceBlockGenerator(block_size=5)
+        numbers = worker1.take(3) + worker2.take(3) + worker1.take(4)
+        self.assertEqual(len(set(numbers)), 10)
+        self.assertEqual(OrderSequence.objects.get(name='orders').next_value, 16)
+    
+    @override_settings(ORDER_NUMBER_GENERATOR='store.order_numbers.SnowflakeGenerator')
+    def test_generator_is_configurable(self):
+        """Test el generador se elige con ORDER_NUMBER_GENERATOR"""
+        self.assertIsInstance(get_generator(), SnowflakeGenerator)
+        self.assertEqual(len(next_order_numbers(2)), 2)
+
+
+class SnowflakeGeneratorTest(TestCase):
+    """Tests para el generador sin consultas"""
+    
+    def test_numbers_are_unique_and_sorted(self):
+        """Test miles de números en el mismo milisegundo no se repiten"""
+        with self.assertNumQueries(0):
+            numbers = SnowflakeGenerator(worker_id=7).take(10000)
+        self.assertEqual(len(set(numbers)), 10000)
+        self.assertEqual(numbers, sorted(numbers))
+    
+    def test_workers_do_not_collide(self):
+        """Test distintos workers generan números distintos"""
+        numbers = SnowflakeGenerator(worker_id=1).take(100) + SnowflakeGenerator(worker_id=2).take(100)
+        self.assertEqual(len(set(numbers)), 200)
+    
+    def test_unconfigured_workers_get_ids_from_sequence(self):
+        """Test sin ORDER_NUMBER_WORKER_ID cada proceso toma un id distinto de la base de datos"""
+        first, second = SnowflakeGenerator(), SnowflakeGenerator()
+        self.assertNotEqual(first._worker_id(), second._worker_id())
+        with self.assertNumQueries(0):
+            first.take(10)
+        self.assertEqual(OrderSequence.objects.get(name='snowflake_workers').next_value, 3)
+    
+    @override_settings(ORDER_NUMBER_WORKER_ID=1024)
+    def test_worker_id_out_of_range(self):
+        """Test un ORDER_NUMBER_WORKER_ID fuera de 10 bits es un error de configuración"""
+        with self.assertRaises(ImproperlyConfigured):
+            SnowflakeGenerator().take(1)
+
+
+class ConcurrentSequenceTest(TransactionTestCase):
+    """Varios hilos (workers) pidiendo bloques al mismo tiempo"""
+    
+    def test_no_duplicates_across_threads(self):
+        """Test no hay números repetidos entre hilos"""
+        numbers = []
+        lock = threading.Lock()
+        
+        def worker():
+            generator = SequenceBlockGenerator(block_size=10)
+            try:
+                taken = []
+                for _ in range(5):
+                    while True:
+                        try:
+                            taken.extend(generator.take(7))
+                            break
+                        except OperationalError:
+                            # SQLite bloquea la tabla completa; reintentar
+                            continue
+                with lock:
+                    numbers.extend(taken)
+            finally:
+                connection.close()
+        
+        SequenceBlockGenerator(block_size=1).take(1)
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len(numbers), 140)
+        self.assertEqual(len(set(numbers)), 140)
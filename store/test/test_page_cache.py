@@ -0,0 +1,137 @@
+"""
+Tests para la caché HTTP de las páginas públicas del catálogo
+Archivo: store/test/test_page_cache.py
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+from store.invalidation import PRODUCT, STOCK, CATEGORY, version
+from store.checkout import process_sale
+from store.models import Product, Category
+
+
+class CatalogPageCacheTest(TestCase):
+    """Tests para @catalog_page"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.seller = User.objects.create_user(username='cajero', password='test123')
+        self.category = Category.objects.create(name="Bebidas")
+        self.product = Product.objects.create(name="Café", price=25, category=self.category, stock=10)
+        self.urls = [
+            reverse('home'),
+            reverse('products_by_category', args=[self.category.id]),
+            reverse('product_detail', args=[self.product.id]),
+        ]
+
+    def test_anonymous_pages_are_served_from_cache(self):
+        """Test la segunda visita anónima no consulta la base de datos"""
+        for url in self.urls:
+            first = self.client.get(url)
+            with self.assertNumQueries(0):
+                second = self.client.get(url)
+            self.assertEqual(second.content, first.content)
+            self.assertTrue(second.has_header('ETag'))
+            self.assertTrue(second.has_header('Last-Modified'))
+            self.assertIn('Cookie', second['Vary'])
+
+    def test_conditional_requests_return_304(self):
+        """Test If-None-Match e If-Modified-Since responden 304 sin cuerpo"""
+        url = self.urls[0]
+        response = self.client.get(url)
+
+        not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b'')
+
+        since = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(since.status_code, 304)
+
+    def test_product_change_bumps_version_and_page(self):
+        """Test guardar un producto cambia la versión y el ETag de la página"""
+        url = self.urls[2]
+        before = self.client.get(url)
+        before_version = version(PRODUCT)
+
+        self.product.price = 30
+        self.product.save()
+
+        self.assertGreater(version(PRODUCT), before_version)
+        after = self.client.get(url, HTTP_IF_NONE_MATCH=before['ETag'])
+        self.assertEqual(after.status_code, 200)
+        self.assertContains(after, '30')
+        self.assertNotEqual(after['ETag'], before['ETag'])
+
+    def test_category_delete_and_sale_bump_version(self):
+        """Test borrar una categoría o vender (stock) también invalidan"""
+        stock = version(STOCK)
+        with self.captureOnCommitCallbacks(execute=True):
+            process_sale(self.seller, {str(self.product.id): 1}, '100')
+        self.assertGreater(version(STOCK), stock)
+
+        categories = version(CATEGORY)
+        Category.objects.create(name="Pan").delete()
+        self.assertGreater(version(CATEGORY), categories)
+
+    def test_authenticated_users_are_not_served_anonymous_page(self):
+        """Test con sesión se renderiza la página con el menú del usuario"""
+        self.client.get(self.urls[0])
+        user = User.objects.create_user(username='vendedor', password='test123')
+        self.client.force_login(user)
+
+        response = self.client.get(self.urls[0])
+        self.assertContains(response, 'vendedor')
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_sale_keeps_other_category_pages(self):
+        """Test vender un producto no invalida la página de otra categoría"""
+        pan = Category.objects.create(name="Pan")
+        bebidas_url, pan_url = self.urls[1], reverse('products_by_category', args=[pan.id])
+        self.client.get(bebidas_url)
+        self.client.get(pan_url)
+
+        process_sale(self.seller, {str(self.product.id): 1}, '100')
+
+        with self.assertNumQueries(0):
+            self.client.get(pan_url)
+        self.assertContains(self.client.get(bebidas_url), '9 disponibles')
+
+    def test_missing_product_is_not_cached(self):
+        """Test un 404 no se guarda en la caché"""
+        url = reverse('product_detail', args=[999])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class CategoryNavFragmentTest(TestCase):
+    """Tests para el fragmento de navegación por categorías"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(User.objects.create_user(username='vendedor', password='test123'))
+        self.bebidas = Category.objects.create(name="Bebidas")
+        self.pan = Category.objects.create(name="Pan")
+        self.product = Product.objects.create(name="Café", price=25, category=self.bebidas, stock=10)
+
+    def test_nav_is_shared_and_cached_per_version(self):
+        """Test la navegación aparece en categoría y detalle y no se vuelve a consultar"""
+        url = reverse('products_by_category', args=[self.pan.id])
+        self.client.get(url)
+        with self.assertNumQueries(4):
+            # sesión, usuario, categoría y productos; las categorías salen del fragmento
+            response = self.client.get(url)
+        self.assertContains(response, reverse('products_by_category', args=[self.bebidas.id]))
+
+        detail = self.client.get(reverse('product_detail', args=[self.product.id]))
+        self.assertContains(detail, 'class="quick-nav"')
+        self.assertContains(detail, 'btn-category active')
+
+    def test_new_category_appears_in_nav(self):
+        """Test una categoría nueva invalida el fragmento"""
+        url = reverse('products_by_category', args=[self.pan.id])
+        self.client.get(url)
+        Category.objects.create(name="Postres")
+        self.assertContains(self.client.get(url), 'Postres')
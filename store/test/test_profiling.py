@@ -0,0 +1,68 @@
+"""
+Tests para las métricas por vista
+Archivo: store/test/test_profiling.py
+"""
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from store.models import Category, Product
+from store.profiling import registry
+
+
+class MetricsMiddlewareTest(TestCase):
+    """Tests para el middleware de métricas y sus páginas"""
+    
+    def setUp(self):
+        registry.reset()
+        cache.clear()
+        self.client = Client()
+        self.admin = User.objects.create_user(username='admin', password='admin123', is_staff=True)
+        category = Category.objects.create(name="Bebidas")
+        Product.objects.create(name="Café", price=25, category=category)
+    
+    def _row(self, view):
+        return next(row for row in registry.snapshot() if row['view'] == view)
+    
+    def test_records_queries_and_times_per_view(self):
+        """Test cada petición suma consultas, tiempos y render por nombre de URL"""
+        # Con sesión: la home anónima sale de la caché de páginas sin consultas
+        self.client.force_login(self.admin)
+        for _ in range(3):
+            self.client.get(reverse('home'))
+        row = self._row('home')
+        self.assertEqual(row['count'], 3)
+        self.assertGreater(row['queries']['p50'], 0)
+        self.assertGreater(row['template_ms']['p50'], 0)
+        self.assertGreaterEqual(row['total_ms']['max'], row['db_ms']['max'])
+    
+    @override_settings(METRICS_QUERY_BUDGET=0)
+    def test_logs_requests_over_budget(self):
+        """Test las peticiones que pasan el presupuesto se registran"""
+        with self.assertLogs('store.profiling', level='WARNING') as logs:
+            self.client.get(reverse('home'))
+        self.assertIn('home', logs.output[0])
+        self.assertEqual(self._row('home')['over_budget'], 1)
+    
+    def test_metrics_pages_staff_only(self):
+        """Test el panel y el texto de Prometheus son solo para administradores"""
+        self.client.get(reverse('home'))
+        self.assertEqual(self.client.get(reverse('metrics_prometheus')).status_code, 403)
+        self.assertEqual(self.client.get(reverse('admin_metrics')).status_code, 302)
+        
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('admin_metrics'))
+        self.assertContains(response, 'home')
+        
+        response = self.client.get(reverse('metrics_prometheus'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'store_view_latency_seconds{view="home",quantile="0.99"}')
+        self.assertContains(response, 'store_view_queries_count{view="home"} 1')
+    
+    @override_settings(METRICS_TOKEN='secreto')
+    def test_prometheus_token(self):
+        """Test Prometheus puede leer las métricas con el token"""
+        response = self.client.get(reverse('metrics_prometheus'), HTTP_AUTHORIZATION='Bearer secreto')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(reverse('metrics_prometheus'), HTTP_AUTHORIZATION='Bearer otro')
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,81 @@
+"""
+Tests para la revisión de planes de consulta
+Archivo: store/test/test_query_audit.py
+"""
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from store.models import Order, OrderItem, Product
+from store.query_audit import seed_dataset, audit_views, full_table_scans, isolated_cache
+
+
+def executed_sql(queryset):
+    """SQL tal como se ejecutó (con parámetros)"""
+    with CaptureQueriesContext(connection) as ctx:
+        list(queryset)
+    return ctx.captured_queries[0]['sql']
+
+
+class QueryAuditTest(TestCase):
+    """Tests para EXPLAIN sobre las consultas de las vistas"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = seed_dataset(products=40, orders=200)
+    
+    def test_views_use_indexes(self):
+        """Test ninguna vista recorre completas las tablas que crecen"""
+        self.assertEqual(audit_views(self.admin), [])
+    
+    def test_detects_full_scan(self):
+        """Test un filtro sin índice se reporta como recorrido completo"""
+        sql = executed_sql(Order.objects.filter(payment_method='cash'))
+        self.assertIn('orders', full_table_scans(sql))
+    
+    def test_indexed_filters_do_not_scan(self):
+        """Test los filtros calientes usan los índices nuevos"""
+        for queryset in [
+            Order.objects.filter(status='pending').order_by('-created_at'),
+            Order.objects.filter(customer=self.admin).order_by('-created_at'),
+            Product.objects.filter(stock__lt=10, is_active=True).order_by('stock'),
+        ]:
+            self.assertNotIn(queryset.model._meta.db_table, full_table_scans(executed_sql(queryset)))
+
+
+class IsolatedCacheTest(TestCase):
+    """Tests para isolated_cache() (la revisión no usa la caché compartida)"""
+    
+    def test_audit_does_not_touch_shared_cache(self):
+        """Test la revisión empieza con caché vacía y no deja nada en la compartida"""
+        cache.set('store:version:all', 7)
+        with isolated_cache():
+            self.assertIsNone(cache.get('store:version:all'))
+            admin = seed_dataset(products=5, orders=20)
+            self.assertEqual(audit_views(admin), [])
+        self.assertEqual(cache.get('store:version:all'), 7)
+        self.assertIsNone(cache.get('store:version:order'))
+
+
+class SeedWithoutReturnedIdsTest(TestCase):
+    """Tests para seed_dataset en bases de datos que no regresan ids (MySQL)"""
+    
+    def test_seed_rereads_ids(self):
+        """Test sin ids de bulk_create los productos y órdenes se vuelven a leer"""
+        with patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            seed_dataset(products=6, orders=12)
+        self.assertEqual(Order.objects.count(), 12)
+        self.assertEqual(OrderItem.objects.count(), 36)
+        self.assertFalse(Order.objects.filter(total=0).exists())
+    
+    def test_unsupported_database(self):
+        """Test una base de datos sin EXPLAIN conocido es un error del comando"""
+        with patch.object(connection, 'vendor', 'oracle'):
+            with self.assertRaisesMessage(CommandError, 'oracle'):
+                call_command('audit_query_plans')
+        with patch.object(connection, 'vendor', 'oracle'), self.assertRaises(ValueError):
+            full_table_scans('SELECT 1')
@@ -0,0 +1,40 @@
+"""
+Tests de presupuesto de consultas por vista
+Archivo: store/test/test_query_budgets.py
+"""
+from django.test import TestCase, Client
+from store.models import ReceiptDocument
+from store.query_audit import seed_dataset, audited_urls
+
+from .query_budgets import SIZES
+from .utils import QueryBudgetMixin
+
+
+class QueryBudgetTest(QueryBudgetMixin, TestCase):
+    """Cada vista hace un número fijo de consultas sin importar cuántos datos haya"""
+    
+    def test_views_are_constant_in_queries(self):
+        """Test las vistas respetan su presupuesto con 10, 100 y 1000 productos y órdenes"""
+        admin = None
+        counts = {}
+        seeded = 0
+        for size in SIZES:
+            admin = seed_dataset(products=size - seeded, orders=size - seeded, admin=admin)
+            seeded = size
+            # Los tickets guardados también son una caché: cada tamaño arma
+            # el de su orden en la petición fría, como las órdenes anteriores
+            ReceiptDocument.objects.all().delete()
+            client = Client()
+            client.force_login(admin)
+            for name, url in audited_urls(admin):
+                with self.subTest(url=url, size=size):
+                    counts.setdefault(url, {})[size] = self.assertQueryBudget(client, name, url)
+        
+        for url, by_size in counts.items():
+            for state in ('cold', 'warm'):
+                with self.subTest(url=url, state=state):
+                    by_state = {size: count[state] for size, count in by_size.items()}
+                    self.assertEqual(
+                        len(set(by_state.values())), 1,
+                        f'{url} ({state}): las consultas crecen con los datos {by_state}'
+                    )
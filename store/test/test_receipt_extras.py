@@ -0,0 +1,63 @@
+"""
+Tests para los filtros del ticket y el respaldo de pagos
+Archivo: store/test/test_receipt_extras.py
+"""
+from importlib import import_module
+from decimal import Decimal
+
+from django.apps import apps
+from django.test import TestCase
+from django.contrib.auth.models import User
+from store.models import Product, Category, Order
+from store.checkout import process_sale
+from store.templatetags.receipt_extras import extract_payment, extract_change
+
+backfill = import_module('store.migrations.0010_backfill_order_payments')
+
+
+class ReceiptFiltersTest(TestCase):
+    """Tests para extract_payment / extract_change"""
+    
+    def _order(self, number, **kwargs):
+        return Order.objects.create(
+            order_number=number, total=70, status='completed',
+            payment_method='cash', payment_status='completed', **kwargs
+        )
+    
+    def test_filters_read_columns(self):
+        """Test las columnas tienen prioridad sobre notes"""
+        order = self._order('A', payment_received=Decimal('100'), change_amount=Decimal('30'))
+        self.assertEqual(extract_payment(order), '100.00')
+        self.assertEqual(extract_change(order), '30.00')
+    
+    def test_filters_fall_back_to_notes(self):
+        """Test órdenes antiguas se leen desde notes"""
+        order = self._order('B', notes='Pago: $100.00 | Cambio: $30.00')
+        self.assertEqual(extract_payment(order), '100.00')
+        self.assertEqual(extract_change(order), '30.00')
+        self.assertEqual(extract_payment('Pago: $50.00'), '50.00')
+        self.assertEqual(extract_change(None), '0.00')
+    
+    def test_checkout_fills_payment_columns(self):
+        """Test la venta guarda pago y cambio en sus columnas"""
+        user = User.objects.create_user(username='cajero', password='test123')
+        category = Category.objects.create(name="Bebidas")
+        product = Product.objects.create(name="Café", price=25, category=category, stock=10)
+        
+        order, change = process_sale(user, {str(product.id): 2}, '100')
+        order.refresh_from_db()
+        self.assertEqual(order.payment_received, Decimal('100.00'))
+        self.assertEqual(order.change_amount, Decimal('50.00'))
+    
+    def test_backfill_migration(self):
+        """Test la migración copia pagos antiguos a las columnas"""
+        legacy = self._order('C', notes='Pago: $200.00 | Cambio: $130.00')
+        other = self._order('D', notes='Sin datos de pago')
+        
+        backfill.backfill_payments(apps, None)
+        
+        legacy.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(legacy.payment_received, Decimal('200.00'))
+        self.assertEqual(legacy.change_amount, Decimal('130.00'))
+        self.assertIsNone(other.payment_received)
@@ -0,0 +1,86 @@
+"""
+Tests para los tickets precalculados
+Archivo: store/test/test_receipts.py
+"""
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from store.models import Product, Category, Order, OrderItem, ReceiptDocument
+from store.checkout import process_sale
+from store.receipts import get_receipt, render_receipt, render_text
+
+
+class ReceiptDocumentTest(TestCase):
+    """Tests para el documento del ticket y sus formatos"""
+    
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='vendedor', password='test123')
+        self.user.groups.add(Group.objects.create(name='Vendedor'))
+        self.client.login(username='vendedor', password='test123')
+        
+        category = Category.objects.create(name="Bebidas")
+        self.product = Product.objects.create(name="Café Americano", price=25, category=category, stock=10)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order, change = process_sale(self.user, {str(self.product.id): 2}, '100')
+    
+    def test_checkout_stores_receipt(self):
+        """Test la venta guarda el documento del ticket"""
+        data = ReceiptDocument.objects.get(order=self.order).data
+        self.assertEqual(data['order_number'], self.order.order_number)
+        self.assertEqual(data['cashier'], 'vendedor')
+        self.assertEqual(data['items'][0]['subtotal'], '50.00')
+        self.assertEqual(data['change_amount'], '50.00')
+    
+    def test_reprint_needs_no_queries(self):
+        """Test reimprimir en cualquier formato no consulta la base de datos"""
+        with self.assertNumQueries(0):
+            get_receipt(self.order.id)
+            for fmt in ('txt', 'escpos', 'html', 'pdf'):
+                render_receipt(self.order.id, fmt)
+                render_receipt(self.order.id, fmt)
+    
+    def test_receipt_rebuilt_for_legacy_orders(self):
+        """Test órdenes sin documento arman su ticket una vez"""
+        order = Order.objects.create(
+            order_number='LEGACY-1', customer=self.user, total=25, status='completed',
+            payment_method='cash', payment_status='completed', notes='Pago: $30.00 | Cambio: $5.00'
+        )
+        OrderItem.objects.create(order=order, product=self.product, quantity=1, unit_price=25, subtotal=25)
+        
+        data = get_receipt(order.id)
+        self.assertEqual(data['payment_received'], '30.00')
+        self.assertTrue(ReceiptDocument.objects.filter(order=order).exists())
+        self.assertIsNone(get_receipt(999999))
+    
+    def test_text_rendering(self):
+        """Test el texto respeta el ancho de la impresora"""
+        text = render_text(get_receipt(self.order.id), width=32)
+        self.assertIn('Café Americano', text)
+        self.assertTrue(all(len(line) <= 32 for line in text.splitlines()))
+    
+    def test_receipt_document_views(self):
+        """Test endpoints de reimpresión"""
+        response = self.client.get(reverse('receipt_document', args=[self.order.id, 'pdf']))
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(response.content.startswith(b'%PDF-1.4'))
+        
+        response = self.client.get(reverse('receipt_document', args=[self.order.id, 'escpos']))
+        self.assertTrue(response.content.startswith(b'\x1b@'))
+        
+        response = self.client.get(reverse('receipt_document', args=[self.order.id, 'html']))
+        self.assertContains(response, self.order.order_number)
+        
+        response = self.client.get(reverse('receipt_document', args=[self.order.id, 'doc']))
+        self.assertEqual(response.status_code, 404)
+    
+    def test_sale_receipt_page(self):
+        """Test página del ticket usa el documento"""
+        response = self.client.get(reverse('sale_receipt', args=[self.order.id]))
+        self.assertContains(response, 'Café Americano')
+        self.assertContains(response, '$50.00 MXN')
+        
+        response = self.client.get(reverse('sale_receipt', args=[999999]))
+        self.assertEqual(response.status_code, 404)
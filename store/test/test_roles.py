@@ -0,0 +1,61 @@
+"""
+Tests para los roles en caché
+Archivo: store/test/test_roles.py
+"""
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.core.cache import cache
+from django.contrib.auth.models import User, Group
+from store.roles import get_roles
+
+
+class UserRolesTest(TestCase):
+    """Tests para la resolución de grupos con caché"""
+    
+    def setUp(self):
+        cache.clear()
+        self.vendedores = Group.objects.create(name='Vendedor')
+        self.admins = Group.objects.create(name='Administrador')
+        self.user = User.objects.create_user(username='cajero', password='test123')
+        self.user.groups.add(self.vendedores)
+    
+    def test_roles_cached_between_requests(self):
+        """Test los grupos se consultan una vez y luego salen de caché"""
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(1):
+            self.assertTrue(get_roles(user).is_vendedor)
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            roles = get_roles(user)
+            self.assertTrue(roles.is_vendedor_or_admin)
+            self.assertFalse(roles.is_admin)
+    
+    def test_group_change_invalidates(self):
+        """Test agregar o quitar grupos se refleja de inmediato"""
+        self.assertFalse(get_roles(self.user).is_admin)
+        self.user.groups.add(self.admins)
+        self.assertTrue(get_roles(User.objects.get(pk=self.user.pk)).is_admin)
+        
+        self.admins.user_set.clear()
+        self.assertFalse(get_roles(User.objects.get(pk=self.user.pk)).is_admin)
+        
+        self.vendedores.delete()
+        self.assertFalse(get_roles(User.objects.get(pk=self.user.pk)).is_vendedor)
+    
+    def test_request_user_roles(self):
+        """Test las vistas y el menú usan request.user_roles sin repetir consultas de grupos"""
+        client = Client()
+        client.login(username='cajero', password='test123')
+        client.get(reverse('home'))
+        
+        response = client.get(reverse('multi_sale'))
+        self.assertTrue(response.wsgi_request.user_roles.is_vendedor)
+        self.assertContains(response, 'Vendedor')
+        self.assertNotContains(response, 'Panel Admin')
+        
+        # Nueva petición: ninguna consulta a auth_user_groups
+        with CaptureQueriesContext(connection) as ctx:
+            client.get(reverse('home'))
+        self.assertFalse([q for q in ctx.captured_queries if 'auth_user_groups' in q['sql']])
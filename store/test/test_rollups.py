@@ -0,0 +1,99 @@
+"""
+Tests para las ventas acumuladas por día
+Archivo: store/test/test_rollups.py
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from store.models import Product, Category, DailySalesRollup, DailyOrderRollup
+from store.checkout import process_sale, ingest_offline_sales
+from store.order_numbers import next_order_number
+from store.rollups import sales_totals, top_selling_products, sales_by_category
+
+
+@override_settings(ORDER_NUMBER_BLOCK_SIZE=1000)
+class SalesRollupTest(TestCase):
+    """Tests para los acumulados que se actualizan al cobrar"""
+    
+    def setUp(self):
+        next_order_number()
+        self.user = User.objects.create_user(username='cajero', password='test123')
+        self.bebidas = Category.objects.create(name="Bebidas")
+        self.pan = Category.objects.create(name="Pan")
+        self.cafe = Product.objects.create(name="Café", price=25, category=self.bebidas, stock=50)
+        self.concha = Product.objects.create(name="Concha", price=12, category=self.pan, stock=50)
+    
+    def test_process_sale_updates_rollups(self):
+        """Test cada venta suma cantidades, ingresos y órdenes del día"""
+        process_sale(self.user, {str(self.cafe.id): 2, str(self.concha.id): 1}, '100')
+        process_sale(self.user, {str(self.cafe.id): 1}, '100')
+        
+        today = timezone.localdate()
+        day = DailyOrderRollup.objects.get(date=today)
+        self.assertEqual(day.order_count, 2)
+        self.assertEqual(day.revenue, Decimal('87'))
+        
+        cafe = DailySalesRollup.objects.get(date=today, product=self.cafe)
+        self.assertEqual(cafe.quantity, 3)
+        self.assertEqual(cafe.revenue, Decimal('75'))
+        self.assertEqual(cafe.order_count, 2)
+        self.assertEqual(cafe.category_name, 'Bebidas')
+        
+        self.assertEqual(sales_totals(today, today), {'revenue': Decimal('87'), 'order_count': 2})
+        self.assertEqual(top_selling_products(today, today)[0]['product_name'], 'Café')
+        self.assertEqual(
+            [row['category_name'] for row in sales_by_category(today, today)],
+            ['Bebidas', 'Pan']
+        )
+    
+    def test_offline_sales_use_sale_day(self):
+        """Test las ventas fuera de línea se acumulan en el día en que se vendieron"""
+        sold_at = timezone.localtime() - timedelta(days=3)
+        ingest_offline_sales(self.user, [{
+            'client_key': 'venta-1',
+            'items': {str(self.concha.id): 4},
+            'payment_received': '50',
+            'sold_at': sold_at.isoformat(),
+        }])
+        
+        row = DailySalesRollup.objects.get(product=self.concha)
+        self.assertEqual(row.date, sold_at.date())
+        self.assertEqual(row.quantity, 4)
+        self.assertEqual(DailyOrderRollup.objects.get(date=sold_at.date()).order_count, 1)
+    
+    def test_rebuild_matches_incremental(self):
+        """Test recalcular desde las órdenes da los mismos acumulados"""
+        process_sale(self.user, {str(self.cafe.id): 2, str(self.concha.id): 3}, '100')
+        process_sale(self.user, {str(self.concha.id): 1}, '100')
+        expected = list(DailySalesRollup.objects.order_by('product_id').values_list(
+            'date', 'product_id', 'quantity', 'revenue', 'order_count'
+        ))
+        
+        DailySalesRollup.objects.all().delete()
+        DailyOrderRollup.objects.all().delete()
+        call_command('rebuild_sales_rollups', stdout=open('/dev/null', 'w'))
+        
+        self.assertEqual(list(DailySalesRollup.objects.order_by('product_id').values_list(
+            'date', 'product_id', 'quantity', 'revenue', 'order_count'
+        )), expected)
+        self.assertEqual(DailyOrderRollup.objects.get().order_count, 2)
+    
+    def test_reports_read_rollups(self):
+        """Test los reportes muestran los totales de los acumulados"""
+        admin = User.objects.create_user(username='admin', password='test123', is_staff=True)
+        process_sale(self.user, {str(self.cafe.id): 2}, '100')
+        
+        client = Client()
+        client.force_login(admin)
+        response = client.get(reverse('reports'))
+        self.assertEqual(response.context['total_ventas'], Decimal('50'))
+        self.assertEqual(response.context['total_ordenes'], 1)
+        self.assertContains(response, 'Café')
+        
+        response = client.get(reverse('admin_dashboard'))
+        self.assertEqual(response.context['daily_sales'], Decimal('50'))
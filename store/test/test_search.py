@@ -0,0 +1,103 @@
+"""
+Tests para la búsqueda de productos
+Archivo: store/test/test_search.py
+"""
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from store.models import Product, Category, ProductSearchTerm
+from store.search import fold, tokenize, search, rebuild_search_index
+
+
+class TokenizeTest(TestCase):
+    """Tests para la normalización del texto"""
+    
+    def test_fold_removes_accents(self):
+        """Test 'Café' y 'cafe' se normalizan igual"""
+        self.assertEqual(fold('Café Olé Piñón'), 'cafe ole pinon')
+    
+    def test_tokenize_drops_stopwords(self):
+        """Test las palabras vacías y repetidas no se indexan"""
+        self.assertEqual(tokenize('Pan de Elote con elote'), ['pan', 'elote'])
+
+
+class ProductSearchTest(TestCase):
+    """Tests para el índice de búsqueda y la vista"""
+    
+    def setUp(self):
+        self.client = Client()
+        self.bebidas = Category.objects.create(name="Bebidas Calientes")
+        self.pan = Category.objects.create(name="Panadería")
+        self.cafe = Product.objects.create(name="Café Americano", price=25, category=self.bebidas, tipo="Café", stock=5)
+        self.latte = Product.objects.create(
+            name="Latte", description="Espresso con leche y un toque de café", price=40, category=self.bebidas, stock=5
+        )
+        self.concha = Product.objects.create(name="Concha", description="Pan dulce", price=12, category=self.pan, stock=5)
+    
+    def test_accent_insensitive_and_ranked(self):
+        """Test 'cafe' encuentra 'Café' y el nombre pesa más que la descripción"""
+        self.assertEqual(list(search('cafe')), [self.cafe.id, self.latte.id])
+        self.assertEqual(list(search('CAFÉ')), [self.cafe.id, self.latte.id])
+    
+    def test_all_terms_required_last_is_prefix(self):
+        """Test todos los términos deben aparecer y el último cuenta como prefijo"""
+        self.assertEqual(list(search('leche caf')), [self.latte.id])
+        self.assertEqual(list(search('pan dul')), [self.concha.id])
+        self.assertEqual(list(search('leche concha')), [])
+    
+    def test_category_name_is_searchable(self):
+        """Test se busca también por el nombre de la categoría"""
+        self.assertEqual(list(search('panaderia')), [self.concha.id])
+    
+    def test_signals_keep_index_current(self):
+        """Test editar producto o categoría actualiza el índice"""
+        self.concha.name = "Concha de Vainilla"
+        self.concha.save()
+        self.assertEqual(list(search('vainilla')), [self.concha.id])
+        
+        self.concha.is_active = False
+        self.concha.save()
+        self.assertEqual(list(search('vainilla')), [])
+        
+        self.bebidas.name = "Cafetería"
+        self.bebidas.save()
+        self.assertEqual(set(search('cafeteria')), {self.cafe.id, self.latte.id})
+    
+    def test_rebuild(self):
+        """Test reconstruir el índice completo"""
+        ProductSearchTerm.objects.all().delete()
+        self.assertEqual(rebuild_search_index(), 3)
+        self.assertEqual(list(search('latte')), [self.latte.id])
+    
+    def test_view_paginates_results(self):
+        """Test la vista muestra resultados ordenados y paginados"""
+        for i in range(30):
+            Product.objects.create(name=f"Café {i}", price=20, category=self.bebidas, stock=1)
+        response = self.client.get(reverse('search_products'), {'q': 'cafe'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['page_obj'].paginator.count, 32)
+        self.assertEqual(len(response.context['products']), 24)
+        self.assertEqual(response.context['products'][0], self.cafe)
+        
+        response = self.client.get(reverse('search_products'), {'q': 'cafe', 'page': 2})
+        self.assertEqual(len(response.context['products']), 8)
+
+    def test_short_prefix_matches_whole_terms_only(self):
+        """Test con menos de tres letras el último término no se busca como prefijo"""
+        self.assertEqual(list(search('ca')), [])
+        self.assertEqual(list(search('caf')), [self.cafe.id, self.latte.id])
+        Product.objects.create(name="Té Ca", price=15, category=self.bebidas, stock=1)
+        self.assertEqual(len(search('ca')), 1)
+
+    def test_view_reads_only_one_page_of_ids(self):
+        """Test la vista cuenta y pide una página de ids en SQL, no todos los resultados"""
+        for i in range(30):
+            Product.objects.create(name=f"Café {i}", price=20, category=self.bebidas, stock=1)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('search_products'), {'q': 'cafe', 'page': 2})
+        self.assertEqual(len(response.context['products']), 8)
+        term_queries = [q['sql'] for q in queries if 'product_search_terms' in q['sql']]
+        self.assertEqual(len(term_queries), 2)
+        self.assertTrue(any('COUNT(' in sql for sql in term_queries))
+        self.assertTrue(any('LIMIT 8 OFFSET 24' in sql for sql in term_queries))
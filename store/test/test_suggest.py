@@ -0,0 +1,87 @@
+"""
+Tests para las sugerencias del buscador
+Archivo: store/test/test_suggest.py
+"""
+import time
+
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.core.cache import cache
+from store.models import Product, Category
+from store.suggest import LRUCache, PrefixIndex, suggest
+
+
+class PrefixIndexTest(TestCase):
+    """Tests para el índice de prefijos y el LRU"""
+    
+    def test_lookup_by_any_word(self):
+        """Test encuentra por el inicio del nombre o de cualquier palabra, sin acentos"""
+        index = PrefixIndex([
+            {'id': 1, 'name': 'Café Americano'},
+            {'id': 2, 'name': 'Americano Helado'},
+            {'id': 3, 'name': 'Concha'},
+        ])
+        self.assertEqual([p['id'] for p in index.lookup('cafe', 10)], [1])
+        # Los que empiezan con el prefijo van primero
+        self.assertEqual([p['id'] for p in index.lookup('ameri', 10)], [2, 1])
+        self.assertEqual([p['id'] for p in index.lookup('ameri', 1)], [2])
+        self.assertEqual(index.lookup('te', 10), [])
+    
+    def test_lru_is_bounded(self):
+        """Test el LRU descarta lo menos usado"""
+        lru = LRUCache(2)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertEqual(len(lru), 2)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(lru.get('a'), 1)
+
+
+class SuggestEndpointTest(TestCase):
+    """Tests para /search/suggest/"""
+    
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.category = Category.objects.create(name="Bebidas")
+        self.cafe = Product.objects.create(name="Café de Olla", price=25, category=self.category)
+        Product.objects.create(name="Capuchino", price=35, category=self.category)
+        Product.objects.create(name="Cafetera", price=500, category=self.category, is_active=False)
+    
+    def test_suggest_json(self):
+        """Test regresa productos activos que empiezan con lo escrito"""
+        response = self.client.get(reverse('search_suggest'), {'q': 'caf'})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([r['name'] for r in results], ['Café de Olla'])
+        self.assertEqual(results[0]['url'], reverse('product_detail', args=[self.cafe.id]))
+    
+    def test_memoized_without_queries(self):
+        """Test después de construir el índice no se consulta la base de datos"""
+        suggest('ca')
+        with self.assertNumQueries(0):
+            self.assertEqual(len(suggest('ca')), 2)
+            self.assertEqual(len(suggest('cap')), 1)
+    
+    def test_product_change_rebuilds_index(self):
+        """Test crear o renombrar un producto se refleja en las sugerencias"""
+        self.assertEqual(len(suggest('ca')), 2)
+        Product.objects.create(name="Carlota", price=40, category=self.category)
+        self.assertEqual(len(suggest('ca')), 3)
+        self.cafe.name = "Té Verde"
+        self.cafe.save()
+        self.assertEqual([p['name'] for p in suggest('te')], ['Té Verde'])
+    
+    def test_lookup_is_fast(self):
+        """Test una búsqueda sin memoria tarda mucho menos de un milisegundo"""
+        Product.objects.bulk_create([
+            Product(name=f"Producto {i} especial", price=10, category=self.category) for i in range(2000)
+        ])
+        cache.clear()
+        suggest('x')
+        start = time.perf_counter()
+        for i in range(200):
+            suggest(f'producto {i}')
+        self.assertLess((time.perf_counter() - start) / 200, 0.002)
@@ -8,6 +8,7 @@ from django.urls import reverse
 from django.contrib.auth.models import User, Group
 from django.utils import timezone
 from store.models import Product, Category, Order, OrderItem, InventoryLog
+from store.carts import load_cart
 from decimal import Decimal
 from datetime import timedelta
 
@@ -144,9 +145,8 @@ class PointOfSaleSessionTest(TestCase):
         """Test agregar producto por primera vez"""
         response = self.client.get(reverse('add_to_sale', args=[self.product1.id]))
         self.assertEqual(response.status_code, 302)
-        # Verificar que está en la sesión
-        session = self.client.session
-        sale_items = session.get('sale_items', {})
+        # Verificar que está en el carrito de la caja
+        sale_items = load_cart(self.client.session)
         self.assertIn(str(self.product1.id), sale_items)
     
     def test_add_to_sale_increment(self):
@@ -154,8 +154,7 @@ class PointOfSaleSessionTest(TestCase):
         self.client.get(reverse('add_to_sale', args=[self.product1.id]))
         self.client.get(reverse('add_to_sale', args=[self.product1.id]))
         
-        session = self.client.session
-        sale_items = session.get('sale_items', {})
+        sale_items = load_cart(self.client.session)
         self.assertEqual(sale_items[str(self.product1.id)], 2)
     
     def test_add_to_sale_exceeds_stock(self):
@@ -173,8 +172,7 @@ class PointOfSaleSessionTest(TestCase):
         self.client.get(reverse('add_to_sale', args=[low_stock_product.id]))
         self.client.get(reverse('add_to_sale', args=[low_stock_product.id]))
         
-        session = self.client.session
-        sale_items = session.get('sale_items', {})
+        sale_items = load_cart(self.client.session)
         # No debe exceder el stock
         self.assertEqual(sale_items[str(low_stock_product.id)], 2)
     
@@ -257,8 +255,7 @@ class PointOfSaleSessionTest(TestCase):
         self.assertEqual(response.status_code, 302)
         
         # Verificar que se eliminó
-        session = self.client.session
-        sale_items = session.get('sale_items', {})
+        sale_items = load_cart(self.client.session)
         self.assertNotIn(str(self.product1.id), sale_items)
     
     def test_clear_sale(self):
@@ -276,8 +273,7 @@ class PointOfSaleSessionTest(TestCase):
         self.assertEqual(response.status_code, 302)
         
         # Verificar que se limpió
-        session = self.client.session
-        sale_items = session.get('sale_items', {})
+        sale_items = load_cart(self.client.session)
         self.assertEqual(len(sale_items), 0)
     
     def test_sale_receipt_view(self):
@@ -0,0 +1,45 @@
+"""
+Utilidades compartidas por los tests
+Archivo: store/test/utils.py
+"""
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .query_budgets import QUERY_BUDGETS
+
+
+def count_queries(client, url):
+    """
+    Consultas de dos GET seguidos a `url`: {'cold': ..., 'warm': ...}.
+    El primero va con la caché vacía (llena catálogo, roles, indicadores)
+    y es donde aparece un N+1 que la caché esconde; el segundo la encuentra
+    llena.
+    """
+    queries = {}
+    cache.clear()
+    for state in ('cold', 'warm'):
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+        queries[state] = ctx.captured_queries
+    return response, queries
+
+
+class QueryBudgetMixin:
+    """assertQueryBudget para TestCase: falla si la vista pasa su presupuesto"""
+    
+    def assertQueryBudget(self, client, url_name, url):
+        """Revisa ambas peticiones contra su presupuesto; regresa {'cold': n, 'warm': n}"""
+        self.assertIn(url_name, QUERY_BUDGETS, f'{url_name} no tiene presupuesto en query_budgets.py')
+        response, queries = count_queries(client, url)
+        self.assertLess(response.status_code, 400, f'{url} respondió {response.status_code}')
+        counts = {}
+        for state, captured in queries.items():
+            budget = QUERY_BUDGETS[url_name][state]
+            self.assertLessEqual(
+                len(captured), budget,
+                f'{url} ({state}) hizo {len(captured)} consultas (presupuesto {budget}):\n'
+                + '\n'.join(query['sql'] for query in captured)
+            )
+            counts[state] = len(captured)
+        return counts
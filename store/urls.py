@@ -6,6 +6,7 @@ urlpatterns = [
     # Páginas principales
     path('', views.home, name='home'),
     path('search/', views.search_products, name='search_products'),
+    path('search/suggest/', views.search_suggest, name='search_suggest'),
     
     # Autenticación
     path('register/', views.user_register, name='register'),
@@ -24,7 +25,16 @@ path('sale/multiple/', views.multi_sale, name='multi_sale'),
 path('sale/add/<int:product_id>/', views.add_to_sale, name='add_to_sale'),
 path('sale/remove/<int:product_id>/', views.remove_from_sale, name='remove_from_sale'),
 path('sale/clear/', views.clear_sale, name='clear_sale'),
+path('sale/catalog/', views.pos_catalog, name='pos_catalog'),
+path('sale/api/cart/', views.sale_api_cart, name='sale_api_cart'),
+path('sale/api/add/<int:product_id>/', views.sale_api_add, name='sale_api_add'),
+path('sale/api/set/<int:product_id>/', views.sale_api_set, name='sale_api_set'),
+path('sale/api/remove/<int:product_id>/', views.sale_api_remove, name='sale_api_remove'),
+path('sale/api/clear/', views.sale_api_clear, name='sale_api_clear'),
+path('sale/api/batch/', views.sale_api_batch, name='sale_api_batch'),
+path('sale/api/sync/', views.sale_api_sync, name='sale_api_sync'),
 path('receipt/<int:order_id>/', views.sale_receipt, name='sale_receipt'),
+path('receipt/<int:order_id>/<str:fmt>/', views.receipt_document, name='receipt_document'),
     
     # Órdenes de usuario
     path('my-orders/', views.user_orders, name='user_orders'),
@@ -59,4 +69,14 @@ path('panel/users/delete/<int:user_id>/', views.admin_user_delete, name='admin_u
     
     # Reportes
     path('panel/reports/', views.reports, name='reports'),
+    path('panel/reports/export/<slug:dataset>.<slug:fmt>', views.reports_export, name='reports_export'),
+    
+    # Métricas por vista
+    path('panel/metrics/', views.admin_metrics, name='admin_metrics'),
+    path('panel/metrics/prometheus/', views.metrics_prometheus, name='metrics_prometheus'),
+    
+    # Tareas en segundo plano
+    path('panel/jobs/', views.admin_jobs, name='admin_jobs'),
+    path('panel/jobs/enqueue/', views.admin_job_enqueue, name='admin_job_enqueue'),
+    path('panel/jobs/<int:job_id>/retry/', views.admin_job_retry, name='admin_job_retry'),
 ]
\ No newline at end of file
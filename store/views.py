@@ -5,57 +5,90 @@ from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.models import User, Group
 from django.utils import timezone
+from django.conf import settings
 from django.contrib import messages
 from django.db.models import Q, Sum, Avg, Count
-from django.http import JsonResponse
-import time
-import random
-from datetime import datetime, timedelta
-from .models import Category, Product, Order, OrderItem, InventoryLog
+from django.http import JsonResponse, HttpResponse, Http404
+from django.views.decorators.http import require_POST
+from django.core.paginator import Paginator
+import json
+from urllib.parse import urlencode
+from decimal import Decimal
+from datetime import datetime
+from .models import Category, Product, Order, OrderItem, Job
 from .forms import RegisterForm, ProductForm
+from .checkout import process_sale, ingest_offline_sales, CheckoutError
+from .inventory import hold_stock, release_holds
+from .catalog import get_pos_catalog
+from .page_cache import catalog_page, fragment_context
+from .invalidation import CATEGORY, category_scope, batch
+from .carts import get_cart, save_cart
+from .receipts import get_receipt, render_receipt, RECEIPT_FORMATS
+from .rollups import sales_totals, top_selling_products, sales_by_category
+from .dashboard import dashboard_widgets
+from .search import search
+from .suggest import suggest
+from .roles import get_roles
+from .profiling import registry, prometheus_text
+from .tasks import ADMIN_TASKS
+from .exports import report_range, export_response, EXPORT_DATASETS, EXPORT_FORMATS, EXPORT_LABELS
+from .order_list import (
+    parse_filters, filter_orders, keyset_page, order_summary, cashiers,
+    ORDER_STATUSES, PAYMENT_METHODS
+)
 
 # ======================================== 
 # FUNCIONES DE UTILIDAD
 # ======================================== 
 def is_admin(user):
     """Verifica si el usuario es administrador"""
-    return user.is_staff or user.groups.filter(name='Administrador').exists()
+    return get_roles(user).is_admin
 
 def is_vendedor(user):
     """Verifica si el usuario es vendedor"""
-    return user.groups.filter(name='Vendedor').exists()
+    return get_roles(user).is_vendedor
 
 def is_vendedor_or_admin(user):
     """Verifica si el usuario es vendedor o admin"""
-    return is_admin(user) or is_vendedor(user)
+    return get_roles(user).is_vendedor_or_admin
 
 # ======================================== 
 # VISTAS PÚBLICAS
 # ======================================== 
+@catalog_page()
 def home(request):
+    # Las categorías se consultan solo si su fragmento no está en caché
     categories = Category.objects.filter(is_active=True)
-    products = Product.objects.filter(is_active=True)[:20]
+    products = Product.objects.filter(is_active=True).select_related('category')[:20]
     return render(request, 'store/home.html', {
         'categories': categories,
-        'products': products
+        'products': products,
+        **fragment_context()
     })
 
+@catalog_page(CATEGORY, category_scope)
 def products_by_category(request, category_id):
     category = get_object_or_404(Category, id=category_id)
     products = Product.objects.filter(category=category, is_active=True).order_by('tipo', 'name')
     
-    # Obtener todas las categorías para la navegación rápida
+    # Obtener todas las categorías para la navegación rápida (fragmento en caché)
     all_categories = Category.objects.filter(is_active=True).order_by('name')
     
     return render(request, 'store/products.html', {
         'category': category,
         'products': products,
-        'all_categories': all_categories
+        'all_categories': all_categories,
+        **fragment_context()
     })
 
+@catalog_page()
 def product_detail(request, product_id):
-    product = get_object_or_404(Product, id=product_id)
-    return render(request, 'store/product_detail.html', {'product': product})
+    product = get_object_or_404(Product.objects.select_related('category'), id=product_id)
+    return render(request, 'store/product_detail.html', {
+        'product': product,
+        'all_categories': Category.objects.filter(is_active=True).order_by('name'),
+        **fragment_context()
+    })
 
 # ======================================== 
 # AUTENTICACIÓN
@@ -89,32 +122,53 @@ def user_logout(request):
 # ======================================== 
 # BÚSQUEDA DE PRODUCTOS
 # ======================================== 
+SEARCH_PAGE_SIZE = 24
+
+def search_catalog():
+    """Productos que lista el buscador sin texto"""
+    return Product.objects.filter(is_active=True).select_related('category').order_by('name')
+
+def search_page(query, number):
+    """Página de resultados de `query` e ids de esa página (solo se leen esos)"""
+    page = Paginator(search(query), SEARCH_PAGE_SIZE).get_page(number)
+    return page, list(page.object_list)
+
 def search_products(request):
-    query = request.GET.get('q', '')
-    products = Product.objects.filter(is_active=True)
+    """Búsqueda con índice (sin acentos, por relevancia) y paginada"""
+    query = request.GET.get('q', '').strip()
     if query:
-        products = products.filter(
-            Q(name__icontains=query) | 
-            Q(description__icontains=query) | 
-            Q(category__name__icontains=query)
-        )
+        page, ids = search_page(query, request.GET.get('page'))
+        found = Product.objects.select_related('category').in_bulk(ids)
+        products = [found[product_id] for product_id in ids if product_id in found]
+    else:
+        page = Paginator(search_catalog(), SEARCH_PAGE_SIZE).get_page(request.GET.get('page'))
+        products = list(page)
     return render(request, 'store/search_results.html', {
         'products': products,
+        'page_obj': page,
         'query': query
     })
 
+def search_suggest(request):
+    """Sugerencias en JSON mientras se escribe en el buscador"""
+    query = request.GET.get('q', '')[:100]
+    try:
+        limit = min(max(int(request.GET.get('limit', 8)), 1), 20)
+    except ValueError:
+        limit = 8
+    return JsonResponse({'query': query, 'results': suggest(query, limit)})
+
 # ======================================== 
 # SISTEMA DE PUNTO DE VENTA CON SESIÓN
 # ======================================== 
 
 def get_sale_session(request):
-    """Obtiene los productos en la sesión de venta"""
-    return request.session.get('sale_items', {})
+    """Obtiene los productos de la venta en curso (almacén de carritos, ver carts.py)"""
+    return get_cart(request)
 
 def save_sale_session(request, sale_items):
-    """Guarda los productos en la sesión de venta"""
-    request.session['sale_items'] = sale_items
-    request.session.modified = True
+    """Guarda los productos de la venta; se escribe una vez al final de la petición"""
+    save_cart(request, sale_items)
 
 @user_passes_test(is_vendedor_or_admin)
 def add_to_sale(request, product_id):
@@ -131,10 +185,11 @@ def add_to_sale(request, product_id):
     else:
         sale_items[product_id_str] = 1
     
-    # Validar stock
-    if sale_items[product_id_str] > product.stock:
-        sale_items[product_id_str] = product.stock
-        messages.warning(request, f'Solo hay {product.stock} unidades disponibles')
+    # Validar stock y apartar las unidades para esta caja
+    held = hold_stock(product, request.session.session_key, sale_items[product_id_str])
+    if sale_items[product_id_str] > held:
+        sale_items[product_id_str] = held
+        messages.warning(request, f'Solo hay {held} unidades disponibles')
     else:
         messages.success(request, f'{product.name} agregado al resumen de venta')
     
@@ -166,115 +221,43 @@ def multi_sale(request):
         # Guardar cambios en sesión
         save_sale_session(request, sale_items)
         
-        # Procesar la venta
-        payment_received = float(request.POST.get('payment_received', 0))
-        
-        # Calcular items y total
-        items = []
-        total = 0
-        
-        for product_id_str, quantity in sale_items.items():
-            try:
-                product = Product.objects.get(id=int(product_id_str))
-                
-                # Validar stock
-                if quantity > product.stock:
-                    messages.error(request, f'Solo hay {product.stock} unidades de {product.name}')
-                    return redirect('multi_sale')
-                
-                subtotal = float(product.price) * quantity
-                total += subtotal
-                
-                items.append({
-                    'product': product,
-                    'quantity': quantity,
-                    'subtotal': subtotal
-                })
-            except Product.DoesNotExist:
-                continue
-        
-        if not items:
-            messages.error(request, 'No hay productos en la venta')
-            return redirect('multi_sale')
-        
-        # Validar pago
-        if payment_received < total:
-            messages.error(request, 'El pago recibido es insuficiente')
-            return redirect('multi_sale')
-        
-        # Calcular cambio
-        change = payment_received - total
-        
-        # Crear orden
-        now = timezone.now()
-        order_number = f"ORD-{int(time.time()*1000)}-{random.randint(100,999)}"
-        
-        order = Order.objects.create(
-            order_number=order_number,
-            customer=request.user,
-            total=total,
-            status='completed',
-            payment_method='cash',
-            payment_status='completed',
-            notes=f'Pago: ${payment_received:.2f} | Cambio: ${change:.2f}'
-        )
-        
-        # Crear items y actualizar stock
-        for item in items:
-            OrderItem.objects.create(
-                order=order,
-                product=item['product'],
-                quantity=item['quantity'],
-                unit_price=item['product'].price,
-                subtotal=item['subtotal']
-            )
-            
-            # Actualizar stock
-            item['product'].stock -= item['quantity']
-            item['product'].save()
-            
-            # Log de inventario
-            InventoryLog.objects.create(
-                product=item['product'],
-                quantity_change=-item['quantity'],
-                reason='Venta en punto de venta'
+        # Procesar la venta (una sola transacción, consultas constantes)
+        try:
+            order, change = process_sale(
+                request.user,
+                sale_items,
+                request.POST.get('payment_received', 0),
+                session_key=request.session.session_key
             )
+        except CheckoutError as e:
+            messages.error(request, str(e))
+            return redirect('multi_sale')
         
-        # Limpiar sesión
-        request.session['sale_items'] = {}
-        request.session.modified = True
+        # Limpiar la venta
+        save_sale_session(request, {})
         
         messages.success(request, f'¡Venta completada! Cambio: ${change:.2f} MXN')
         return redirect('sale_receipt', order_id=order.id)
     
-    # Mostrar formulario de venta con productos en sesión
+    # Mostrar formulario de venta con el catálogo precalculado
     sale_items = get_sale_session(request)
     
-    categories = Category.objects.filter(is_active=True)
     categories_with_products = {}
-    
-    for category in categories:
-        products_list = []
-        products = Product.objects.filter(category=category, is_active=True, stock__gt=0)
-        
-        for product in products:
-            product_dict = {
-                'id': product.id,
-                'name': product.name,
-                'price': product.price,
-                'stock': product.stock,
-                'image': product.image.url if product.image else None,  # CORREGIDO
-                'quantity': sale_items.get(str(product.id), 0)
-            }
-            products_list.append(product_dict)
-        
-        if products_list:
-            categories_with_products[category.name] = products_list
+    for category in get_pos_catalog()['categories']:
+        categories_with_products[category['name']] = [
+            dict(product, quantity=sale_items.get(str(product['id']), 0))
+            for product in category['products']
+        ]
     
     return render(request, 'store/multi_sale.html', {
         'categories_with_products': categories_with_products
     })
 
+@login_required
+def pos_catalog(request):
+    """Catálogo del punto de venta en JSON compacto (precios y stock)"""
+    return JsonResponse(get_pos_catalog(), json_dumps_params={'separators': (',', ':')})
+
 @login_required
 def remove_from_sale(request, product_id):
     """Eliminar producto de la venta"""
@@ -284,6 +267,7 @@ def remove_from_sale(request, product_id):
     if str(product_id) in sale_items:
         del sale_items[str(product_id)]
         save_sale_session(request, sale_items)
+        release_holds(request.session.session_key, [product.id])
         messages.info(request, f'{product.name} eliminado de la venta')
     
     return redirect('multi_sale')
@@ -291,21 +275,204 @@ def remove_from_sale(request, product_id):
 @login_required
 def clear_sale(request):
     """Limpiar toda la venta"""
-    request.session['sale_items'] = {}
-    request.session.modified = True
+    save_sale_session(request, {})
+    release_holds(request.session.session_key)
     messages.info(request, 'Venta cancelada')
     return redirect('home')
 
+# ======================================== 
+# API JSON DEL CARRITO (PUNTO DE VENTA)
+# ======================================== 
+OFFLINE_SYNC_MAX_SALES = 200
+
+def _cart_payload(sale_items, warnings=None):
+    """Líneas y totales del carrito; nombres y precios salen del catálogo en caché"""
+    catalog_products = {
+        product['id']: product
+        for category in get_pos_catalog()['categories']
+        for product in category['products']
+    }
+    
+    # Productos fuera del catálogo (p. ej. agotados): una sola consulta
+    missing = [int(pid) for pid in sale_items if int(pid) not in catalog_products]
+    if missing:
+        for product in Product.objects.filter(id__in=missing).only('id', 'name', 'price'):
+            catalog_products[product.id] = {'id': product.id, 'name': product.name, 'price': str(product.price)}
+    
+    lines = []
+    total = Decimal('0.00')
+    for product_id_str, quantity in sale_items.items():
+        product = catalog_products.get(int(product_id_str))
+        if product is None or quantity <= 0:
+            continue
+        subtotal = Decimal(product['price']) * quantity
+        total += subtotal
+        lines.append({
+            'id': product['id'],
+            'name': product['name'],
+            'price': product['price'],
+            'quantity': quantity,
+            'subtotal': str(subtotal),
+        })
+    
+    return JsonResponse({
+        'items': lines,
+        'count': sum(line['quantity'] for line in lines),
+        'total': str(total),
+        'warnings': warnings or [],
+    })
+
+def _set_cart_quantity(request, sale_items, product, quantity, warnings):
+    """Fija la cantidad de un producto en el carrito respetando el stock disponible"""
+    product_id_str = str(product.id)
+    if quantity <= 0:
+        sale_items.pop(product_id_str, None)
+        release_holds(request.session.session_key, [product.id])
+        return
+    
+    held = hold_stock(product, request.session.session_key, quantity)
+    if held < quantity:
+        warnings.append(f'Solo hay {held} unidades de {product.name} disponibles')
+    if held > 0:
+        sale_items[product_id_str] = held
+    else:
+        sale_items.pop(product_id_str, None)
+
+def _parse_quantity(value):
+    """Convierte la cantidad recibida a entero; None si no es válida"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+@user_passes_test(is_vendedor_or_admin)
+def sale_api_cart(request):
+    """Regresa el carrito actual"""
+    return _cart_payload(get_sale_session(request))
+
+@require_POST
+@user_passes_test(is_vendedor_or_admin)
+def sale_api_add(request, product_id):
+    """Agrega una unidad (o `quantity` unidades) de un producto"""
+    product = get_object_or_404(Product, id=product_id)
+    quantity = _parse_quantity(request.POST.get('quantity', 1))
+    if quantity is None or quantity < 1:
+        return JsonResponse({'error': 'Cantidad inválida'}, status=400)
+    
+    sale_items = get_sale_session(request)
+    warnings = []
+    _set_cart_quantity(request, sale_items, product, sale_items.get(str(product_id), 0) + quantity, warnings)
+    save_sale_session(request, sale_items)
+    return _cart_payload(sale_items, warnings)
+
+@require_POST
+@user_passes_test(is_vendedor_or_admin)
+def sale_api_set(request, product_id):
+    """Fija la cantidad de un producto (0 lo elimina)"""
+    product = get_object_or_404(Product, id=product_id)
+    quantity = _parse_quantity(request.POST.get('quantity'))
+    if quantity is None or quantity < 0:
+        return JsonResponse({'error': 'Cantidad inválida'}, status=400)
+    
+    sale_items = get_sale_session(request)
+    warnings = []
+    _set_cart_quantity(request, sale_items, product, quantity, warnings)
+    save_sale_session(request, sale_items)
+    return _cart_payload(sale_items, warnings)
+
+@require_POST
+@user_passes_test(is_vendedor_or_admin)
+def sale_api_remove(request, product_id):
+    """Elimina un producto del carrito"""
+    sale_items = get_sale_session(request)
+    if sale_items.pop(str(product_id), None) is not None:
+        release_holds(request.session.session_key, [product_id])
+        save_sale_session(request, sale_items)
+    return _cart_payload(sale_items)
+
+@require_POST
+@user_passes_test(is_vendedor_or_admin)
+def sale_api_clear(request):
+    """Vacía el carrito"""
+    save_sale_session(request, {})
+    release_holds(request.session.session_key)
+    return _cart_payload({})
+
+@require_POST
+@user_passes_test(is_vendedor_or_admin)
+def sale_api_batch(request):
+    """
+    Fija varias cantidades en una sola petición.
+    Cuerpo JSON: {"items": {"<product_id>": cantidad, ...}}
+    """
+    try:
+        items = json.loads(request.body or b'{}').get('items', {})
+        quantities = {int(pid): int(qty) for pid, qty in items.items()}
+    except (ValueError, AttributeError, TypeError):
+        return JsonResponse({'error': 'Formato inválido'}, status=400)
+    
+    sale_items = get_sale_session(request)
+    warnings = []
+    products = Product.objects.in_bulk(list(quantities))
+    for product_id, quantity in quantities.items():
+        product = products.get(product_id)
+        if product is None:
+            sale_items.pop(str(product_id), None)
+            continue
+        _set_cart_quantity(request, sale_items, product, quantity, warnings)
+    
+    save_sale_session(request, sale_items)
+    return _cart_payload(sale_items, warnings)
+
+@require_POST
+@user_passes_test(is_vendedor_or_admin)
+def sale_api_sync(request):
+    """
+    Sincroniza en una sola petición las ventas capturadas fuera de línea.
+    Cuerpo JSON: {"sales": [{"client_key": ..., "items": {...}, "payment_received": ..., "sold_at": ...}]}
+    """
+    try:
+        sales = json.loads(request.body or b'{}').get('sales', [])
+    except (ValueError, AttributeError):
+        return JsonResponse({'error': 'Formato inválido'}, status=400)
+    
+    if not isinstance(sales, list):
+        return JsonResponse({'error': 'Formato inválido'}, status=400)
+    if len(sales) > OFFLINE_SYNC_MAX_SALES:
+        return JsonResponse({'error': f'Máximo {OFFLINE_SYNC_MAX_SALES} ventas por sincronización'}, status=400)
+    
+    try:
+        results = ingest_offline_sales(request.user, sales)
+    except CheckoutError as e:
+        # Otra caja cambió el stock a mitad del lote; la caja debe reintentar
+        return JsonResponse({'error': str(e)}, status=409)
+    
+    return JsonResponse({'results': results})
+
 @login_required
 def sale_receipt(request, order_id):
-    """Vista para mostrar el ticket de venta"""
-    order = get_object_or_404(Order, id=order_id)
-    items = OrderItem.objects.filter(order=order)
+    """Vista para mostrar el ticket de venta (documento precalculado)"""
+    receipt = get_receipt(order_id)
+    if receipt is None:
+        raise Http404('Orden no encontrada')
     return render(request, 'store/sale_receipt.html', {
-        'order': order,
-        'items': items
+        'receipt': receipt
     })
 
+@login_required
+def receipt_document(request, order_id, fmt):
+    """Ticket para reimpresión: txt, escpos (impresora térmica), html compacto o pdf"""
+    if fmt not in RECEIPT_FORMATS:
+        raise Http404('Formato no soportado')
+    content = render_receipt(order_id, fmt)
+    if content is None:
+        raise Http404('Orden no encontrada')
+    
+    response = HttpResponse(content, content_type=RECEIPT_FORMATS[fmt])
+    if fmt in ('escpos', 'pdf'):
+        response['Content-Disposition'] = f'inline; filename="ticket-{order_id}.{"bin" if fmt == "escpos" else "pdf"}"'
+    return response
+
 # ======================================== 
 # HISTORIAL DE ÓRDENES DEL USUARIO
 # ======================================== 
@@ -316,8 +483,8 @@ def user_orders(request):
 
 @login_required
 def order_detail(request, order_id):
-    order = get_object_or_404(Order, id=order_id, customer=request.user)
-    items = OrderItem.objects.filter(order=order)
+    order = get_object_or_404(Order.objects.select_related('customer'), id=order_id, customer=request.user)
+    items = OrderItem.objects.filter(order=order).select_related('product')
     return render(request, 'store/order_detail.html', {
         'order': order,
         'items': items
@@ -328,62 +495,21 @@ def order_detail(request, order_id):
 # ======================================== 
 @user_passes_test(is_admin)
 def admin_dashboard(request):
-    today = timezone.now().date()
-    
-    # Estadísticas generales
-    total_products = Product.objects.count()
-    total_orders = Order.objects.count()
-    total_customers = Order.objects.values('customer').distinct().count()
-    
-    # Ventas del mes
-    month_start = today.replace(day=1)
-    monthly_sales = Order.objects.filter(
-        created_at__gte=month_start
-    ).aggregate(Sum('total'))['total__sum'] or 0
-    
-    # Ventas de hoy
-    daily_sales = Order.objects.filter(
-        created_at__date=today
-    ).aggregate(Sum('total'))['total__sum'] or 0
-    
-    # Productos con poco stock
-    low_stock = Product.objects.filter(
-        stock__lt=10, 
-        is_active=True
-    ).order_by('stock')[:10]
-    
-    # Últimas órdenes
-    recent_orders = Order.objects.order_by('-created_at')[:10]
-    
-    # Productos más vendidos
-    top_products = OrderItem.objects.values(
-        'product__name'
-    ).annotate(
-        total_qty=Sum('quantity')
-    ).order_by('-total_qty')[:10]
-    
-    context = {
-        'total_products': total_products,
-        'total_orders': total_orders,
-        'total_customers': total_customers,
-        'monthly_sales': monthly_sales,
-        'daily_sales': daily_sales,
-        'low_stock': low_stock,
-        'recent_orders': recent_orders,
-        'top_products': top_products,
-    }
-    
-    return render(request, 'store/admin_dashboard.html', context)
+    # Cada indicador sale de su caché o se calcula en paralelo (dashboard.py)
+    return render(request, 'store/admin_dashboard.html', dashboard_widgets())
 
 # ======================================== 
 # PANEL DE ADMINISTRACIÓN - PRODUCTOS
 # ======================================== 
 @user_passes_test(is_admin)
 def admin_products(request):
-    products = Product.objects.all()
+    products = Product.objects.select_related('category')
     return render(request, 'store/admin_products.html', {'products': products})
 
+# @batch(): los cambios del catálogo de la petición (incluidos los borrados
+# en cascada) suben cada versión de invalidation.py una sola vez
 @user_passes_test(is_admin)
+@batch()
 def admin_product_create(request):
     if request.method == 'POST':
         form = ProductForm(request.POST, request.FILES)
@@ -396,6 +522,7 @@ def admin_product_create(request):
     return render(request, 'store/admin_product_form.html', {'form': form})
 
 @user_passes_test(is_admin)
+@batch()
 def admin_product_edit(request, product_id):
     p = get_object_or_404(Product, id=product_id)
     if request.method == 'POST':
@@ -409,6 +536,7 @@ def admin_product_edit(request, product_id):
     return render(request, 'store/admin_product_form.html', {'form': form})
 
 @user_passes_test(is_admin)
+@batch()
 def admin_product_delete(request, product_id):
     p = get_object_or_404(Product, id=product_id)
     p.delete()
@@ -420,12 +548,13 @@ def admin_product_delete(request, product_id):
 # ======================================== 
 @user_passes_test(is_admin)
 def admin_categories(request):
-    categories = Category.objects.all()
+    categories = Category.objects.annotate(product_count=Count('product'))
     return render(request, 'store/admin_categories.html', {
         'categories': categories
     })
 
 @user_passes_test(is_admin)
+@batch()
 def admin_category_create(request):
     if request.method == 'POST':
         name = request.POST.get('name')
@@ -450,6 +579,7 @@ def admin_category_create(request):
     return render(request, 'store/admin_category_form.html')
 
 @user_passes_test(is_admin)
+@batch()
 def admin_category_edit(request, category_id):
     category = get_object_or_404(Category, id=category_id)
     if request.method == 'POST':
@@ -472,6 +602,7 @@ def admin_category_edit(request, category_id):
     })
 
 @user_passes_test(is_admin)
+@batch()
 def admin_category_delete(request, category_id):
     category = get_object_or_404(Category, id=category_id)
     category.delete()
@@ -483,16 +614,34 @@ def admin_category_delete(request, category_id):
 # ======================================== 
 @user_passes_test(is_admin)
 def admin_orders(request):
-    status_filter = request.GET.get('status', '')
-    orders = Order.objects.all().order_by('-created_at')
-    if status_filter:
-        orders = orders.filter(status=status_filter)
-    return render(request, 'store/admin_orders.html', {'orders': orders})
+    """Órdenes paginadas por cursor; filtros y conteos en SQL"""
+    filters = parse_filters(request.GET)
+    orders = filter_orders(filters)
+    page, next_cursor = keyset_page(orders, request.GET.get('cursor'))
+    
+    # Los enlaces de página conservan los filtros
+    querystring = {
+        name: value.isoformat() if hasattr(value, 'isoformat') else value
+        for name, value in filters.items()
+    }
+    next_url = f'?{urlencode(dict(querystring, cursor=next_cursor))}' if next_cursor else None
+    first_url = f'?{urlencode(querystring)}' if request.GET.get('cursor') else None
+    
+    return render(request, 'store/admin_orders.html', {
+        'orders': page,
+        'summary': order_summary(orders),
+        'filters': filters,
+        'statuses': ORDER_STATUSES,
+        'payment_methods': PAYMENT_METHODS,
+        'cashiers': cashiers(),
+        'next_url': next_url,
+        'first_url': first_url,
+    })
 
 @user_passes_test(is_admin)
 def admin_order_detail(request, order_id):
-    order = get_object_or_404(Order, id=order_id)
-    items = OrderItem.objects.filter(order=order)
+    order = get_object_or_404(Order.objects.select_related('customer'), id=order_id)
+    items = OrderItem.objects.filter(order=order).select_related('product__category')
     if request.method == 'POST':
         new_status = request.POST.get('status')
         order.status = new_status
@@ -508,101 +657,70 @@ def admin_order_detail(request, order_id):
 # ======================================== 
 # REPORTES
 # ======================================== 
-@user_passes_test(is_admin)
-def reports(request):
-    """Reportes de ventas con filtros de fecha"""
-    
-    # Obtener fechas del filtro
-    fecha_inicio_str = request.GET.get('fecha_inicio')
-    fecha_fin_str = request.GET.get('fecha_fin')
-    
-    # Fechas por defecto (últimos 7 días)
-    today = timezone.now().date()
-    
-    if fecha_inicio_str:
-        try:
-            fecha_inicio = datetime.strptime(fecha_inicio_str, '%Y-%m-%d').date()
-        except ValueError:
-            fecha_inicio = today - timedelta(days=7)
-    else:
-        fecha_inicio = today - timedelta(days=7)
-    
-    if fecha_fin_str:
-        try:
-            fecha_fin = datetime.strptime(fecha_fin_str, '%Y-%m-%d').date()
-        except ValueError:
-            fecha_fin = today
-    else:
-        fecha_fin = today
-    
-    # Permitir que fecha_inicio sea mayor que fecha_fin (intercambiarlas si es necesario)
-    if fecha_fin < fecha_inicio:
-        fecha_inicio, fecha_fin = fecha_fin, fecha_inicio
-    
+def report_orders(fecha_inicio, fecha_fin):
+    """Órdenes más recientes del rango (a lo más REPORTS_MAX_ORDERS)"""
     # Crear datetime para el inicio del día y fin del día
     fecha_inicio_dt = timezone.make_aware(datetime.combine(fecha_inicio, datetime.min.time()))
     fecha_fin_dt = timezone.make_aware(datetime.combine(fecha_fin, datetime.max.time()))
-    
-    # Filtrar órdenes por rango de fechas
-    orders = Order.objects.filter(
+    return Order.objects.filter(
         created_at__gte=fecha_inicio_dt,
         created_at__lte=fecha_fin_dt
-    ).order_by('-created_at')
-    
-    # Calcular total
-    total_ventas = orders.aggregate(Sum('total'))['total__sum'] or 0
-    
-    # Productos más vendidos en el rango
-    productos_vendidos = OrderItem.objects.filter(
-        order__created_at__gte=fecha_inicio_dt,
-        order__created_at__lte=fecha_fin_dt
-    ).values(
-        'product__name', 
-        'product__category__name'
-    ).annotate(
-        total_qty=Sum('quantity'),
-        total_revenue=Sum('subtotal')
-    ).order_by('-total_qty')[:10]
-    
-    # Ventas por categoría
-    ventas_por_categoria = OrderItem.objects.filter(
-        order__created_at__gte=fecha_inicio_dt,
-        order__created_at__lte=fecha_fin_dt
-    ).values(
-        'product__category__name'
-    ).annotate(
-        total_revenue=Sum('subtotal'),
-        total_qty=Sum('quantity')
-    ).order_by('-total_revenue')
-    
-    # Estadísticas adicionales
-    total_ordenes = orders.count()
-    ticket_promedio = total_ventas / total_ordenes if total_ordenes > 0 else 0
-    
-    # Calcular días del período
-    dias_periodo = (fecha_fin - fecha_inicio).days + 1
-    
-    context = {
+    ).select_related('customer').order_by('-created_at')[:getattr(settings, 'REPORTS_MAX_ORDERS', 100)]
+
+def reports_context(fecha_inicio, fecha_fin, orders, totales, productos_vendidos, ventas_por_categoria):
+    """Contexto de reports.html (lo comparten la vista síncrona y la async)"""
+    total_ventas = totales['revenue']
+    total_ordenes = totales['order_count']
+    return {
         'orders': orders,
         'total_ventas': total_ventas,
         'total_ordenes': total_ordenes,
-        'ticket_promedio': ticket_promedio,
+        'ticket_promedio': total_ventas / total_ordenes if total_ordenes > 0 else 0,
         'productos_vendidos': productos_vendidos,
         'ventas_por_categoria': ventas_por_categoria,
         'fecha_inicio': fecha_inicio,
         'fecha_fin': fecha_fin,
-        'dias_periodo': dias_periodo,
+        # Días del período
+        'dias_periodo': (fecha_fin - fecha_inicio).days + 1,
+        'export_datasets': EXPORT_LABELS,
+        'export_query': urlencode({'fecha_inicio': fecha_inicio, 'fecha_fin': fecha_fin}),
     }
+
+@user_passes_test(is_admin)
+def reports(request):
+    """Reportes de ventas con filtros de fecha"""
+    
+    # Rango de fechas del filtro (por defecto los últimos 7 días)
+    fecha_inicio, fecha_fin = report_range(request.GET)
+    
+    orders = report_orders(fecha_inicio, fecha_fin)
+    
+    # Totales, productos y categorías desde los acumulados diarios
+    totales = sales_totals(fecha_inicio, fecha_fin)
+    
+    # Productos más vendidos y ventas por categoría en el rango
+    productos_vendidos = top_selling_products(fecha_inicio, fecha_fin)
+    ventas_por_categoria = sales_by_category(fecha_inicio, fecha_fin)
+    
+    context = reports_context(fecha_inicio, fecha_fin, orders, totales, productos_vendidos, ventas_por_categoria)
     
     return render(request, 'store/reports.html', context)
 
+@user_passes_test(is_admin)
+def reports_export(request, dataset, fmt):
+    """Descarga del reporte (órdenes, partidas, productos o categorías) en CSV o XLSX"""
+    if dataset not in EXPORT_DATASETS or fmt not in EXPORT_FORMATS:
+        raise Http404('Reporte no disponible')
+    fecha_inicio, fecha_fin = report_range(request.GET)
+    return export_response(dataset, fmt, fecha_inicio, fecha_fin)
+
 # ======================================== 
 # PANEL DE ADMINISTRACIÓN - USUARIOS
 # ======================================== 
 @user_passes_test(is_admin)
 def admin_users(request):
     """Vista para gestionar usuarios"""
-    users = User.objects.all().order_by('-date_joined')
+    users = User.objects.prefetch_related('groups').order_by('-date_joined')
     grupos = Group.objects.all()
     
     return render(request, 'store/admin_users.html', {
@@ -700,4 +818,68 @@ def admin_user_delete(request, user_id):
     username = usuario.username
     usuario.delete()
     messages.success(request, f'Usuario {username} eliminado')
-    return redirect('admin_users')
\ No newline at end of file
+    return redirect('admin_users')
+
+# ======================================== 
+# PANEL DE ADMINISTRACIÓN - MÉTRICAS
+# ======================================== 
+@user_passes_test(is_admin)
+def admin_metrics(request):
+    """Consultas y tiempos por vista (ventana móvil de este worker)"""
+    return render(request, 'store/admin_metrics.html', {
+        'views': registry.snapshot(),
+        'query_budget': getattr(settings, 'METRICS_QUERY_BUDGET', None),
+        'latency_budget': getattr(settings, 'METRICS_LATENCY_BUDGET_MS', None),
+    })
+
+def metrics_prometheus(request):
+    """Métricas en texto de Prometheus; administradores o con METRICS_TOKEN"""
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    authorized = token and request.headers.get('Authorization') == f'Bearer {token}'
+    if not authorized and not (request.user.is_authenticated and is_admin(request.user)):
+        return HttpResponse('No autorizado', status=403, content_type='text/plain')
+    return HttpResponse(prometheus_text(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+# ======================================== 
+# PANEL DE ADMINISTRACIÓN - TAREAS EN SEGUNDO PLANO
+# ======================================== 
+@user_passes_test(is_admin)
+def admin_jobs(request):
+    """Estado de la cola de tareas (las ejecuta `manage.py runworker`)"""
+    status = request.GET.get('status', '')
+    jobs = Job.objects.order_by('-id')
+    if status in dict(Job.STATUSES):
+        jobs = jobs.filter(status=status)
+    counts = dict(Job.objects.values_list('status').annotate(total=Count('id')).order_by())
+    return render(request, 'store/admin_jobs.html', {
+        'jobs': jobs[:50],
+        'status': status,
+        'status_counts': [(value, label, counts.get(value, 0)) for value, label in Job.STATUSES],
+        'admin_tasks': [(name, label) for name, (_, label) in ADMIN_TASKS.items()],
+    })
+
+@require_POST
+@user_passes_test(is_admin)
+def admin_job_enqueue(request):
+    """Encola una de las tareas pesadas del panel (ADMIN_TASKS)"""
+    entry = ADMIN_TASKS.get(request.POST.get('task'))
+    if entry is None:
+        messages.error(request, 'Tarea no válida')
+    else:
+        task, label = entry
+        job = task.enqueue()
+        messages.success(request, f'"{label}" quedó en la cola (#{job.id})')
+    return redirect('admin_jobs')
+
+@require_POST
+@user_passes_test(is_admin)
+def admin_job_retry(request, job_id):
+    """Regresa a la cola una tarea fallida con sus intentos en cero"""
+    retried = Job.objects.filter(pk=job_id, status=Job.FAILED).update(
+        status=Job.PENDING, attempts=0, run_at=timezone.now(), finished_at=None
+    )
+    if retried:
+        messages.success(request, f'Tarea #{job_id} en la cola de nuevo')
+    else:
+        messages.error(request, f'La tarea #{job_id} no está fallida')
+    return redirect('admin_jobs')